@@ -158,6 +158,32 @@ Guidelines:
 Help Moon Dev keep track of the trading journey! 🎯
 """
 
+AGENT_RESPONSE_FORMAT = """
+Remember to format your response like this:
+
+🤖 Hey Moon Dev! {name} here!
+=================================
+
+📊 Market Vibes:
+[Your main market thoughts in simple terms]
+
+💡 Opportunities I See:
+- [Opportunity 1]
+- [Opportunity 2]
+- [Opportunity 3]
+
+🎯 My Recommendations:
+1. [Clear action item]
+2. [Clear action item]
+3. [Clear action item]
+
+💰 Portfolio Impact:
+[How this helps reach our $10M goal]
+
+🌙 Moon Dev Wisdom:
+[Fun reference to Moon Dev's trading style]
+"""
+
 # 🤖 Agent Model Selection
 AGENT_ONE_MODEL = "claude-3-haiku-20240307"     # Change this to any model you want for Agent One
 AGENT_TWO_MODEL = "claude-3-sonnet-20240229"    # Change this to any model you want for Agent Two
@@ -228,6 +254,7 @@ from pathlib import Path
 
 # Local imports
 from src.config import *
+from src.llm_usage import create_message
 
 # Load environment variables
 load_dotenv()
@@ -310,38 +337,15 @@ Current Market Data:
 
 Previous Agent Message:
 {other_agent_message if other_agent_message else 'No previous message'}
-
-Remember to format your response like this:
-
-🤖 Hey Moon Dev! {self.name} here!
-=================================
-
-📊 Market Vibes:
-[Your main market thoughts in simple terms]
-
-💡 Opportunities I See:
-- [Opportunity 1]
-- [Opportunity 2]
-- [Opportunity 3]
-
-🎯 My Recommendations:
-1. [Clear action item]
-2. [Clear action item]
-3. [Clear action item]
-
-💰 Portfolio Impact:
-[How this helps reach our $10M goal]
-
-🌙 Moon Dev Wisdom:
-[Fun reference to Moon Dev's trading style]
 """
             
             # Get AI response with correct message format
-            message = self.client.messages.create(
+            message = create_message(
+                self.client, self.name,
+                system=(prompt, AGENT_RESPONSE_FORMAT.format(name=self.name)),  # agent prompt + format, cached
                 model=self.model,
                 max_tokens=max_tokens,
                 temperature=temperature,
-                system=prompt,  # Use the agent-specific prompt
                 messages=[{
                     "role": "user",
                     "content": market_context
@@ -534,11 +538,12 @@ class TokenExtractorAgent:
         try:
             print_section("🔍 Extracting Mentioned Tokens", "on_cyan")
             
-            message = self.client.messages.create(
+            message = create_message(
+                self.client, "Token Extractor",
+                system=TOKEN_EXTRACTOR_PROMPT,  # Use the token extractor prompt
                 model=self.model,
                 max_tokens=EXTRACTOR_MAX_TOKENS,
                 temperature=EXTRACTOR_TEMP,
-                system=TOKEN_EXTRACTOR_PROMPT,  # Use the token extractor prompt
                 messages=[{
                     "role": "user",
                     "content": f"""
@@ -600,11 +605,12 @@ class MultiAgentSystem:
     def generate_round_synopsis(self, agent_one_response: str, agent_two_response: str) -> str:
         """Generate a brief synopsis of the round's key points using Synopsis Agent"""
         try:
-            message = self.agent_one.client.messages.create(
+            message = create_message(
+                self.agent_one.client, "Synopsis Agent",
+                system=SYNOPSIS_AGENT_PROMPT,  # Use the synopsis agent prompt
                 model="claude-3-haiku-20240307",
                 max_tokens=SYNOPSIS_MAX_TOKENS,
                 temperature=SYNOPSIS_TEMP,
-                system=SYNOPSIS_AGENT_PROMPT,  # Use the synopsis agent prompt
                 messages=[{
                     "role": "user",
                     "content": f"""
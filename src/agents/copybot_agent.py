@@ -18,6 +18,8 @@ from datetime import datetime, timedelta
 import time
 from src.config import *
 from src import nice_funcs as n
+from src.llm_usage import create_message
+from src.recommendation_store import RecommendationStore
 from src.data.ohlcv_collector import collect_all_tokens, collect_token_data
 
 # Data path for current copybot portfolio
@@ -41,9 +43,6 @@ Analysis Criteria:
 4. Risk/reward ratio
 5. Market conditions
 
-{portfolio_data}
-{market_data}
-
 Respond in this exact format:
 1. First line must be one of: BUY, SELL, or NOTHING (in caps)
 2. Then explain your reasoning, including:
@@ -67,7 +66,7 @@ class CopyBotAgent:
         """Initialize the CopyBot agent with LLM"""
         load_dotenv()
         self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_KEY"))
-        self.recommendations_df = pd.DataFrame(columns=['token', 'action', 'confidence', 'reasoning'])
+        self.recommendations = RecommendationStore("copybot")
         print("🤖 Moon Dev's CopyBot Agent initialized!")
         
     def load_portfolio_data(self):
@@ -120,12 +119,10 @@ class CopyBotAgent:
                 print(f"❌ Error collecting OHLCV data: {str(e)}")
                 token_market_data = "No market data available"
             
-            # Prepare context for LLM
+            # Prepare context for LLM - PORTFOLIO_ANALYSIS_PROMPT goes in the cached system prompt
             full_prompt = f"""
-{PORTFOLIO_ANALYSIS_PROMPT.format(
-    portfolio_data=position_data.to_string(),
-    market_data=token_market_data
-)}
+{position_data.to_string()}
+{token_market_data}
 """
             print("\n📝 Full Prompt Being Sent to LLM:")
             print("=" * 80)
@@ -135,7 +132,9 @@ class CopyBotAgent:
             print("\n🤖 Sending data to Moon Dev's AI for analysis...")
             
             # Get LLM analysis
-            message = self.client.messages.create(
+            message = create_message(
+                self.client, "copybot",
+                system=PORTFOLIO_ANALYSIS_PROMPT,
                 model=AI_MODEL,
                 max_tokens=AI_MAX_TOKENS,
                 temperature=AI_TEMPERATURE,
@@ -172,15 +171,12 @@ class CopyBotAgent:
             
             # Store recommendation
             reasoning = '\n'.join(lines[1:]) if len(lines) > 1 else "No detailed reasoning provided"
-            self.recommendations_df = pd.concat([
-                self.recommendations_df,
-                pd.DataFrame([{
-                    'token': token,
-                    'action': action,
-                    'confidence': confidence,
-                    'reasoning': reasoning
-                }])
-            ], ignore_index=True)
+            self.recommendations.add([{
+                'token': token,
+                'action': action,
+                'confidence': confidence,
+                'reasoning': reasoning
+            }])
             
             print(f"\n📊 Summary for {position_data['name'].values[0]}:")
             print(f"Action: {action}")
@@ -197,10 +193,10 @@ class CopyBotAgent:
         try:
             print("\n🚀 Moon Dev executing position updates...")
             
-            for _, row in self.recommendations_df.iterrows():
-                token = row['token']
-                action = row['action']
-                confidence = row['confidence']
+            for rec in self.recommendations.current():
+                token = rec.token
+                action = rec.action
+                confidence = rec.confidence
                 
                 # instead of try/excempt it just looks for nothing and continues
                 # if action == "NOTHING" or token in EXCLUDED_TOKENS:
@@ -284,26 +280,26 @@ class CopyBotAgent:
             # Get unique tokens from portfolio
             portfolio_tokens = self.portfolio_df['Mint Address'].unique()
             
-            # Reset recommendations for new cycle
-            self.recommendations_df = pd.DataFrame(columns=['token', 'action', 'confidence', 'reasoning'])
+            # New cycle - earlier recommendations stay in the journal only
+            self.recommendations.new_cycle()
             
             # Analyze each position
             for token in portfolio_tokens:
                 self.analyze_position(token)
                 
             # Print all recommendations
-            if not self.recommendations_df.empty:
+            if len(self.recommendations):
                 print("\n📊 All Position Recommendations:")
                 print("=" * 80)
-                for _, rec in self.recommendations_df.iterrows():
-                    token_name = self.portfolio_df[self.portfolio_df['Mint Address'] == rec['token']]['name'].values[0]
+                for rec in self.recommendations.current():
+                    token_name = self.portfolio_df[self.portfolio_df['Mint Address'] == rec.token]['name'].values[0]
                     print(f"\n🪙 Token: {token_name}")
-                    print(f"💼 Address: {rec['token']}")
-                    print(f"🎯 Action: {rec['action']}")
-                    print(f"📊 Confidence: {rec['confidence']}%")
+                    print(f"💼 Address: {rec.token}")
+                    print(f"🎯 Action: {rec.action}")
+                    print(f"📊 Confidence: {rec.confidence}%")
                     print("\n📝 Full Analysis:")
                     print("-" * 40)
-                    print(rec['reasoning'])
+                    print(rec.reasoning)
                     print("-" * 40)
                 print("=" * 80)
             
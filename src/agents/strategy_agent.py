@@ -12,18 +12,13 @@ import importlib
 import inspect
 import time
 from src import nice_funcs as n
+from src.llm_usage import create_message
 
 # 🎯 Strategy Evaluation Prompt
 STRATEGY_EVAL_PROMPT = """
 You are Moon Dev's Strategy Validation Assistant 🌙
 
-Analyze the following strategy signals and validate their recommendations:
-
-Strategy Signals:
-{strategy_signals}
-
-Market Context:
-{market_data}
+Analyze the strategy signals and market context you are given and validate their recommendations.
 
 Your task:
 1. Evaluate each strategy signal's reasoning
@@ -84,16 +79,15 @@ class StrategyAgent:
             # Format signals for prompt
             signals_str = json.dumps(signals, indent=2)
             
-            message = self.client.messages.create(
+            message = create_message(
+                self.client, "strategy",
+                system=STRATEGY_EVAL_PROMPT,  # static - cached between evaluations
                 model=AI_MODEL,
                 max_tokens=AI_MAX_TOKENS,
                 temperature=AI_TEMPERATURE,
                 messages=[{
                     "role": "user",
-                    "content": STRATEGY_EVAL_PROMPT.format(
-                        strategy_signals=signals_str,
-                        market_data=market_data
-                    )
+                    "content": f"Strategy Signals:\n{signals_str}\n\nMarket Context:\n{market_data}"
                 }]
             )
             
@@ -15,7 +15,7 @@ Market Data Criteria:
 3. Volume patterns
 4. Recent price movements
 
-{strategy_context}
+Strategy signals, when available, are listed after the market data.
 
 Respond in this exact format:
 1. First line must be one of: BUY, SELL, or NOTHING (in caps)
@@ -70,6 +70,10 @@ import time
 # Local imports
 from src.config import *
 from src import nice_funcs as n
+from src.prompt_encoder import encode_market_data
+from src.batch_analysis import TokenAnalyzer
+from src.llm_usage import create_message
+from src.recommendation_store import RecommendationStore
 from src.data.ohlcv_collector import collect_all_tokens
 
 # Load environment variables
@@ -78,90 +82,31 @@ load_dotenv()
 class TradingAgent:
     def __init__(self):
         self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_KEY"))
-        self.recommendations_df = pd.DataFrame(columns=['token', 'action', 'confidence', 'reasoning'])
+        self.recommendations = RecommendationStore("trading")
+        # Cache lookup, batching and concurrent fan-out live in the shared analyzer - only the user message is ours
+        self.analyzer = TokenAnalyzer(self.client, TRADING_PROMPT, self._build_prompt, self.recommendations)
         print("🤖 Moon Dev's LLM Trading Agent initialized!")
 
     def analyze_market_data(self, token, market_data):
         """Analyze market data using Claude"""
-        try:
-            # Skip analysis for excluded tokens
-            if token in EXCLUDED_TOKENS:
-                print(f"⚠️ Skipping analysis for excluded token: {token}")
-                return None
-            
-            # Prepare strategy context
-            strategy_context = ""
-            if 'strategy_signals' in market_data:
-                strategy_context = f"""
+        return self.analyzer.analyze(token, market_data)
+
+    def analyze_tokens(self, items):
+        """Analyze [(token, market_data)] concurrently - returns [(token, response)] in input order"""
+        return self.analyzer.analyze_tokens(items)
+
+    def _build_prompt(self, token, market_data):
+        """User message for one token - compact feature tables + strategy signals (TRADING_PROMPT is the system prompt)"""
+        # Prepare strategy context
+        if 'strategy_signals' in market_data:
+            strategy_context = f"""
 Strategy Signals Available:
 {json.dumps(market_data['strategy_signals'], indent=2)}
                 """
-            else:
-                strategy_context = "No strategy signals available."
-            
-            message = self.client.messages.create(
-                model=AI_MODEL,
-                max_tokens=AI_MAX_TOKENS,
-                temperature=AI_TEMPERATURE,
-                messages=[
-                    {
-                        "role": "user", 
-                        "content": f"{TRADING_PROMPT.format(strategy_context=strategy_context)}\n\nMarket Data to Analyze:\n{market_data}"
-                    }
-                ]
-            )
-            
-            # Parse the response - handle both string and list responses
-            response = message.content
-            if isinstance(response, list):
-                # Extract text from TextBlock objects if present
-                response = '\n'.join([
-                    item.text if hasattr(item, 'text') else str(item)
-                    for item in response
-                ])
-            
-            lines = response.split('\n')
-            action = lines[0].strip() if lines else "NOTHING"
-            
-            # Extract confidence from the response (assuming it's mentioned as a percentage)
-            confidence = 0
-            for line in lines:
-                if 'confidence' in line.lower():
-                    # Extract number from string like "Confidence: 75%"
-                    try:
-                        confidence = int(''.join(filter(str.isdigit, line)))
-                    except:
-                        confidence = 50  # Default if not found
-            
-            # Add to recommendations DataFrame with proper reasoning
-            reasoning = '\n'.join(lines[1:]) if len(lines) > 1 else "No detailed reasoning provided"
-            self.recommendations_df = pd.concat([
-                self.recommendations_df,
-                pd.DataFrame([{
-                    'token': token,
-                    'action': action,
-                    'confidence': confidence,
-                    'reasoning': reasoning
-                }])
-            ], ignore_index=True)
-            
-            print(f"🎯 Moon Dev's AI Analysis Complete for {token[:4]}!")
-            return response
-            
-        except Exception as e:
-            print(f"❌ Error in AI analysis: {str(e)}")
-            # Still add to DataFrame even on error, but mark as NOTHING with 0 confidence
-            self.recommendations_df = pd.concat([
-                self.recommendations_df,
-                pd.DataFrame([{
-                    'token': token,
-                    'action': "NOTHING",
-                    'confidence': 0,
-                    'reasoning': f"Error during analysis: {str(e)}"
-                }])
-            ], ignore_index=True)
-            return None
-    
+        else:
+            strategy_context = "No strategy signals available."
+        return f"Market Data to Analyze:\n{encode_market_data(market_data, token)}\n\n{strategy_context}"
+
     def allocate_portfolio(self):
         """Get AI-recommended portfolio allocation"""
         try:
@@ -169,18 +114,13 @@ Strategy Signals Available:
             max_position_size = usd_size * (MAX_POSITION_PERCENTAGE / 100)
             cprint(f"🎯 Maximum position size: ${max_position_size:.2f} ({MAX_POSITION_PERCENTAGE}% of ${usd_size:.2f})", "cyan")
             
-            # Get allocation from AI
-            message = self.client.messages.create(
-                model=AI_MODEL,
-                max_tokens=AI_MAX_TOKENS,
-                temperature=AI_TEMPERATURE,
-                messages=[{
-                    "role": "user", 
-                    "content": f"""You are Moon Dev's Portfolio Allocation AI 🌙
+            # Get allocation from AI - the brief is the static (cached) system prompt, the sizes go in the user message
+            message = create_message(
+                self.client, "allocation",
+                system=f"""You are Moon Dev's Portfolio Allocation AI 🌙
 
 Given:
-- Total portfolio size: ${usd_size}
-- Maximum position size: ${max_position_size} ({MAX_POSITION_PERCENTAGE}% of total)
+- Maximum position size: {MAX_POSITION_PERCENTAGE}% of the total portfolio size
 - Minimum cash (USDC) buffer: {CASH_PERCENTAGE}%
 - Available tokens: {MONITORED_TOKENS}
 - USDC Address: {USDC_ADDRESS}
@@ -195,7 +135,15 @@ Example format:
 {{
     "token_address": amount_in_usd,
     "{USDC_ADDRESS}": remaining_cash_amount  # Use exact USDC address
-}}"""
+}}""",
+                model=AI_MODEL,
+                max_tokens=AI_MAX_TOKENS,
+                temperature=AI_TEMPERATURE,
+                messages=[{
+                    "role": "user", 
+                    "content": f"Total portfolio size: ${usd_size}\n"
+                               f"Maximum position size: ${max_position_size}\n\n"
+                               "Provide the portfolio allocation."
                 }]
             )
             
@@ -268,14 +216,14 @@ Example format:
         """Check and exit positions based on SELL or NOTHING recommendations"""
         cprint("\n🔄 Checking for positions to exit...", "white", "on_blue")
         
-        for _, row in self.recommendations_df.iterrows():
-            token = row['token']
+        for rec in self.recommendations.current():
+            token = rec.token
             
             # Skip excluded tokens (USDC and SOL)
             if token in EXCLUDED_TOKENS:
                 continue
                 
-            action = row['action']
+            action = rec.action
             
             # Check if we have a position
             current_position = n.get_token_balance_usd(token)
@@ -385,27 +333,31 @@ Example format:
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             cprint(f"\n⏰ AI Agent Run Starting at {current_time}", "white", "on_green")
             
+            # Decisions from earlier runs stay in the journal - exits and allocations only see this run's
+            cycle = self.recommendations.new_cycle()
+            cprint(f"🗂️ Recommendation cycle {cycle}", "white", "on_blue")
+
             # Collect OHLCV data for all tokens
             cprint("📊 Collecting market data...", "white", "on_blue")
             market_data = collect_all_tokens()
             
             # Analyze each token's data
             for token, data in market_data.items():
-                cprint(f"\n🤖 AI Agent Analyzing Token: {token}", "white", "on_green")
-                
                 # Include strategy signals in analysis if available
                 if strategy_signals and token in strategy_signals:
-                    cprint(f"📊 Including {len(strategy_signals[token])} strategy signals in analysis", "cyan")
+                    cprint(f"📊 Including {len(strategy_signals[token])} strategy signals for {token}", "cyan")
                     data['strategy_signals'] = strategy_signals[token]
-                
-                analysis = self.analyze_market_data(token, data)
+
+            # All Claude calls run together - the stage takes about as long as the slowest one
+            cprint(f"\n🤖 AI Agent Analyzing {len(market_data)} Tokens (up to {AI_ANALYSIS_WORKERS} at once)", "white", "on_green")
+            for token, analysis in self.analyze_tokens(list(market_data.items())):
                 print(f"\n📈 Analysis for contract: {token}")
                 print(analysis)
                 print("\n" + "="*50 + "\n")
             
             # Show recommendations summary
             cprint("\n📊 Moon Dev's Trading Recommendations:", "white", "on_blue")
-            summary_df = self.recommendations_df[['token', 'action', 'confidence']].copy()
+            summary_df = self.recommendations.summary_df()
             print(summary_df.to_string(index=False))
             
             # Handle exits first
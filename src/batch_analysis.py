@@ -0,0 +1,272 @@
+"""
+🌙 Moon Dev's Batch Analysis
+One Claude request for many tokens, answered as a JSON array of per-token decisions
+Built with love by Moon Dev 🚀
+
+BATCH_INSTRUCTIONS go into the (cached) system prompt after the trading
+prompt. build_batch_prompt() writes each token's compact feature block under
+a short id (T1, T2, ...) as the user message. parse_batch_response()
+reads back [{id, token, action, confidence, reasoning}]. Only well-formed
+entries are returned, so the caller can fall back to a single-token call for
+anything missing or malformed.
+TokenAnalyzer is the driver both trading agents share: decision cache first,
+then AI_BATCH_SIZE tokens per call on AI_ANALYSIS_WORKERS threads, single-token
+calls for whatever a batch missed, and every recommendation into the agent's
+RecommendationStore.
+"""
+
+import json
+
+from termcolor import cprint
+
+from src.config import *
+from src.concurrency import map_ordered
+from src.decision_cache import decision_cache, decision_key, prompt_version
+from src.prompt_encoder import encode_market_data, report_prompt
+from src.llm_usage import create_message
+
+ACTIONS = ('BUY', 'SELL', 'NOTHING')
+
+BATCH_INSTRUCTIONS = """
+BATCH MODE: you are analyzing several tokens at once. Ignore the single-token response format above.
+Respond with ONLY a JSON array, one object per token, in this exact shape:
+[{"id": "T1", "action": "BUY|SELL|NOTHING", "confidence": 0-100, "reasoning": "2-4 sentences: technicals, strategy signals, risk factors"}]
+Use the id shown above each token's data. Every token must appear exactly once.
+"""
+
+
+def token_ids(tokens):
+    return {f"T{i}": token for i, token in enumerate(tokens, 1)}
+
+
+def build_batch_prompt(items):
+    """User message with one labelled feature block per (token, market_data)"""
+    blocks = []
+    for token_id, (token, data) in zip(token_ids([t for t, _ in items]), items):
+        block = f"### {token_id}\n{encode_market_data(data, token)}"
+        signals = data.get('strategy_signals') if isinstance(data, dict) else None
+        if signals:
+            block += f"\nstrategy_signals={json.dumps(signals, separators=(',', ':'), default=str)}"
+        blocks.append(block)
+    return f"Data to Analyze ({len(items)} tokens):\n\n" + '\n\n'.join(blocks)
+
+
+def _entry(raw):
+    """Validated recommendation fields from one array element, or None"""
+    if not isinstance(raw, dict):
+        return None
+    action = str(raw.get('action', '')).strip().upper()
+    if action not in ACTIONS:
+        return None
+    try:
+        confidence = int(round(float(str(raw.get('confidence', '')).rstrip('%'))))
+    except (TypeError, ValueError):
+        return None
+    reasoning = raw.get('reasoning')
+    if not isinstance(reasoning, str) or not reasoning.strip():
+        return None
+    return {'action': action, 'confidence': max(0, min(100, confidence)), 'reasoning': reasoning.strip()}
+
+
+def parse_batch_response(text, tokens):
+    """{token: {'token', 'action', 'confidence', 'reasoning'}} for every well-formed entry"""
+    start, end = text.find('['), text.rfind(']') + 1
+    if start == -1 or end <= start:
+        return {}
+    try:
+        entries = json.loads(text[start:end])
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(entries, list):
+        return {}
+
+    ids = token_ids(tokens)
+    by_address = set(tokens)
+    parsed = {}
+    for raw in entries:
+        entry = _entry(raw)
+        if entry is None:
+            continue
+        token = ids.get(str(raw.get('id', '')).strip())
+        if token is None and raw.get('token') in by_address:
+            token = raw['token']
+        if token is None or token in parsed:
+            continue  # unknown or answered twice - the first answer stands
+        parsed[token] = {'token': token, **entry}
+    return parsed
+
+
+def response_text(recommendation):
+    """Single-call style response text (action line first) for logs and the decision cache"""
+    return (f"{recommendation['action']}\n{recommendation['reasoning']}\n"
+            f"Confidence: {recommendation['confidence']}%")
+
+
+def message_text(message):
+    """All text blocks of a Claude message joined into one string"""
+    content = message.content
+    if isinstance(content, list):
+        return '\n'.join(item.text if hasattr(item, 'text') else str(item) for item in content)
+    return content
+
+
+def parse_single_response(token, response):
+    """Recommendation from a single-token response (action line first, confidence as a percentage)"""
+    lines = response.split('\n')
+    action = lines[0].strip() if lines else "NOTHING"
+
+    # Extract confidence from the response (assuming it's mentioned as a percentage)
+    confidence = 0
+    for line in lines:
+        if 'confidence' in line.lower():
+            # Extract number from string like "Confidence: 75%"
+            try:
+                confidence = int(''.join(filter(str.isdigit, line)))
+            except:
+                confidence = 50  # Default if not found
+
+    reasoning = '\n'.join(lines[1:]) if len(lines) > 1 else "No detailed reasoning provided"
+    return {'token': token, 'action': action, 'confidence': confidence, 'reasoning': reasoning}
+
+
+class TokenAnalyzer:
+    """Cached, concurrent, batched Claude analysis of many tokens for one agent"""
+
+    def __init__(self, client, prompt, build_prompt, store):
+        self.client = client
+        self.prompt = prompt              # static system prompt (cached)
+        self.build_prompt = build_prompt  # build_prompt(token, market_data) -> user message for one token
+        self.store = store                # RecommendationStore the results go to
+        self.agent = store.agent
+        # Cached decisions are only reused for the prompt + model that produced them
+        self.version = prompt_version(prompt, AI_MODEL, AI_TEMPERATURE)
+
+    def analyze(self, token, market_data):
+        """One token - returns Claude's response text"""
+        recommendation, response = self._analyze(token, market_data)
+        if recommendation:
+            self.store.add([recommendation])
+        return response
+
+    def analyze_tokens(self, items):
+        """Analyze [(token, market_data)] concurrently - returns [(token, response)] in input order"""
+        if AI_BATCH_SIZE > 1 and len(items) > 1:
+            results = self._analyze_batched(items)
+        else:
+            results = map_ordered(lambda item: self._analyze(*item), items, AI_ANALYSIS_WORKERS, label="AI analysis")
+        results = [result or (None, None) for result in results]
+        self.store.add([recommendation for recommendation, _ in results if recommendation])
+        if DECISION_CACHE_ENABLED:
+            stats = decision_cache.stats()
+            cprint(f"♻️ Decision cache: {stats['hits']} hits / {stats['misses']} misses "
+                   f"({stats['hit_rate']:.0%} hit rate, {stats['entries']} stored)", "cyan")
+        return [(token, response) for (token, _), (_, response) in zip(items, results)]
+
+    def _cached(self, token, market_data):
+        """(cache_key, cached (recommendation, response) or None)"""
+        cache_key = decision_key(token, market_data, self.version) if DECISION_CACHE_ENABLED else None
+        cached = decision_cache.get(cache_key) if cache_key else None
+        if cached:
+            print(f"♻️ Reusing cached AI decision for {token[:4]}: {cached[0]['action']}")
+        return cache_key, cached
+
+    def _analyze_batched(self, items):
+        """Cached tokens first, then AI_BATCH_SIZE tokens per Claude call - anything unanswered gets its own call"""
+        results = {}
+        pending = []
+        for token, data in items:
+            if data is None or len(data) == 0 or token in EXCLUDED_TOKENS:
+                results[token] = (None, None)
+                continue
+            cache_key, cached = self._cached(token, data)
+            if cached:
+                results[token] = cached
+                continue
+            pending.append((token, data, cache_key))
+
+        chunks = [pending[i:i + AI_BATCH_SIZE] for i in range(0, len(pending), AI_BATCH_SIZE)]
+        for answered in map_ordered(self._analyze_chunk, chunks, AI_ANALYSIS_WORKERS, label="AI batch analysis"):
+            results.update(answered or {})
+
+        retry = [(token, data) for token, data, _ in pending if token not in results]
+        if retry:
+            cprint(f"⚠️ Batch analysis missed {len(retry)} tokens - analyzing them one by one", "yellow")
+            for (token, _), result in zip(retry, map_ordered(lambda item: self._analyze(*item), retry,
+                                                             AI_ANALYSIS_WORKERS, label="AI analysis")):
+                results[token] = result
+        return [results.get(token) for token, _ in items]
+
+    def _analyze_chunk(self, chunk):
+        """One Claude call for [(token, market_data, cache_key)] - returns {token: (recommendation, response)}"""
+        # Agent prompt + batch format are the cached system prefix, only the data changes per call
+        prompt = build_batch_prompt([(token, data) for token, data, _ in chunk])
+        report_prompt(f"Batch analysis ({len(chunk)} tokens)", self.prompt + BATCH_INSTRUCTIONS + prompt)
+        message = create_message(
+            self.client, self.agent,
+            system=(self.prompt, BATCH_INSTRUCTIONS),
+            model=AI_MODEL,
+            max_tokens=AI_BATCH_MAX_TOKENS,
+            temperature=AI_TEMPERATURE,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=AI_ANALYSIS_TIMEOUT_SECONDS
+        )
+        parsed = parse_batch_response(message_text(message), [token for token, _, _ in chunk])
+
+        answered = {}
+        for token, _, cache_key in chunk:
+            recommendation = parsed.get(token)
+            if recommendation is None:
+                continue
+            response = response_text(recommendation)
+            if cache_key:
+                decision_cache.put(cache_key, (recommendation, response))
+            print(f"🎯 Moon Dev's AI Analysis Complete for {token[:4]}! (batch)")
+            answered[token] = (recommendation, response)
+        return answered
+
+    def _analyze(self, token, market_data):
+        """One Claude call for one token - returns (recommendation, response) without touching shared state"""
+        try:
+            if market_data is None or len(market_data) == 0:
+                return None, None
+
+            # Skip analysis for excluded tokens
+            if token in EXCLUDED_TOKENS:
+                print(f"⚠️ Skipping analysis for excluded token: {token}")
+                return None, None
+
+            # Same market picture as a recent cycle - reuse that decision without calling Claude
+            cache_key, cached = self._cached(token, market_data)
+            if cached:
+                return cached
+
+            # The agent prompt is the cached system prompt - the user message is the compact feature tables
+            prompt = self.build_prompt(token, market_data)
+            report_prompt(f"Analysis {token[:4]}", self.prompt + prompt)
+            message = create_message(
+                self.client, self.agent,
+                system=self.prompt,
+                model=AI_MODEL,
+                max_tokens=AI_MAX_TOKENS,
+                temperature=AI_TEMPERATURE,
+                messages=[{"role": "user", "content": prompt}],
+                timeout=AI_ANALYSIS_TIMEOUT_SECONDS
+            )
+            response = message_text(message)
+            recommendation = parse_single_response(token, response)
+
+            if cache_key:
+                decision_cache.put(cache_key, (recommendation, response))
+
+            print(f"🎯 Moon Dev's AI Analysis Complete for {token[:4]}!")
+            return recommendation, response
+
+        except Exception as e:
+            print(f"❌ Error in AI analysis: {str(e)}")
+            # Still record it (timeouts included), but mark as NOTHING with 0 confidence
+            return {
+                'token': token,
+                'action': "NOTHING",
+                'confidence': 0,
+                'reasoning': f"Error during analysis: {str(e)}"
+            }, None
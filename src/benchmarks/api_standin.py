@@ -0,0 +1,244 @@
+"""
+🌙 Moon Dev's API Stand-in
+Local HTTP server replaying recorded Birdeye, DexScreener, Rugcheck and Solana RPC payloads
+Built with love by Moon Dev 🚀
+
+Every provider is mounted under its own path prefix (/birdeye, /dexscreener,
+/rugcheck, /rpc) and http_client's HTTP_HOST_OVERRIDES points the real hosts at
+it. Timestamps in the replayed payloads are shifted to "now" so the agents see
+live-looking data, and every request is counted per route.
+"""
+
+import os
+import json
+import time
+import copy
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from src.candle_store import timeframe_to_seconds
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+PROVIDERS = {
+    'https://public-api.birdeye.so': 'birdeye',
+    'https://api.dexscreener.com': 'dexscreener',
+    'https://api.rugcheck.xyz': 'rugcheck',
+    'https://api.mainnet-beta.solana.com': 'rpc',
+}
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r') as f:
+        return json.load(f)
+
+
+class ApiStandIn:
+    """Threaded local server - start(), point http_client at host_overrides(), stop()"""
+
+    def __init__(self, latency_ms=0, token_age_seconds=72 * 3600):
+        self.latency_ms = latency_ms
+        self.token_age_seconds = token_age_seconds
+        self.fixtures = {
+            name[:-5]: load_fixture(name)
+            for name in os.listdir(FIXTURES_DIR) if name.endswith('.json')
+        }
+        self.counts = Counter()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def host_overrides(self):
+        return {host: f"{self.base_url}/{prefix}" for host, prefix in PROVIDERS.items()}
+
+    def rpc_url(self):
+        return f"{self.base_url}/rpc"
+
+    def start(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def do_GET(self):
+                standin._dispatch(self, None)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                standin._dispatch(self, body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+
+    def snapshot_counts(self):
+        with self._lock:
+            return dict(self.counts)
+
+    # ---- routing -------------------------------------------------------
+
+    def _count(self, route):
+        with self._lock:
+            self.counts[route] += 1
+
+    def _dispatch(self, handler, body):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        parts = urlsplit(handler.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        segments = [s for s in parts.path.split('/') if s]
+        provider = segments[0] if segments else ''
+        rest = segments[1:]
+
+        try:
+            if provider == 'birdeye':
+                route, payload = self._birdeye(rest, query)
+            elif provider == 'dexscreener':
+                route, payload = 'dexscreener:pairs', self._dexscreener(rest)
+            elif provider == 'rugcheck':
+                route, payload = 'rugcheck:report', self._rugcheck(rest)
+            elif provider == 'rpc':
+                route, payload = self._rpc(json.loads(body or b'{}'))
+            else:
+                route, payload = None, None
+        except Exception as e:
+            route, payload = f"{provider}:error", {'success': False, 'message': str(e)}
+
+        if payload is None:
+            self._count(f"{provider}:unknown")
+            self._respond(handler, 404, {'success': False, 'message': f'no fixture for {parts.path}'})
+            return
+
+        self._count(route)
+        self._respond(handler, 200, payload)
+
+    @staticmethod
+    def _respond(handler, status, payload):
+        out = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(out)))
+        handler.end_headers()
+        handler.wfile.write(out)
+
+    # ---- providers -----------------------------------------------------
+
+    def _birdeye(self, rest, query):
+        path = '/'.join(rest)
+        if path == 'defi/ohlcv':
+            return 'birdeye:ohlcv', self._ohlcv(query)
+        if path == 'v1/wallet/token_list':
+            return 'birdeye:token_list', self.fixtures['birdeye_token_list']
+        if path == 'defi/token_security':
+            return 'birdeye:token_security', self.fixtures['birdeye_token_security']
+        if path == 'defi/token_overview':
+            payload = copy.deepcopy(self.fixtures['birdeye_token_overview'])
+            payload['data']['address'] = query.get('address', '')
+            return 'birdeye:token_overview', payload
+        if path == 'defi/token_creation_info':
+            payload = copy.deepcopy(self.fixtures['birdeye_token_creation_info'])
+            payload['data']['tokenAddress'] = query.get('address', '')
+            return 'birdeye:token_creation_info', payload
+        if path == 'defi/price':
+            return 'birdeye:price', self.fixtures['birdeye_price']
+        if path == 'defi/multi_price':
+            price = self.fixtures['birdeye_price']['data']
+            mints = [m for m in query.get('list_address', '').split(',') if m]
+            return 'birdeye:multi_price', {'success': True, 'data': {m: dict(price) for m in mints}}
+        return f'birdeye:{path}', None
+
+    def _ohlcv(self, query):
+        """Replay the recorded bar pattern over the requested window at the requested resolution"""
+        template = self.fixtures['birdeye_ohlcv']['data']['items']
+        step = timeframe_to_seconds(query.get('type', '15m'))
+        time_from = int(query.get('time_from', 0))
+        time_to = int(query.get('time_to', time.time()))
+        start = time_from - (time_from % step)
+        if start < time_from:
+            start += step
+        start = max(start, time_to - step * 999)
+
+        items = []
+        for unix_time in range(start, time_to + 1, step):
+            bar = template[(unix_time // step) % len(template)]
+            items.append({
+                'address': query.get('address', ''),
+                'type': query.get('type', '15m'),
+                'unixTime': unix_time,
+                'o': bar['o'], 'h': bar['h'], 'l': bar['l'], 'c': bar['c'], 'v': bar['v'],
+            })
+        return {'success': True, 'data': {'items': items}}
+
+    def _dexscreener(self, rest):
+        payload = copy.deepcopy(self.fixtures['dexscreener_pair'])
+        pair = payload['pairs'][0]
+        pair['pairAddress'] = rest[-1] if rest else ''
+        pair['pairCreatedAt'] = int((time.time() - self.token_age_seconds) * 1000)
+        return payload
+
+    def _rugcheck(self, rest):
+        payload = copy.deepcopy(self.fixtures['rugcheck_report'])
+        mint = rest[2] if len(rest) > 2 else ''
+        payload['mint'] = mint
+        for market in payload['markets']:
+            market['mintA'] = mint
+            market['liquidityA'] = mint
+            market['lp']['baseMint'] = mint
+        return payload
+
+    def _rpc(self, request):
+        # Batched JSON-RPC requests come in as a list
+        if isinstance(request, list):
+            results = [self._rpc(item)[1] for item in request]
+            return 'rpc:batch', results
+
+        method = request.get('method', '')
+        params = request.get('params', [])
+        recorded = self.fixtures['rpc']
+        slot = 306000000 + int(time.time()) % 100000
+
+        if method == 'getMultipleAccounts':
+            value = [copy.deepcopy(recorded['getMultipleAccounts']) for _ in params[0]]
+        elif method == 'getAccountInfo':
+            value = copy.deepcopy(recorded['getMultipleAccounts'])
+        elif method == 'getTokenLargestAccounts':
+            value = recorded['getTokenLargestAccounts']
+        elif method == 'getSignaturesForAddress':
+            return f'rpc:{method}', {'jsonrpc': '2.0', 'id': request.get('id'), 'result': recorded['getSignaturesForAddress']}
+        elif method == 'getSignatureStatuses':
+            value = [dict(recorded['getSignatureStatuses'], slot=slot) for _ in params[0]]
+        elif method == 'getLatestBlockhash':
+            value = recorded['getLatestBlockhash']
+        elif method == 'getRecentPrioritizationFees':
+            return f'rpc:{method}', {'jsonrpc': '2.0', 'id': request.get('id'), 'result': recorded['getRecentPrioritizationFees']}
+        else:
+            return f'rpc:{method}', {'jsonrpc': '2.0', 'id': request.get('id'),
+                                     'error': {'code': -32601, 'message': 'Method not found'}}
+
+        return f'rpc:{method}', {'jsonrpc': '2.0', 'id': request.get('id'),
+                                 'result': {'context': {'slot': slot}, 'value': value}}
@@ -0,0 +1,260 @@
+"""
+🌙 Moon Dev's Data Layer Benchmarks
+Times the market-data hot paths against the local API stand-in and writes JSON results
+Built with love by Moon Dev 🚀
+
+Usage:
+    python -m src.benchmarks.run_benchmarks --runs 5 --output bench_HEAD.json
+    python -m src.benchmarks.run_benchmarks --compare bench_main.json
+    python -m src.benchmarks.run_benchmarks --paper --only ai_entry_paper chunk_kill_paper
+
+Each benchmark reports wall time (mean / p50 / p95 / min), peak and retained
+traced memory from one extra tracemalloc run, and the number of requests per
+provider route. Nothing leaves the machine - every provider is served by
+api_standin.ApiStandIn and caches are written to a temp directory. With
+--paper, swaps go through paper_exchange.PaperExchange (backed by the stand-in)
+and the execution benchmarks run as well.
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+import statistics
+import subprocess
+import tracemalloc
+
+os.environ.setdefault("BIRDEYE_API_KEY", "benchmark")  # the data modules refuse to import without one
+
+from src import config
+from src import http_client
+from src import candle_store
+from src import token_registry
+from src import position_ledger
+from src.benchmarks.api_standin import ApiStandIn
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class Workspace:
+    """Temp dirs for the candle store, token registry and position ledger so every cold run starts empty"""
+
+    def __init__(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix='moondev_bench_')
+        self._generation = 0
+
+    def fresh(self):
+        self._generation += 1
+        root = os.path.join(self._tmp.name, str(self._generation))
+        candle_store._default_store = candle_store.CandleStore(root=os.path.join(root, 'candles'))
+        token_registry._default_registry = token_registry.TokenRegistry(path=os.path.join(root, 'token_registry.json'))
+        position_ledger._default_ledger = position_ledger.PositionLedger(path=os.path.join(root, 'position_ledger.json'))
+
+    def cleanup(self):
+        self._tmp.cleanup()
+
+
+def build_benchmarks(workspace, paper=None):
+    """(name, setup, func) triples - setup runs untimed before every measured call"""
+    from src import nice_funcs as n
+    from src.chimpytuts_agents.utils import trading_agent_utils as tau
+    from src.chimpytuts_agents.utils import token_discovery_utils as tdu
+
+    token = config.MONITORED_TOKENS[0]
+
+    def warm(func):
+        def setup():
+            workspace.fresh()
+            with contextlib.redirect_stdout(io.StringIO()):
+                func()
+        return setup
+
+    get_data = lambda: n.get_data(token, config.DAYSBACK_4_DATA, config.DATA_TIMEFRAME)
+    collect_one = lambda: tau.collect_token_data(token)
+
+    benchmarks = [
+        ('fetch_wallet_holdings_og', workspace.fresh, lambda: n.fetch_wallet_holdings_og(config.address)),
+        ('get_data_cold', workspace.fresh, get_data),
+        ('get_data_warm', warm(get_data), get_data),
+        ('collect_token_data_cold', workspace.fresh, collect_one),
+        ('collect_token_data_warm', warm(collect_one), collect_one),
+        ('collect_all_tokens_cold', workspace.fresh, tau.collect_all_tokens),
+        ('check_rugpull_risk_rpc', workspace.fresh, lambda: tdu.check_rugpull_risk_rpc(token)),
+    ]
+    if paper is None:
+        return benchmarks
+
+    def paper_wallet(balances):
+        def setup():
+            workspace.fresh()
+            paper.reset(balances)
+            n.wallet_snapshots.invalidate()
+            n.invalidate_price()
+        return setup
+
+    usdc_only = {config.USDC_ADDRESS: 1000}
+    holding = {config.USDC_ADDRESS: 1000, token: 40 / 0.00123}  # ~$40 of the token at the fixture price
+    return benchmarks + [
+        ('ai_entry_paper', paper_wallet(usdc_only), lambda: n.ai_entry(token, 40)),
+        ('chunk_kill_paper', paper_wallet(holding), lambda: n.chunk_kill(token, config.slippage)),
+        ('close_all_positions_paper', paper_wallet({**holding, **{m: 40 / 0.00123 for m in config.MONITORED_TOKENS[1:]}}),
+         n.close_all_positions),
+    ]
+
+
+def run_benchmark(counters, setup, func, runs, warmup):
+    timings = []
+    requests = {}
+
+    for i in range(warmup + runs):
+        setup()
+        for counter in counters:
+            counter.reset_counts()
+        http_client.reset_latency_stats()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+
+        if i >= warmup:
+            timings.append(elapsed * 1000)
+            requests = {}
+            for counter in counters:
+                requests.update(counter.snapshot_counts())
+
+    # One extra traced run for memory - tracemalloc slows everything down so it is not timed
+    setup()
+    with contextlib.redirect_stdout(io.StringIO()):
+        tracemalloc.start()
+        func()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'runs': runs,
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(_percentile(timings, 50), 3),
+        'p95_ms': round(_percentile(timings, 95), 3),
+        'min_ms': round(min(timings), 3),
+        'peak_alloc_kb': round(peak / 1024, 1),
+        'retained_alloc_kb': round(retained / 1024, 1),
+        'requests_total': sum(requests.values()),
+        'requests': dict(sorted(requests.items())),
+    }
+
+
+def compare(current, baseline_path):
+    """Print p50 / request deltas against an earlier results file"""
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+
+    print(f"\n📊 {baseline.get('commit')} -> {current.get('commit')}", file=sys.stderr)
+    for name, result in current['benchmarks'].items():
+        old = baseline.get('benchmarks', {}).get(name)
+        if not old or 'error' in old or 'error' in result:
+            print(f"  • {name}: {result.get('error') or 'new'}", file=sys.stderr)
+            continue
+        change = (result['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0.0
+        print(f"  • {name}: p50 {old['p50_ms']:.1f}ms -> {result['p50_ms']:.1f}ms ({change:+.1f}%) | "
+              f"requests {old['requests_total']} -> {result['requests_total']} | "
+              f"peak {old['peak_alloc_kb']:.0f}KB -> {result['peak_alloc_kb']:.0f}KB", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Moon Dev's offline data layer benchmarks")
+    parser.add_argument('--runs', type=int, default=5, help='timed runs per benchmark')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs before timing')
+    parser.add_argument('--latency-ms', type=float, default=0, help='artificial per-request latency in the stand-in')
+    parser.add_argument('--token-age-hours', type=float, default=72, help='age the stand-in reports for every pair')
+    parser.add_argument('--rate-limits', action='store_true', help='keep RATE_LIMITS on (off by default so setup calls never drain the budget)')
+    parser.add_argument('--paper', action='store_true', help='route swaps through the paper exchange and add the execution benchmarks')
+    parser.add_argument('--paper-confirm-ms', type=float, default=config.PAPER_CONFIRM_MS, help='paper swap landing delay')
+    parser.add_argument('--paper-failure-rate', type=float, default=0.0, help='fraction of paper swaps that fail')
+    parser.add_argument('--only', nargs='*', help='run only these benchmarks')
+    parser.add_argument('--output', help='write JSON results here (default: stdout)')
+    parser.add_argument('--compare', help='earlier results file to diff against')
+    args = parser.parse_args()
+
+    standin = ApiStandIn(latency_ms=args.latency_ms, token_age_seconds=int(args.token_age_hours * 3600)).start()
+    config.HTTP_HOST_OVERRIDES.update(standin.host_overrides())
+    os.environ["RPC_ENDPOINT"] = standin.rpc_url()
+    if not args.rate_limits:
+        config.RATE_LIMITS.clear()
+
+    paper = None
+    if args.paper:
+        from src.paper_exchange import enable_paper_trading
+        with contextlib.redirect_stdout(io.StringIO()):
+            paper = enable_paper_trading(
+                upstreams={'birdeye': f"{standin.base_url}/birdeye", 'rpc': standin.rpc_url()},
+                latency_ms=args.latency_ms, confirm_ms=args.paper_confirm_ms,
+                failure_rate=args.paper_failure_rate, seed=7,
+            )
+
+    workspace = Workspace()
+    results = {
+        'commit': _git_commit(),
+        'timestamp': int(time.time()),
+        'python': platform.python_version(),
+        'http2': http_client._use_http2(),
+        'settings': {
+            'runs': args.runs,
+            'warmup': args.warmup,
+            'latency_ms': args.latency_ms,
+            'token_age_hours': args.token_age_hours,
+            'rate_limits': args.rate_limits,
+            'paper': args.paper,
+            'monitored_tokens': len(config.MONITORED_TOKENS),
+        },
+        'benchmarks': {},
+    }
+
+    try:
+        for name, setup, func in build_benchmarks(workspace, paper):
+            if args.only and name not in args.only:
+                continue
+            print(f"⏱️  {name}...", file=sys.stderr)
+            try:
+                counters = [standin] if paper is None else [standin, paper]
+                results['benchmarks'][name] = run_benchmark(counters, setup, func, args.runs, args.warmup)
+            except Exception as e:
+                print(f"❌ {name} failed: {e}", file=sys.stderr)
+                results['benchmarks'][name] = {'error': str(e)}
+    finally:
+        standin.stop()
+        if paper is not None:
+            paper.stop()
+        workspace.cleanup()
+        http_client.close_all()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
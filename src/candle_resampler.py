@@ -0,0 +1,87 @@
+"""
+🌙 Moon Dev's Candle Resampler
+Build higher timeframes from one finer Birdeye fetch instead of one request per timeframe
+Built with love by Moon Dev 🚀
+
+Buckets are aligned to the unix epoch (UTC), same as Birdeye's intraday and
+daily candles: open = first, high = max, low = min, close = last, volume = sum.
+3D / 1W / 1M candles use Birdeye's own calendar alignment, so they are always
+fetched from the API.
+"""
+
+import numpy as np
+
+from src.config import *
+from src.candle_store import empty_candles, timeframe_to_seconds
+
+CANDLES_PER_REQUEST = 1000  # Birdeye returns at most this many bars per ohlcv call
+
+
+def resample_candles(candles, target_seconds):
+    """
+    Aggregate candle arrays into target_seconds buckets
+
+    The leading bucket is dropped when the data starts part-way through it, so
+    every returned bar except the still-open last one is built from complete input.
+    """
+    t = candles['unixTime']
+    if len(t) == 0:
+        return empty_candles()
+
+    buckets = t - (t % target_seconds)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(t)]
+
+    out = {
+        'unixTime': buckets[starts],
+        'o': candles['o'][starts],
+        'h': np.fmax.reduceat(candles['h'], starts),
+        'l': np.fmin.reduceat(candles['l'], starts),
+        'c': candles['c'][ends - 1],
+        'v': np.add.reduceat(np.nan_to_num(candles['v']), starts),
+    }
+
+    if t[0] != buckets[0]:
+        out = {col: arr[1:] for col, arr in out.items()}
+    return out
+
+
+def is_derivable(timeframe):
+    seconds = timeframe_to_seconds(timeframe)
+    return seconds <= timeframe_to_seconds(RESAMPLE_MAX_TIMEFRAME)
+
+
+def time_range_seconds(timeframe, token_age_seconds):
+    """Seconds of history get_time_range asks for: 1000 bars, capped at the token's age"""
+    return min(int(token_age_seconds), timeframe_to_seconds(timeframe) * CANDLES_PER_REQUEST)
+
+
+def plan_timeframes(timeframes, token_age_seconds):
+    """
+    Decide which timeframes to fetch and which to derive locally
+
+    Returns (fetch_list, derive_from) where derive_from maps target -> base timeframe.
+    A target is derived from an already planned base when its length is a whole
+    multiple of the base and the base's fetched range covers the target's range.
+    """
+    fetch_list = []
+    derive_from = {}
+    ordered = sorted(dict.fromkeys(timeframes), key=timeframe_to_seconds)
+
+    for tf in ordered:
+        seconds = timeframe_to_seconds(tf)
+        needed = time_range_seconds(tf, token_age_seconds)
+        base = None
+        if RESAMPLE_ENABLED and is_derivable(tf):
+            # Prefer the coarsest base - fewer bars to aggregate
+            for candidate in reversed(fetch_list):
+                if (seconds % timeframe_to_seconds(candidate) == 0
+                        and time_range_seconds(candidate, token_age_seconds) >= needed):
+                    base = candidate
+                    break
+        if base is None:
+            fetch_list.append(tf)
+        else:
+            derive_from[tf] = base
+
+    return fetch_list, derive_from
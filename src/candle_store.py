@@ -0,0 +1,235 @@
+"""
+🌙 Moon Dev's Candle Store
+Persistent incremental OHLCV cache keyed by (address, timeframe)
+Built with love by Moon Dev 🚀
+
+Candles are kept column by column (int64 unixTime + float64 o/h/l/c/v) in one
+.npz file per key. Each call only asks Birdeye for bars newer than the last
+stored unixTime (plus a small overlap to repair the still-open bar). The
+earliest start already fetched is stored with the bars, so a young token whose
+first bar is later than the requested start is not backfilled again on every call.
+"""
+
+import os
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+from termcolor import cprint
+
+from src.config import *
+
+COLUMNS = ('unixTime', 'o', 'h', 'l', 'c', 'v')
+
+TIMEFRAME_UNITS = {
+    'm': 60,
+    'H': 3600,
+    'D': 86400,
+    'W': 604800,
+    'M': 2592000
+}
+
+
+def timeframe_to_seconds(timeframe):
+    """Convert a Birdeye timeframe string like '15m' or '4H' to seconds"""
+    number = int(''.join(filter(str.isdigit, timeframe)))
+    unit = ''.join(filter(str.isalpha, timeframe))
+    return number * TIMEFRAME_UNITS[unit]
+
+
+def empty_candles():
+    return {
+        col: np.empty(0, dtype=np.int64 if col == 'unixTime' else np.float64)
+        for col in COLUMNS
+    }
+
+
+def items_to_candles(items):
+    """Convert Birdeye ohlcv items into column arrays sorted by unixTime"""
+    if not items:
+        return empty_candles()
+
+    candles = {'unixTime': np.fromiter((item['unixTime'] for item in items), dtype=np.int64, count=len(items))}
+    for col in COLUMNS[1:]:
+        candles[col] = np.array([item.get(col) for item in items], dtype=np.float64)
+
+    order = np.argsort(candles['unixTime'], kind='stable')
+    return {col: arr[order] for col, arr in candles.items()}
+
+
+def merge_candles(old, new):
+    """Merge two candle sets - bars in `new` replace bars with the same unixTime in `old`"""
+    if len(old['unixTime']) == 0:
+        return new
+    if len(new['unixTime']) == 0:
+        return old
+
+    keep = ~np.isin(old['unixTime'], new['unixTime'])
+    merged = {col: np.concatenate([old[col][keep], new[col]]) for col in COLUMNS}
+    order = np.argsort(merged['unixTime'], kind='stable')
+    return {col: arr[order] for col, arr in merged.items()}
+
+
+def slice_candles(candles, time_from, time_to):
+    """Keep only bars with time_from <= unixTime <= time_to"""
+    t = candles['unixTime']
+    lo = np.searchsorted(t, time_from, side='left')
+    hi = np.searchsorted(t, time_to, side='right')
+    return {col: arr[lo:hi] for col, arr in candles.items()}
+
+
+def candles_to_ohlcv_frame(candles, now=None, min_rows=0, fill_value=None):
+    """
+    Build the Datetime (UTC) / Open / High / Low / Close / Volume frame straight from candle arrays
+
+    Future bars are dropped with an integer comparison, frames shorter than
+    min_rows are front-padded by repeating the first bar, and the DataFrame is
+    constructed once from whole columns.
+    """
+    now = int(time.time()) if now is None else now
+    keep = candles['unixTime'] <= now
+    columns = {col: arr[keep] for col, arr in candles.items()}
+
+    count = len(columns['unixTime'])
+    if 0 < count < min_rows:
+        order = np.concatenate([np.zeros(min_rows - count, dtype=np.int64), np.arange(count)])
+        columns = {col: arr[order] for col, arr in columns.items()}
+
+    if fill_value is not None:
+        columns = {col: (arr if col == 'unixTime' else np.nan_to_num(arr, nan=fill_value)) for col, arr in columns.items()}
+
+    return pd.DataFrame({
+        'Datetime (UTC)': pd.to_datetime(columns['unixTime'], unit='s'),
+        'Open': columns['o'],
+        'High': columns['h'],
+        'Low': columns['l'],
+        'Close': columns['c'],
+        'Volume': columns['v'],
+    })
+
+
+class CandleStore:
+    """On-disk + in-memory candle cache"""
+
+    def __init__(self, root=CANDLE_STORE_DIR, overlap_bars=CANDLE_STORE_OVERLAP_BARS, max_bars=CANDLE_STORE_MAX_BARS):
+        self.root = root
+        self.overlap_bars = overlap_bars
+        self.max_bars = max_bars
+        self._memory = {}
+        self._covered = {}  # key -> earliest time_from already fetched (nothing older exists on Birdeye)
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, address, timeframe):
+        # Use seconds in the file name so '1m' and '1M' never collide on case-insensitive disks
+        return os.path.join(self.root, f"{address}_{timeframe_to_seconds(timeframe)}s.npz")
+
+    def load(self, address, timeframe):
+        """Load stored candles for a key (memory first, then disk)"""
+        key = (address, timeframe)
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+
+        path = self._path(address, timeframe)
+        candles = empty_candles()
+        covered = None
+        if os.path.exists(path):
+            try:
+                with np.load(path) as data:
+                    candles = {col: data[col] for col in COLUMNS}
+                    if 'covered_from' in data.files:
+                        covered = int(data['covered_from'])
+            except Exception as e:
+                cprint(f"⚠️ Moon Dev's candle store could not read {path}: {str(e)}", "yellow")
+
+        with self._lock:
+            self._memory[key] = candles
+            self._covered[key] = covered
+        return candles
+
+    def covered_from(self, address, timeframe):
+        """Earliest start already fetched for a key - the first stored bar when unknown"""
+        candles = self.load(address, timeframe)
+        with self._lock:
+            covered = self._covered.get((address, timeframe))
+        if covered is None and len(candles['unixTime']):
+            return int(candles['unixTime'][0])
+        return covered
+
+    def save(self, address, timeframe, candles, covered_from=None, keep_from=None):
+        """
+        Persist candles for a key, keeping the newest max_bars
+
+        Bars at or after keep_from (the window just requested) are always kept,
+        so a request wider than max_bars is not re-fetched on every call.
+        """
+        t = candles['unixTime']
+        start = max(len(t) - self.max_bars, 0)
+        if keep_from is not None:
+            start = min(start, int(np.searchsorted(t, keep_from, side='left')))
+        if start:
+            candles = {col: arr[start:] for col, arr in candles.items()}
+            covered_from = int(candles['unixTime'][0]) if covered_from is None else max(covered_from, int(candles['unixTime'][0]))
+
+        path = self._path(address, timeframe)
+        tmp_path = f"{path}.tmp"
+        extra = {} if covered_from is None else {'covered_from': np.array(covered_from, dtype=np.int64)}
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **candles, **extra)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._memory[(address, timeframe)] = candles
+            self._covered[(address, timeframe)] = covered_from
+        return candles
+
+    def get_candles(self, address, timeframe, time_from, time_to, fetch):
+        """
+        Return candles for [time_from, time_to], fetching only what is missing
+
+        fetch(time_from, time_to) must return a list of Birdeye ohlcv items, or None on failure
+        """
+        stored = self.load(address, timeframe)
+        covered = self.covered_from(address, timeframe)
+        tf_seconds = timeframe_to_seconds(timeframe)
+        t = stored['unixTime']
+
+        if len(t) == 0 or t[-1] < time_from:
+            items = fetch(time_from, time_to)
+            if items is None:
+                return None
+            merged = merge_candles(stored, items_to_candles(items))
+            covered = time_from
+        else:
+            merged = stored
+
+            # Older bars than we have already fetched were asked for - backfill the gap once
+            if time_from < covered - tf_seconds:
+                items = fetch(time_from, covered)
+                if items is None:
+                    return None
+                merged = merge_candles(merged, items_to_candles(items))
+                covered = time_from
+
+            # Only pull bars after the last stored one, re-fetching the overlap to fix the open candle
+            fetch_from = max(time_from, int(t[-1]) - self.overlap_bars * tf_seconds)
+            items = fetch(fetch_from, time_to)
+            if items is None:
+                return None
+            merged = merge_candles(merged, items_to_candles(items))
+
+        merged = self.save(address, timeframe, merged, covered_from=covered, keep_from=time_from)
+        return slice_candles(merged, time_from, time_to)
+
+
+_default_store = None
+
+
+def get_candle_store():
+    """Shared store used by every get_data implementation"""
+    global _default_store
+    if _default_store is None:
+        _default_store = CandleStore()
+    return _default_store
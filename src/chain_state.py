@@ -0,0 +1,154 @@
+"""
+🌙 Moon Dev's Chain State Refresher
+Background thread keeping a recent blockhash and a priority-fee estimate in memory
+Built with love by Moon Dev 🚀
+
+Every CHAIN_STATE_REFRESH_SECONDS one batched JSON-RPC call fetches
+getLatestBlockhash and getRecentPrioritizationFees (two plain calls on RPCs
+that reject batches). market_buy / market_sell
+read the fee from memory, so a swap never waits on these calls. Jupiter builds
+the swap transaction with its own blockhash. The cached block height is used
+by the confirmation tracker to tell when a swap's blockhash has expired.
+"""
+
+import os
+import time
+import threading
+
+from termcolor import cprint
+
+from src.config import *
+from src import http_client
+
+BLOCKHASH_VALID_BLOCKS = 150  # lastValidBlockHeight = current block height + 150
+
+
+def fee_percentile(fees, pct):
+    """pct-th percentile of non-zero micro-lamport fees (None when the sample is empty)"""
+    fees = sorted(f for f in fees if f)
+    if not fees:
+        return None
+    index = min(len(fees) - 1, max(0, int(round(pct / 100 * (len(fees) - 1)))))
+    return fees[index]
+
+
+class ChainState:
+    """Latest blockhash / block height / priority fee, refreshed off the critical path"""
+
+    def __init__(self, rpc_url=None, interval=CHAIN_STATE_REFRESH_SECONDS):
+        self.rpc_url = rpc_url
+        self.interval = interval
+        self.blockhash = None
+        self.last_valid_block_height = None
+        self.fee_micro_lamports = None  # per compute unit
+        self.updated_at = None
+        self.failures = 0
+        self.batch_requests = True  # switched off once the RPC is seen rejecting JSON-RPC batches
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _rpc(self):
+        return self.rpc_url or os.getenv("RPC_ENDPOINT")
+
+    def start(self):
+        """Start the refresher thread (no-op when it is already running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='moondev-chain-state', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def _call(self, method, params):
+        """One plain JSON-RPC request - returns its result"""
+        reply = http_client.post(self._rpc(), json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params}).json()
+        if reply.get('error'):
+            raise ValueError(f"{method}: {reply['error']}")
+        return reply['result']
+
+    def _fetch(self):
+        """(latest blockhash value, prioritization fee entries) - batched when the RPC allows it"""
+        calls = [("getLatestBlockhash", [{"commitment": "confirmed"}]), ("getRecentPrioritizationFees", [])]
+        if self.batch_requests:
+            payload = [{"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+                       for i, (method, params) in enumerate(calls, 1)]
+            try:
+                replies = {r.get('id'): r for r in http_client.post(self._rpc(), json=payload).json()}
+                return replies[1]['result']['value'], replies[2].get('result') or []
+            except Exception:
+                pass  # some providers reject array requests - try the calls one by one
+
+        blockhash = self._call(*calls[0])['value']
+        fees = self._call(*calls[1]) or []
+        if self.batch_requests:
+            self.batch_requests = False
+            cprint("⚠️ Moon Dev's RPC rejected a batched request - chain state now uses separate calls", "yellow")
+        return blockhash, fees
+
+    def refresh(self):
+        """One batched getLatestBlockhash + getRecentPrioritizationFees round trip"""
+        try:
+            blockhash, fee_entries = self._fetch()
+            fees = [f.get('prioritizationFee', 0) for f in fee_entries]
+        except Exception as e:
+            self.failures += 1
+            if self.failures == 1 or self.failures % 30 == 0:
+                cprint(f"⚠️ Moon Dev's chain state refresh failed: {str(e)}", "yellow")
+            return False
+
+        estimate = fee_percentile(fees, PRIORITY_FEE_PERCENTILE)
+        with self._lock:
+            self.blockhash = blockhash['blockhash']
+            self.last_valid_block_height = blockhash['lastValidBlockHeight']
+            if estimate is not None:
+                self.fee_micro_lamports = estimate
+            self.updated_at = time.monotonic()
+            self.failures = 0
+        return True
+
+    def age(self):
+        return time.monotonic() - self.updated_at if self.updated_at is not None else None
+
+    def is_fresh(self):
+        age = self.age()
+        return age is not None and age <= CHAIN_STATE_MAX_AGE_SECONDS
+
+    def block_height(self):
+        """Estimated current block height, None when the cache is stale"""
+        with self._lock:
+            if self.last_valid_block_height is None or not self.is_fresh():
+                return None
+            return self.last_valid_block_height - BLOCKHASH_VALID_BLOCKS
+
+    def priority_fee_lamports(self):
+        """Total priority fee for one swap - falls back to PRIORITY_FEE until an estimate exists"""
+        with self._lock:
+            micro = self.fee_micro_lamports
+        if not PRIORITY_FEE_DYNAMIC or micro is None or not self.is_fresh():
+            return PRIORITY_FEE
+        lamports = int(micro * PRIORITY_FEE_COMPUTE_UNITS / 1_000_000)
+        return max(PRIORITY_FEE_MIN_LAMPORTS, min(PRIORITY_FEE_MAX_LAMPORTS, lamports))
+
+    def stats(self):
+        return {
+            'blockhash': self.blockhash,
+            'block_height': self.block_height(),
+            'fee_micro_lamports': self.fee_micro_lamports,
+            'priority_fee_lamports': self.priority_fee_lamports(),
+            'age_seconds': self.age(),
+            'failures': self.failures,
+        }
+
+
+# Shared instance - market_buy / market_sell start it on first use
+chain_state = ChainState()
@@ -10,12 +10,30 @@ from .utils.trading_agent_utils import collect_all_tokens
 from datetime import datetime, timedelta
 import time
 from src.config import *
+from src.liquidation import eligible_positions, liquidate_positions
+from src.prompt_encoder import encode_frame, report_prompt
+from src.llm_usage import create_message
 from src.agents.base_agent import BaseAgent
 from .prompts.risk_prompt import RISK_OVERRIDE_PROMPT  # Added this import
 
 # Load environment variables
 load_dotenv()
 
+# Static part of the limit breach question - sent as the cached system prompt
+RISK_BREACH_PROMPT = """
+You are Moon Dev's Risk Agent 🛡️ and a portfolio risk limit has just been breached.
+
+Should we close all positions immediately? Consider:
+1. Market conditions
+2. Position sizes
+3. Recent price action
+4. Risk of further losses
+
+Respond with:
+CLOSE_ALL or HOLD_POSITIONS
+Then explain your reasoning.
+"""
+
 class RiskAgent():
     def __init__(self):
         """Initialize Moon Dev's Risk Agent 🛡️"""
@@ -135,9 +153,7 @@ class RiskAgent():
             # Get 2h of 5m data
             data_5m = n.get_data(token, 0.083, '5m')   # 2 hours = 0.083 days
             
-            return {
-                '5m': data_5m.to_dict() if data_5m is not None else None
-            }
+            return encode_frame(data_5m)  # compact candle table instead of DataFrame.to_dict()
         except Exception as e:
             cprint(f"❌ Error getting data for {token}: {str(e)}", "white", "on_red")
             return None
@@ -147,9 +163,7 @@ class RiskAgent():
         try:
             # Get 8h of 15m data
             data_15m = n.get_data(token, 0.33, '15m')  # 8 hours = 0.33 days            
-            return {
-                '15m': data_15m.to_dict() if data_15m is not None else None,
-            }
+            return encode_frame(data_15m)  # compact candle table instead of DataFrame.to_dict()
         except Exception as e:
             cprint(f"❌ Error getting data for {token}: {str(e)}", "white", "on_red")
             return None
@@ -167,7 +181,7 @@ class RiskAgent():
         """Ask AI if we should override the limit based on recent market data"""
         try:
             # Get current positions first
-            positions = n.fetch_wallet_holdings_og(address)
+            positions = n.get_wallet_snapshot(address).df
             
             # Filter for tokens that are both in MONITORED_TOKENS and in our positions
             positions = positions[
@@ -248,8 +262,8 @@ class RiskAgent():
                 # Format prompt for AI analysis
                 prompt = RISK_OVERRIDE_PROMPT.format(
                     limit_type=limit_type,
-                    position_data_5m=json.dumps({token: token_data_5m}, indent=2),  # Send data for the specific token
-                    position_data_15m=json.dumps({token: token_data_15m}, indent=2),  # Send data for the specific token
+                    position_data_5m=f"{token} 5m:\n{token_data_5m['data']}",  # Send data for the specific token
+                    position_data_15m=f"{token} 15m:\n{token_data_15m['data']}",  # Send data for the specific token
                     start_value = start_value,
                     current_value = current_value,
                     percent_change = percent_change,
@@ -260,7 +274,9 @@ class RiskAgent():
                 )
 
                 cprint(f"🤖 AI Agent analyzing market data for {token}...", "white", "on_green")
-                message = self.client.messages.create(
+                report_prompt(f"Risk override {token[:4]}", prompt)
+                message = create_message(
+                    self.client, "risk override",  # RISK_OVERRIDE_PROMPT interleaves per-position data, nothing static to cache
                     model=config.AI_MODEL,
                     max_tokens=config.AI_MAX_TOKENS,
                     temperature=config.AI_TEMPERATURE,
@@ -298,7 +314,7 @@ class RiskAgent():
             self.current_value = self.get_portfolio_value()
 
             # Check if there are any monitored tokens in the current value
-            holdings = n.fetch_wallet_holdings_og(address)  # Fetch current holdings
+            holdings = n.get_wallet_snapshot(address).df  # Current holdings from this cycle's snapshot
             monitored_positions = holdings[holdings['Mint Address'].isin(MONITORED_TOKENS)]
 
             if monitored_positions.empty:
@@ -348,7 +364,7 @@ class RiskAgent():
             cprint("\n🔄 Closing monitored positions...", "white", "on_cyan")
             
             # Get all positions
-            positions = n.fetch_wallet_holdings_og(address)
+            positions = n.get_wallet_snapshot(address).df
             
             # Debug print to see what we're working with
             cprint("\n📊 Current positions:", "cyan")
@@ -357,26 +373,17 @@ class RiskAgent():
             print(MONITORED_TOKENS)
             
             # Filter for tokens that are both in MONITORED_TOKENS and not in EXCLUDED_TOKENS
-            positions = positions[
-                positions['Mint Address'].isin(MONITORED_TOKENS) & 
-                ~positions['Mint Address'].isin(EXCLUDED_TOKENS)
-            ]
+            positions = eligible_positions(positions, only=MONITORED_TOKENS, exclude=EXCLUDED_TOKENS)
             
             if positions.empty:
                 cprint("📝 No monitored positions to close", "white", "on_blue")
                 return
                 
-            # Close each monitored position
-            for _, row in positions.iterrows():
-                token = row['Mint Address']
-                value = row['USD Value']
-                
-                cprint(f"\n💰 Closing position: {token} (${value:.2f})", "white", "on_cyan")
-                try:
-                    n.chunk_kill(token, slippage)
-                    cprint(f"✅ Successfully closed position for {token}", "white", "on_green")
-                except Exception as e:
-                    cprint(f"❌ Error closing position for {token}: {str(e)}", "white", "on_red")
+            # Close every monitored position at once, biggest first
+            results = liquidate_positions(positions, lambda token: n.chunk_kill(token, slippage))
+            if not all(r['closed'] for r in results.values()):
+                cprint("⚠️ Some monitored positions are still open", "white", "on_red")
+                return
                     
             cprint("\n✨ All monitored positions closed", "white", "on_green")
             
@@ -386,6 +393,9 @@ class RiskAgent():
     def check_risk_limits(self):
         """Check if any risk limits have been breached"""
         try:
+            # Download the wallet once - every balance read below uses this snapshot
+            n.refresh_wallet_snapshot(address)
+
             # Get current PnL
             current_pnl = self.get_current_pnl()
             current_balance = self.get_portfolio_value()
@@ -429,8 +439,8 @@ class RiskAgent():
                 self.close_all_positions()
                 return
                 
-            # Get all current positions using fetch_wallet_holdings_og
-            positions_df = n.fetch_wallet_holdings_og(address)
+            # Get all current positions from this cycle's wallet snapshot
+            positions_df = n.get_wallet_snapshot(address).df
             
             # Prepare breach context
             if breach_type == "MINIMUM_BALANCE":
@@ -453,19 +463,11 @@ class RiskAgent():
 {context}
 
 {positions_str}
-
-Should we close all positions immediately? Consider:
-1. Market conditions
-2. Position sizes
-3. Recent price action
-4. Risk of further losses
-
-Respond with:
-CLOSE_ALL or HOLD_POSITIONS
-Then explain your reasoning.
 """
             # Get AI decision
-            message = self.client.messages.create(
+            message = create_message(
+                self.client, "risk breach",
+                system=RISK_BREACH_PROMPT,
                 model=AI_MODEL,
                 max_tokens=AI_MAX_TOKENS,
                 temperature=AI_TEMPERATURE,
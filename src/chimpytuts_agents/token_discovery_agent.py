@@ -10,6 +10,7 @@ from termcolor import cprint
 from dotenv import load_dotenv
 from .utils.token_discovery_utils import get_new_listings, check_rugpull_risk_rpc
 from src.config import MAX_TOKENS_TO_BE_MONITORED
+from src.llm_usage import create_message
 from .prompts.token_discorver_prompt import TOKEN_EVALUATION_PROMPT  # Added this import
 
 load_dotenv()
@@ -72,7 +73,8 @@ class TokenDiscoveryAgent:
                   #      cprint(final_prompt, "white")
                         cprint("-" * 80, "cyan")
                         
-                        message = self.client.messages.create(
+                        message = create_message(
+                            self.client, "token discovery",
                             model="claude-3-sonnet-20240229",
                             max_tokens=1000,
                             temperature=0.7,
@@ -15,6 +15,10 @@ import time
 # Local imports
 from src.config import *
 from src import nice_funcs as n
+from src.prompt_encoder import encode_market_data
+from src.batch_analysis import TokenAnalyzer
+from src.llm_usage import create_message
+from src.recommendation_store import RecommendationStore
 from .utils.trading_agent_utils import collect_all_tokens
 from .prompts.trading_prompt import TRADING_PROMPT  # Added this import
 from .prompts.trading_prompt import ALLOCATION_PROMPT  # Added this import
@@ -25,95 +29,28 @@ load_dotenv()
 class TradingAgent:
     def __init__(self):
         self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_KEY"))
-        self.recommendations_df = pd.DataFrame(columns=['token', 'action', 'confidence', 'reasoning'])
+        self.recommendations = RecommendationStore("trading")
+        # Cache lookup, batching and concurrent fan-out live in the shared analyzer - only the user message is ours
+        self.analyzer = TokenAnalyzer(self.client, TRADING_PROMPT, self._build_prompt, self.recommendations)
         print("🤖 Moon Dev's LLM Trading Agent initialized!")
 
     def analyze_market_data(self, token, market_data):
         """Analyze market data using Claude"""
-        try:
-            if not market_data:
-                return None
-            
-            # Skip analysis for excluded tokens
-            if token in EXCLUDED_TOKENS:
-                print(f"⚠️ Skipping analysis for excluded token: {token}")
-                return None
-            
-            # Prepare analysis data with the new structure
-            analysis_data = {
-                "token_address": token,
-                "pair_analytics": market_data['pair_analytics'],
-                "ohlcv_data": market_data['ohlcv_data']
-            }
-            
-            # Format the complete prompt
-            prompt = f"{TRADING_PROMPT}\n\nData to Analyze:\n{json.dumps(analysis_data, indent=2)}"
-            
-            # Print the prompt for debugging
-            cprint("\n🤖 Sending prompt to AI:", "cyan")
-            cprint(prompt, "white")
-            
-            message = self.client.messages.create(
-                model=AI_MODEL,
-                max_tokens=AI_MAX_TOKENS,
-                temperature=AI_TEMPERATURE,
-                messages=[{
-                    "role": "user", 
-                    "content": prompt
-                }]
-            )
-            
-            # Parse the response - handle both string and list responses
-            response = message.content
-            if isinstance(response, list):
-                # Extract text from TextBlock objects if present
-                response = '\n'.join([
-                    item.text if hasattr(item, 'text') else str(item)
-                    for item in response
-                ])
-            
-            lines = response.split('\n')
-            action = lines[0].strip() if lines else "NOTHING"
-            
-            # Extract confidence from the response (assuming it's mentioned as a percentage)
-            confidence = 0
-            for line in lines:
-                if 'confidence' in line.lower():
-                    # Extract number from string like "Confidence: 75%"
-                    try:
-                        confidence = int(''.join(filter(str.isdigit, line)))
-                    except:
-                        confidence = 50  # Default if not found
-            
-            # Add to recommendations DataFrame with proper reasoning
-            reasoning = '\n'.join(lines[1:]) if len(lines) > 1 else "No detailed reasoning provided"
-            self.recommendations_df = pd.concat([
-                self.recommendations_df,
-                pd.DataFrame([{
-                    'token': token,
-                    'action': action,
-                    'confidence': confidence,
-                    'reasoning': reasoning
-                }])
-            ], ignore_index=True)
-            
-            print(f"🎯 Moon Dev's AI Analysis Complete for {token[:4]}!")
-            return response
-            
-        except Exception as e:
-            print(f"❌ Error in AI analysis: {str(e)}")
-            # Still add to DataFrame even on error, but mark as NOTHING with 0 confidence
-            self.recommendations_df = pd.concat([
-                self.recommendations_df,
-                pd.DataFrame([{
-                    'token': token,
-                    'action': "NOTHING",
-                    'confidence': 0,
-                    'reasoning': f"Error during analysis: {str(e)}"
-                }])
-            ], ignore_index=True)
-            return None
-    
+        return self.analyzer.analyze(token, market_data)
+
+    def analyze_tokens(self, items):
+        """Analyze [(token, market_data)] concurrently - returns [(token, response)] in input order"""
+        return self.analyzer.analyze_tokens(items)
+
+    def _build_prompt(self, token, market_data):
+        """User message for one token - just the compact feature tables (TRADING_PROMPT is the system prompt)"""
+        prompt = f"Data to Analyze:\n{encode_market_data(market_data, token)}"
+
+        # Print the prompt for debugging
+        cprint("\n🤖 Sending prompt to AI:", "cyan")
+        cprint(prompt, "white")
+        return prompt
+
     def allocate_portfolio(self):
         """Get AI-recommended portfolio allocation"""
         try:
@@ -121,18 +58,13 @@ class TradingAgent:
             max_position_size = usd_size * (MAX_POSITION_PERCENTAGE / 100)
             cprint(f"🎯 Maximum position size: ${max_position_size:.2f} ({MAX_POSITION_PERCENTAGE}% of ${usd_size:.2f})", "cyan")
             
-            # Get allocation from AI
-            message = self.client.messages.create(
-                model=AI_MODEL,
-                max_tokens=AI_MAX_TOKENS,
-                temperature=AI_TEMPERATURE,
-                messages=[{
-                    "role": "user", 
-                    "content": f"""You are Moon Dev's Portfolio Allocation AI 🌙
+            # Get allocation from AI - the brief is the static (cached) system prompt, the sizes go in the user message
+            message = create_message(
+                self.client, "allocation",
+                system=f"""You are Moon Dev's Portfolio Allocation AI 🌙
 
 Given:
-- Total portfolio size: ${usd_size}
-- Maximum position size: ${max_position_size} ({MAX_POSITION_PERCENTAGE}% of total)
+- Maximum position size: {MAX_POSITION_PERCENTAGE}% of the total portfolio size
 - Minimum cash (USDC) buffer: {CASH_PERCENTAGE}%
 - Available tokens: {MONITORED_TOKENS}
 - USDC Address: {USDC_ADDRESS}
@@ -147,7 +79,15 @@ Example format:
 {{
     "token_address": amount_in_usd,
     "{USDC_ADDRESS}": remaining_cash_amount  # Use exact USDC address
-}}"""
+}}""",
+                model=AI_MODEL,
+                max_tokens=AI_MAX_TOKENS,
+                temperature=AI_TEMPERATURE,
+                messages=[{
+                    "role": "user", 
+                    "content": f"Total portfolio size: ${usd_size}\n"
+                               f"Maximum position size: ${max_position_size}\n\n"
+                               "Provide the portfolio allocation."
                 }]
             )
             
@@ -309,29 +249,38 @@ Example format:
             current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             cprint(f"\n⏰ AI Agent Run Starting at {current_time}", "white", "on_green")
             
+            # Decisions from earlier runs stay in the journal - exits and allocations only see this run's
+            cycle = self.recommendations.new_cycle()
+            cprint(f"🗂️ Recommendation cycle {cycle}", "white", "on_blue")
+
             # Collect OHLCV data for all tokens
             cprint("📊 Collecting market data...", "white", "on_blue")
             market_data = collect_all_tokens()
             
+            # Download the wallet once - every balance read this cycle uses this snapshot
+            n.refresh_wallet_snapshot(address)
+
             # Get current portfolio tokens
             current_portfolio_tokens = [token for token in MONITORED_TOKENS if n.get_token_balance_usd(token) > 0]
 
             # Analyze each token's data that is monitored but not in the current portfolio
+            to_analyze = []
             for token, data in market_data.items():
                 if token in current_portfolio_tokens:
                     print(f"⚠️ Skipping analysis for token already in portfolio: {token}")
                     continue  # Skip tokens already in the portfolio
-                
-                cprint(f"\n🤖 AI Agent Analyzing Token: {token}", "white", "on_green")
-                            
-                analysis = self.analyze_market_data(token, data)
+                to_analyze.append((token, data))
+
+            # All Claude calls run together - the stage takes about as long as the slowest one
+            cprint(f"\n🤖 AI Agent Analyzing {len(to_analyze)} Tokens (up to {AI_ANALYSIS_WORKERS} at once)", "white", "on_green")
+            for token, analysis in self.analyze_tokens(to_analyze):
                 print(f"\n📈 Analysis for contract: {token}")
                 print(analysis)
                 print("\n" + "="*50 + "\n")
             
             # Show recommendations summary
             cprint("\n📊 Moon Dev's Trading Recommendations:", "white", "on_blue")
-            summary_df = self.recommendations_df[['token', 'action', 'confidence']].copy()
+            summary_df = self.recommendations.summary_df()
             print(summary_df.to_string(index=False))
                         
             # Then proceed with new allocations
@@ -9,7 +9,6 @@ import time
 import json
 import numpy as np
 import datetime
-import pandas_ta as ta
 from datetime import datetime, timedelta
 from termcolor import colored, cprint
 import solders
@@ -18,6 +17,8 @@ import shutil
 import atexit
 import pytz
 from solders.pubkey import Pubkey
+from src import http_client
+from src.token_registry import get_token_registry
 
 BIRDEYE_API_KEY = os.getenv("BIRDEYE_API_KEY")
 if not BIRDEYE_API_KEY:
@@ -40,7 +41,7 @@ def token_overview(address):
     overview_url = f"{BIRDEYE_URL}/token_overview?address={address}"
     headers = {"X-API-KEY": BIRDEYE_API_KEY}
 
-    response = requests.get(overview_url, headers=headers)
+    response = http_client.get(overview_url, headers=headers)
     result = {}
 
     if response.status_code == 200:
@@ -79,7 +80,7 @@ def token_security_info(address):
     url = f"{BIRDEYE_URL}/token_security?address={address}"
     headers = {"X-API-KEY": BIRDEYE_API_KEY}
 
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url, headers=headers)
     
     if response.status_code == 200:
         security_data = response.json().get('data', {})
@@ -129,7 +130,7 @@ def get_trending_tokens():
     """Fetch trending tokens from Birdeye API"""
     try:
         endpoint = f"{BIRDEYE_URL}/token_trending"
-        response = requests.get(endpoint, headers={"X-API-KEY": BIRDEYE_API_KEY})
+        response = http_client.get(endpoint, headers={"X-API-KEY": BIRDEYE_API_KEY})
         response.raise_for_status()
         
         data = response.json()
@@ -147,7 +148,7 @@ def get_new_listings():
     """Fetch newly listed tokens from DexScreener API"""
     try:
         endpoint = f"{DEXSCREENER_URL}/token-profiles/latest/v1"
-        response = requests.get(endpoint)
+        response = http_client.get(endpoint)
         response.raise_for_status()
         
         data = response.json()
@@ -205,7 +206,7 @@ def check_rugcheck_report(token_address):
     """
     try:
         rugcheck_url = f"{RUG_CHECK_URL}/v1/tokens/{token_address}/report"
-        rugcheck_response = requests.get(rugcheck_url)
+        rugcheck_response = http_client.get(rugcheck_url)
         
         result = {
             'liquidity_locked': False,
@@ -338,33 +339,12 @@ def check_rugpull_risk_rpc(token_address, test_amount=1000000):
             cprint("❌ Failed to get token security information", "red")
             return None
         
-        # First, let's check if this is a Token2022 token
-        program_check_payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getAccountInfo",
-            "params": [
-                token_address,
-                {
-                    "encoding": "jsonParsed",
-                    "commitment": "confirmed"
-                }
-            ]
-        }
-
-        program_response = requests.post(os.getenv("RPC_ENDPOINT"), json=program_check_payload)
-        if not program_response.status_code == 200:
-            cprint("❌ Failed to get token information", "red")
-            return None
-
-        program_data = program_response.json()
-        if not program_data.get('result'):
+        # First, let's check if this is a Token2022 token (program owner is cached in the token registry)
+        program_id = get_token_registry().program(token_address)
+        if not program_id:
             cprint("❌ No token data found", "red")
             return None
 
-        # Get the program ID (owner)
-        program_id = program_data['result']['value']['owner']
-
         TOKEN_2022 = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"
         TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
         
@@ -406,7 +386,7 @@ def check_rugpull_risk_rpc(token_address, test_amount=1000000):
                 "params": [token_address]
             }
             
-            response_largest = requests.post(os.getenv("RPC_ENDPOINT"), json=payload_largest)
+            response_largest = http_client.post(os.getenv("RPC_ENDPOINT"), json=payload_largest)
             if response_largest.status_code == 200:
                 largest_data = response_largest.json()
                 if 'result' in largest_data:
@@ -492,7 +472,7 @@ def check_rugpull_risk_rpc(token_address, test_amount=1000000):
                             ]
                         }
                         
-                        mint_response = requests.post(os.getenv("RPC_ENDPOINT"), json=mint_payload)
+                        mint_response = http_client.post(os.getenv("RPC_ENDPOINT"), json=mint_payload)
                         if mint_response.status_code == 200:
                             mint_data = mint_response.json()
                             if mint_data.get('result') and len(mint_data['result']) > 0:
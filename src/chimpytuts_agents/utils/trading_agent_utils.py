@@ -9,7 +9,6 @@ import time
 import json
 import numpy as np
 import datetime
-import pandas_ta as ta
 from datetime import datetime, timedelta
 from termcolor import colored, cprint
 import solders
@@ -18,6 +17,12 @@ import shutil
 import atexit
 import pytz
 from solders.pubkey import Pubkey
+from src import http_client
+from src.candle_store import get_candle_store, slice_candles, candles_to_ohlcv_frame
+from src.candle_resampler import plan_timeframes, resample_candles
+from src.indicators import add_trend_indicators
+from src.token_registry import get_token_registry
+from src.concurrency import map_ordered
 
 RUG_CHECK_URL = "https://api.rugcheck.xyz"	
 BIRDEYE_URL = "https://public-api.birdeye.so/defi"
@@ -94,8 +99,13 @@ def collect_token_data(token):
         if not pair_data:
             return None
             
-        # Get appropriate timeframes based on token age
-        creation_timestamp = int(pair_data.get('created_at', 0)) / 1000
+        # Get appropriate timeframes based on pair age (creation time never changes - keep it in the registry)
+        registry = get_token_registry()
+        creation_timestamp = registry.pair_created_at(token)
+        if not creation_timestamp:
+            creation_timestamp = int(pair_data.get('created_at', 0)) / 1000
+            if creation_timestamp:
+                registry.set_pair_created_at(token, creation_timestamp)
         current_time = int(time.time())
         token_age_seconds = current_time - creation_timestamp
         timeframes, days_back = get_appropriate_timeframes(creation_timestamp)
@@ -148,10 +158,10 @@ def collect_token_data(token):
             'ohlcv_data': {}
         }
         
-        # Get OHLCV data for each timeframe
+        # Get OHLCV data for every timeframe - one fetch per base resolution, the rest resampled locally
+        frames = get_multi_timeframe_data(token, timeframes, days_back, token_age_seconds)
         for tf in timeframes:
-            time.sleep(3)  # Wait 3 seconds between timeframe requests
-            df = get_data(token, days_back, tf, token_age_seconds)
+            df = frames.get(tf)
             if df is not None and not df.empty:
                 market_data['ohlcv_data'][tf] = {
                     'candles': len(df),
@@ -186,13 +196,15 @@ def collect_all_tokens():
     market_data = {}
     
     cprint("\n🔍 Moon Dev's AI Agent starting market data collection...", "white", "on_blue")
+
+    # Warm mint metadata for every monitored token with one getMultipleAccounts call
+    get_token_registry().load_many(MONITORED_TOKENS)
     
-    for token in MONITORED_TOKENS:
-        data = collect_token_data(token)
+    # Collect tokens in parallel - per-provider rate limits replace the old fixed sleeps
+    results = map_ordered(collect_token_data, MONITORED_TOKENS, COLLECT_TOKEN_WORKERS, label="token collection")
+    for token, data in zip(MONITORED_TOKENS, results):
         if data is not None:
             market_data[token] = data
-        # Add delay between tokens
-        time.sleep(2)  # 2 second delay between tokens
             
     cprint("\n✨ Moon Dev's AI Agent completed market data collection!", "white", "on_green")
     
@@ -248,85 +260,110 @@ def get_time_range(timeframe, token_age_seconds):
     
     return time_from, time_to
 
+def fetch_ohlcv_items(address, timeframe, time_from, time_to):
+    """Fetch raw Birdeye OHLCV items, returns None if the request failed"""
+    url = f"https://public-api.birdeye.so/defi/ohlcv?address={address}&type={timeframe}&time_from={time_from}&time_to={time_to}"
+    headers = {"X-API-KEY": BIRDEYE_API_KEY}
+
+    cprint(f"  • API URL: {url}", "white")
+
+    response = http_client.get(url, headers=headers)
+    if response.status_code != 200:
+        cprint(f"❌ API error for {timeframe}: {response.status_code}", "red")
+        try:
+            error_details = response.json()
+            cprint(f"  • Error details: {error_details}", "red")
+        except:
+            cprint(f"  • Response text: {response.text}", "red")
+        return None
+
+    return response.json().get('data', {}).get('items', [])
+
+def candles_to_frame(candles, timeframe):
+    """Turn candle arrays into the OHLCV + indicator DataFrame the agents consume"""
+    if len(candles['unixTime']) == 0:
+        cprint(f"⚠️ No data returned for {timeframe}", "yellow")
+        return pd.DataFrame()
+
+    # Straight from int64/float64 arrays - future bars dropped, missing values become 0
+    df = candles_to_ohlcv_frame(candles, fill_value=0.0)
+    
+    if df.empty:
+        cprint(f"⚠️ Empty DataFrame for {timeframe}", "yellow")
+        return pd.DataFrame()
+
+    # Calculate indicators with adjusted window sizes based on available data
+    data_length = len(df)
+    if data_length >= 2:  # Minimum 2 candles required
+        # Adjust MA and RSI lengths based on available data
+        ma20_length = min(20, data_length - 1)
+        ma40_length = min(40, data_length - 1)
+        rsi_length = min(14, data_length - 1)
+        
+        add_trend_indicators(df, ma_fast=ma20_length, ma_slow=ma40_length, rsi_length=rsi_length)
+        
+        cprint(f"✅ Got {len(df)} candles for {timeframe} (MA20: {ma20_length}, MA40: {ma40_length}, RSI: {rsi_length})", "green")
+        return df
+    else:
+        cprint(f"⚠️ Not enough data for {timeframe} (only {data_length} candles)", "yellow")
+        return pd.DataFrame()
+
 def get_data(address, days_back, timeframe, token_age_seconds):
     """Get OHLCV data with proper time range handling"""
     try:
         # Get appropriate time range for this timeframe
         time_from, time_to = get_time_range(timeframe, token_age_seconds)
 
-        url = f"https://public-api.birdeye.so/defi/ohlcv?address={address}&type={timeframe}&time_from={time_from}&time_to={time_to}"
-        headers = {"X-API-KEY": BIRDEYE_API_KEY}
-        
-        cprint(f"  • API URL: {url}", "white")
-        
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            json_response = response.json()
-            items = json_response.get('data', {}).get('items', [])
+        # Only candles newer than what the candle store already holds are downloaded
+        candles = get_candle_store().get_candles(
+            address, timeframe, time_from, time_to,
+            lambda fetch_from, fetch_to: fetch_ohlcv_items(address, timeframe, fetch_from, fetch_to)
+        )
+        if candles is not None:
+            return candles_to_frame(candles, timeframe)
+        else:
+            return pd.DataFrame()
             
-            if not items:
-                cprint(f"⚠️ No data returned for {timeframe}", "yellow")
-                return pd.DataFrame()
+    except Exception as e:
+        cprint(f"❌ Error getting data for {timeframe}: {str(e)}", "red")
+        return pd.DataFrame()
 
-            processed_data = [{
-                'Datetime (UTC)': datetime.utcfromtimestamp(item['unixTime']).strftime('%Y-%m-%d %H:%M:%S'),
-                'Open': float(item['o'] or 0),
-                'High': float(item['h'] or 0),
-                'Low': float(item['l'] or 0),
-                'Close': float(item['c'] or 0),
-                'Volume': float(item['v'] or 0)
-            } for item in items]
+def get_multi_timeframe_data(address, timeframes, days_back, token_age_seconds):
+    """
+    Get OHLCV frames for several timeframes with as few Birdeye calls as possible
 
-            df = pd.DataFrame(processed_data)
-            
-            if df.empty:
-                cprint(f"⚠️ Empty DataFrame for {timeframe}", "yellow")
-                return pd.DataFrame()
-                
-            # Remove any rows with dates far in the future
-            df['datetime_obj'] = pd.to_datetime(df['Datetime (UTC)'])
-            df['datetime_obj'] = df['datetime_obj'].dt.tz_localize('UTC')
-            df = df[df['datetime_obj'] <= datetime.now(pytz.utc)]
-            df = df.drop('datetime_obj', axis=1)
+    Only the timeframes picked by plan_timeframes are fetched; the rest are
+    resampled locally from a finer timeframe whose range already covers them.
+    """
+    fetch_list, derive_from = plan_timeframes(timeframes, token_age_seconds)
+    if derive_from:
+        cprint(f"🧮 Fetching {', '.join(fetch_list)} and deriving {', '.join(f'{tf}<-{base}' for tf, base in derive_from.items())}", "cyan")
 
-            # Handle zero or None values
-            for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    ranges = {tf: get_time_range(tf, token_age_seconds) for tf in timeframes}
 
-            # Calculate indicators with adjusted window sizes based on available data
-            data_length = len(df)
-            if data_length >= 2:  # Minimum 2 candles required
-                # Adjust MA and RSI lengths based on available data
-                ma20_length = min(20, data_length - 1)
-                ma40_length = min(40, data_length - 1)
-                rsi_length = min(14, data_length - 1)
-                
-                df['MA20'] = ta.sma(df['Close'], length=ma20_length)
-                df['RSI'] = ta.rsi(df['Close'], length=rsi_length)
-                df['MA40'] = ta.sma(df['Close'], length=ma40_length)
+    def fetch(timeframe):
+        time_from, time_to = ranges[timeframe]
+        return get_candle_store().get_candles(
+            address, timeframe, time_from, time_to,
+            lambda fetch_from, fetch_to: fetch_ohlcv_items(address, timeframe, fetch_from, fetch_to)
+        )
 
-                df['Price_above_MA20'] = df['Close'] > df['MA20']
-                df['Price_above_MA40'] = df['Close'] > df['MA40']
-                df['MA20_above_MA40'] = df['MA20'] > df['MA40']
-                
-                cprint(f"✅ Got {len(df)} candles for {timeframe} (MA20: {ma20_length}, MA40: {ma40_length}, RSI: {rsi_length})", "green")
-                return df
+    fetched = dict(zip(fetch_list, map_ordered(fetch, fetch_list, COLLECT_TIMEFRAME_WORKERS, label="timeframe fetch")))
+
+    frames = {}
+    for tf in timeframes:
+        try:
+            if tf in fetched:
+                candles = fetched[tf]
             else:
-                cprint(f"⚠️ Not enough data for {timeframe} (only {data_length} candles)", "yellow")
-                return pd.DataFrame()
-            
-        else:
-            cprint(f"❌ API error for {timeframe}: {response.status_code}", "red")
-            try:
-                error_details = response.json()
-                cprint(f"  • Error details: {error_details}", "red")
-            except:
-                cprint(f"  • Response text: {response.text}", "red")
-            return pd.DataFrame()
-            
-    except Exception as e:
-        cprint(f"❌ Error getting data for {timeframe}: {str(e)}", "red")
-        return pd.DataFrame()
+                candles = fetched.get(derive_from[tf])
+                if candles is not None:
+                    candles = slice_candles(resample_candles(candles, calculate_timeframe_seconds(tf)), *ranges[tf])
+            frames[tf] = candles_to_frame(candles, tf) if candles is not None else pd.DataFrame()
+        except Exception as e:
+            cprint(f"❌ Error getting data for {tf}: {str(e)}", "red")
+            frames[tf] = pd.DataFrame()
+    return frames
 
 def get_highest_liquidity_market(token_address, max_retries=3, timeout=10):
     """
@@ -343,7 +380,7 @@ def get_highest_liquidity_market(token_address, max_retries=3, timeout=10):
     for attempt in range(max_retries):
         try:
             rugcheck_url = f"{RUG_CHECK_URL}/v1/tokens/{token_address}/report"
-            rugcheck_response = requests.get(rugcheck_url, timeout=timeout)
+            rugcheck_response = http_client.get(rugcheck_url, timeout=timeout)
             
             if rugcheck_response.status_code != 200:
                 cprint(f"❌ Failed to get rugcheck report: HTTP {rugcheck_response.status_code}", "red")
@@ -409,7 +446,7 @@ def get_pair_analytics(pair_address, max_retries=3, timeout=10):
     for attempt in range(max_retries):
         try:
             dexscreener_url = f"https://api.dexscreener.com/latest/dex/pairs/solana/{pair_address}"
-            response = requests.get(dexscreener_url, timeout=timeout)
+            response = http_client.get(dexscreener_url, timeout=timeout)
             
             if response.status_code != 200:
                 cprint(f"❌ Failed to get pair data: HTTP {response.status_code}", "red")
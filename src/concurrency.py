@@ -0,0 +1,33 @@
+"""
+🌙 Moon Dev's Concurrency Helpers
+Thread pool fan-out for I/O bound data collection
+Built with love by Moon Dev 🚀
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from termcolor import cprint
+
+
+def map_ordered(func, items, max_workers, label="task"):
+    """
+    Run func(item) for every item on a thread pool and return results in input order
+
+    A failing item logs its error and yields None so one bad token never sinks the batch.
+    """
+    items = list(items)
+    if not items:
+        return []
+
+    def _safe(item):
+        try:
+            return func(item)
+        except Exception as e:
+            cprint(f"❌ Moon Dev's {label} failed for {item}: {str(e)}", "red")
+            return None
+
+    if max_workers <= 1 or len(items) == 1:
+        return [_safe(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(_safe, items))
@@ -100,11 +100,32 @@ sell_over = 1
 DAYSBACK_4_DATA = 4
 DATA_TIMEFRAME = '15m'  # 1m, 3m, 5m, 15m, 30m, 1H, 2H, 4H, 6H, 8H, 12H, 1D, 3D, 1W, 1M
 SAVE_OHLCV_DATA = False  # 🌙 Set to True to save data permanently, False will only use temp data during run
+CANDLE_STORE_DIR = 'src/data/candle_store'  # Persistent per (address, timeframe) candle cache used by get_data
+CANDLE_STORE_OVERLAP_BARS = 2  # Re-fetch this many of the newest stored bars to repair the still-open candle
+CANDLE_STORE_MAX_BARS = 5000  # Keep at most this many bars per (address, timeframe)
+RESAMPLE_ENABLED = True  # Build higher timeframes locally from one finer fetch when its range covers them
+RESAMPLE_MAX_TIMEFRAME = '1D'  # Highest timeframe derived locally (3D / 1W / 1M always come from Birdeye)
 
 # AI Model Settings 🤖
 AI_MODEL = "claude-3-haiku-20240307"  # Claude model to use: claude-3-haiku-20240307,claude-3-sonnet-20240229, claude-3-opus-20240229
 AI_MAX_TOKENS = 1024  # Max tokens for response
 AI_TEMPERATURE = 0.7  # Creativity vs precision (0-1)
+AI_ANALYSIS_WORKERS = 5  # Tokens analyzed by Claude at the same time each trading cycle
+AI_ANALYSIS_TIMEOUT_SECONDS = 60  # Per-call timeout - a slow call is recorded as NOTHING instead of stalling the cycle
+AI_BATCH_SIZE = 10  # Tokens analyzed per Claude request (1 = one request per token)
+AI_BATCH_MAX_TOKENS = 4096  # Response budget for a batched request (~300 tokens per analyzed token)
+
+# Decision Cache Settings ♻️
+DECISION_CACHE_ENABLED = True  # Reuse the last AI decision while a token's quantized market features are unchanged
+DECISION_CACHE_TTL_SECONDS = 3600  # A cached decision is trusted for at most this long
+DECISION_CACHE_MAX_ENTRIES = 500  # Least recently used decisions are evicted past this many
+DECISION_CACHE_PRICE_BUCKET = 0.02  # Price bucket width (2% steps on a log scale)
+
+# Prompt Encoding Settings 📏
+PROMPT_SIG_FIGS = 4  # Significant figures kept for numbers in LLM prompts
+PROMPT_FRAME_ROWS = 30  # Most recent candles included when a whole frame goes into a prompt
+PROMPT_CHARS_PER_TOKEN = 3.5  # Used to estimate prompt tokens before a call (numbers tokenize densely)
+PROMPT_CACHE_ENABLED = True  # Mark static agent system prompts for Claude's prompt cache (needs a 1024+ token prefix, 2048 on Haiku)
 
 # Trading Strategy Agent Settings - MAY NOT BE USED YET 1/5/25
 ENABLE_STRATEGIES = False  # Set this to True to use strategies
@@ -124,6 +145,98 @@ DO_NOT_TRADE_LIST = ['777']
 CLOSED_POSITIONS_TXT = '777'
 minimum_trades_in_last_hour = 777
 
+# HTTP Client Settings 🌐
+HTTP_TIMEOUT_SECONDS = 15  # Default per-request timeout for Birdeye, Jupiter, DexScreener, Rugcheck and RPC calls
+HTTP_POOL_SIZE = 10  # Keep-alive connections kept open per host
+HTTP2_ENABLED = True  # Use HTTP/2 when httpx + h2 are installed, otherwise fall back to pooled requests sessions
+HTTP_HOST_OVERRIDES = {}  # "https://host" (or "https://host/path") -> "http://127.0.0.1:port/prefix" - reroute a provider or one endpoint (used by src/benchmarks)
+
+# Price Cache Settings 💲
+PRICE_CACHE_TTL_SECONDS = 5  # token_price / token_prices answers are reused for this long
+PRICE_BATCH_SIZE = 100  # Max mints per Birdeye multi_price request
+
+# Wallet Snapshot Settings 👛
+WALLET_SNAPSHOT_TTL_SECONDS = 60  # Reuse one wallet token_list download for this long (our own swaps invalidate it)
+
+# Token Registry Settings 🗂️
+TOKEN_REGISTRY_PATH = 'src/data/token_registry.json'  # Persistent decimals / program / creation time / symbol / name per mint
+TOKEN_REGISTRY_BATCH_SIZE = 100  # Max mints per getMultipleAccounts request
+
+# Rate Limit Settings 🚦
+RATE_LIMITS = {  # host -> (requests per second, burst) - hosts not listed are not throttled
+    'public-api.birdeye.so': (10, 10),
+    'api.dexscreener.com': (5, 5),
+    'api.rugcheck.xyz': (2, 2),
+    'quote-api.jup.ag': (10, 10),  # quotes and swaps share one budget (liquidations, chunk_kill, entries)
+}
+RATE_LIMIT_MAX_RETRIES = 3  # Retry a 429 this many times once the provider's budget allows
+RATE_LIMIT_MAX_BACKOFF_SECONDS = 30  # Cap on any Retry-After we honour
+RATE_LIMIT_RECOVERY_STEP = 0.1  # Fraction of the base rate restored per successful response after a 429
+
+# Data Collection Concurrency ⚡
+COLLECT_TOKEN_WORKERS = 4  # Tokens collected in parallel by collect_all_tokens
+COLLECT_TIMEFRAME_WORKERS = 4  # Timeframes fetched in parallel per token
+
+# Order Confirmation Settings ✅
+CONFIRM_POLL_SECONDS = 0.5  # How often in-flight swap signatures are batch-polled with getSignatureStatuses
+CONFIRM_TIMEOUT_SECONDS = 90  # Stop waiting on a signature that has not landed by then (its blockhash has expired)
+CONFIRM_COMMITMENT = 'confirmed'  # processed / confirmed / finalized - level at which an order counts as filled
+CONFIRM_BATCH_SIZE = 256  # Max signatures per getSignatureStatuses request (RPC limit)
+CONFIRM_RESULT_TTL_SECONDS = 300  # Results nobody collects (fire-and-forget sells) are dropped after this long
+
+# Execution Metrics Settings ⏱️
+EXECUTION_METRICS_WINDOW = 1000  # Latest samples kept per stage / token / endpoint series
+EXECUTION_METRICS_LOG_SECONDS = 300  # Log a p50/p95/p99 summary line at most this often (0 = never)
+
+# Chain State Settings ⛓️
+CHAIN_STATE_REFRESH_SECONDS = 2  # Background getLatestBlockhash + getRecentPrioritizationFees interval
+CHAIN_STATE_MAX_AGE_SECONDS = 20  # Older cached state is ignored (fee falls back to PRIORITY_FEE)
+PRIORITY_FEE_DYNAMIC = True  # Size prioritizationFeeLamports from recent fees instead of the static PRIORITY_FEE
+PRIORITY_FEE_PERCENTILE = 75  # Percentile of recent non-zero fees (micro-lamports per compute unit) to pay
+PRIORITY_FEE_COMPUTE_UNITS = 300000  # Compute units assumed for a Jupiter swap when converting to lamports
+PRIORITY_FEE_MIN_LAMPORTS = 10000  # Floor for the dynamic fee
+PRIORITY_FEE_MAX_LAMPORTS = 2000000  # Cap for the dynamic fee (~0.002 SOL)
+
+# Order Engine Settings 🧭
+ORDER_FILL_RATIO = 0.97  # An entry counts as filled at this fraction of its target USD size
+ORDER_ENGINE_WORKERS = 8  # Chunk orders quoted / built / sent in parallel across all entries
+ORDER_ENGINE_RETRY_SECONDS = 30  # Back-off after a round where no order landed
+ORDER_ENGINE_MAX_FAILED_ROUNDS = 1  # Give up on an entry after this many extra rounds with no fill
+ORDER_ENGINE_PRICE_RETRY_SECONDS = 5  # An entry whose price lookup failed re-prices and tries again after this long
+
+# Position Exit Settings 🔪
+CHUNK_KILL_CHUNKS = 3  # chunk_kill splits the remaining position into this many sells per round
+CHUNK_KILL_WORKERS = 3  # Chunk swaps quoted, built and submitted in parallel
+CHUNK_KILL_DUST_USD = 0.1  # Remaining value below this counts as closed
+CHUNK_KILL_MAX_ROUNDS = 10  # chunk_kill gives up (and reports failure) after this many sell rounds
+LIQUIDATION_WORKERS = 8  # Positions exited side by side by close_all_positions
+LIQUIDATION_MIN_USD = 0.1  # Holdings worth less than this are left alone
+
+# Position Ledger Settings 📒
+POSITION_LEDGER_PATH = 'src/data/position_ledger.json'  # Amount / cost basis / realized PnL per mint from our own fills
+POSITION_LEDGER_RECONCILE_SECONDS = 300  # Check the ledger against a wallet download at least this often
+POSITION_LEDGER_SETTLE_SECONDS = 30  # Fills newer than this win over the (lagging) wallet token_list on reconcile
+POSITION_LEDGER_TOLERANCE = 0.01  # Relative ledger vs wallet difference that counts as a mismatch
+
+# Trigger Engine Settings 🎯
+TRIGGER_POLL_SECONDS = 1  # Every watched mint is priced in one batched multi_price call this often
+TRIGGER_PUSH_WAIT_SECONDS = 1  # Longest a push-fed engine waits for a tick before re-checking its triggers
+TRIGGER_WORKERS = 8  # Trigger actions (entries / exits) allowed to run at once
+TRIGGER_COOLDOWN_SECONDS = 15  # A repeating trigger re-arms this long after its action finishes
+
+# Recommendation Store Settings 🗂️
+RECOMMENDATION_JOURNAL_DIR = 'src/data/recommendations'  # Append-only <agent>.jsonl of every AI recommendation
+RECOMMENDATION_KEEP_CYCLES = 3  # Past cycles kept in memory besides the current one - older ones live only in the journal
+
+# Paper Trading Settings 🧪
+PAPER_TRADING = False  # Route Jupiter swaps, RPC sends / confirmations and the wallet token_list to src/paper_exchange.py
+PAPER_STARTING_BALANCES = {USDC_ADDRESS: 1000}  # Paper wallet starting balances (ui amounts per mint)
+PAPER_LATENCY_MS = 50  # Added to every simulated quote / swap / send / status / token_list response
+PAPER_CONFIRM_MS = 800  # Time from send until a paper swap shows as confirmed
+PAPER_SLIPPAGE_BPS = 50  # Max random price move between quote and fill
+PAPER_FAILURE_RATE = 0.02  # Fraction of paper swaps that fail on-chain
+PAPER_SEED = None  # Seed the simulator's RNG for reproducible runs
+
 # Token Discovery Agent Settings
 MAX_TOKENS_TO_BE_MONITORED = 5
 
@@ -0,0 +1,218 @@
+"""
+🌙 Moon Dev's Confirmation Tracker
+Batch-polls getSignatureStatuses for every in-flight swap so orders resume the moment they land
+Built with love by Moon Dev 🚀
+
+Every thread waiting on signatures shares one poll loop: whichever waiter is
+due polls for all pending signatures at once, so ten open orders cost one RPC
+call per CONFIRM_POLL_SECONDS instead of ten wallet downloads after tx_sleep.
+Results nobody collects are dropped after CONFIRM_RESULT_TTL_SECONDS.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from termcolor import cprint
+
+from src.config import *
+from src import http_client
+from src.chain_state import chain_state
+from src.execution_metrics import execution_metrics, endpoint_of
+
+CONFIRMED = 'confirmed'
+FAILED = 'failed'
+TIMEOUT = 'timeout'
+
+COMMITMENT_LEVELS = {'processed': 0, 'confirmed': 1, 'finalized': 2}
+
+
+class ConfirmationTracker:
+    """Shared set of in-flight signatures resolved by batched status polls"""
+
+    def __init__(self, rpc_url=None, poll_seconds=CONFIRM_POLL_SECONDS, timeout=CONFIRM_TIMEOUT_SECONDS,
+                 commitment=CONFIRM_COMMITMENT):
+        self.rpc_url = rpc_url
+        self.poll_seconds = poll_seconds
+        self.timeout = timeout
+        self.commitment = commitment
+        self._pending = {}  # signature -> submitted_at
+        self._expiry = {}  # signature -> lastValidBlockHeight of its blockhash
+        self._tokens = {}  # signature -> mint, for per-token confirm latency
+        self._results = {}  # signature -> {'status', 'slot', 'err', 'seconds'}
+        self._resolved_at = OrderedDict()  # signature -> monotonic resolve time, oldest first
+        self._resolved = []  # (signature, result, token) to hand to metrics / listeners outside the lock
+        self._listeners = []
+        self._cond = threading.Condition()
+        self._polling = False
+        self._last_poll = 0.0
+        self.polls = 0
+
+    def _rpc(self):
+        return self.rpc_url or os.getenv("RPC_ENDPOINT")
+
+    def add_listener(self, func):
+        """Call func(signature, result) whenever a signature resolves (confirmed, failed or timed out)"""
+        self._listeners.append(func)
+
+    def track(self, signature, last_valid_block_height=None, token=None):
+        """Start watching a freshly submitted signature"""
+        if not signature:
+            return
+        with self._cond:
+            self._prune(time.monotonic())
+            if signature not in self._pending and signature not in self._results:
+                self._pending[signature] = time.monotonic()
+            if last_valid_block_height:
+                self._expiry[signature] = last_valid_block_height
+            if token:
+                self._tokens[signature] = token
+        self._notify()
+
+    def pending(self):
+        with self._cond:
+            return list(self._pending)
+
+    def _is_landed(self, status):
+        level = COMMITMENT_LEVELS.get(status.get('confirmationStatus') or 'processed', 0)
+        return level >= COMMITMENT_LEVELS.get(self.commitment, 1)
+
+    def _resolve(self, signature, status, slot=None, err=None):
+        submitted_at = self._pending.pop(signature, None)
+        self._expiry.pop(signature, None)
+        token = self._tokens.pop(signature, None)
+        seconds = time.monotonic() - submitted_at if submitted_at is not None else None
+        self._results[signature] = {'status': status, 'slot': slot, 'err': err, 'seconds': seconds}
+        self._resolved_at[signature] = time.monotonic()
+        self._resolved_at.move_to_end(signature)
+        self._resolved.append((signature, self._results[signature], token))
+
+    def _take(self, signature):
+        """Hand a result to its waiter - collected results are not kept"""
+        self._resolved_at.pop(signature, None)
+        return self._results.pop(signature)
+
+    def _prune(self, now):
+        """
+        Forget signatures nobody waits on (kill_switch / copybot / strategy sells)
+
+        Results uncollected for CONFIRM_RESULT_TTL_SECONDS are dropped. Signatures
+        still pending that long after their timeout (no waiter ever polled them)
+        resolve as TIMEOUT, so listeners such as the position ledger hear about them.
+        """
+        for signature, submitted_at in list(self._pending.items()):
+            if now - submitted_at >= self.timeout + CONFIRM_RESULT_TTL_SECONDS:
+                self._resolve(signature, TIMEOUT, err='never polled')
+        while self._resolved_at:
+            signature, resolved_at = next(iter(self._resolved_at.items()))
+            if now - resolved_at < CONFIRM_RESULT_TTL_SECONDS:
+                break
+            self._resolved_at.popitem(last=False)
+            self._results.pop(signature, None)
+
+    def _notify(self):
+        """Feed newly resolved signatures to execution_metrics and the listeners (never under the lock)"""
+        with self._cond:
+            resolved, self._resolved = self._resolved, []
+        endpoint = endpoint_of(self._rpc())
+        for signature, result, token in resolved:
+            if result['status'] == CONFIRMED and result['seconds'] is not None:
+                execution_metrics.record('confirm', result['seconds'], token, endpoint)
+            for listener in self._listeners:
+                try:
+                    listener(signature, result)
+                except Exception as e:
+                    cprint(f"⚠️ Moon Dev's confirmation listener failed: {str(e)}", "yellow")
+
+    def poll(self):
+        """One batched getSignatureStatuses pass over every pending signature"""
+        signatures = self.pending()
+        if not signatures:
+            return
+
+        statuses = {}
+        for i in range(0, len(signatures), CONFIRM_BATCH_SIZE):
+            batch = signatures[i:i + CONFIRM_BATCH_SIZE]
+            payload = {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "getSignatureStatuses",
+                "params": [batch, {"searchTransactionHistory": False}]
+            }
+            try:
+                response = http_client.post(self._rpc(), json=payload)
+                values = response.json().get('result', {}).get('value') or []
+            except Exception as e:
+                cprint(f"⚠️ Moon Dev's confirmation poll failed: {str(e)}", "yellow")
+                continue
+            statuses.update(zip(batch, values))
+
+        now = time.monotonic()
+        block_height = chain_state.block_height()
+        with self._cond:
+            self.polls += 1
+            for signature in signatures:
+                if signature not in self._pending:
+                    continue
+                status = statuses.get(signature)
+                if status and status.get('err') is not None:
+                    self._resolve(signature, FAILED, status.get('slot'), status.get('err'))
+                elif status and self._is_landed(status):
+                    self._resolve(signature, CONFIRMED, status.get('slot'))
+                elif status is None and block_height is not None and block_height > self._expiry.get(signature, block_height):
+                    # Blockhash expired and the RPC has never seen the swap - it never will land.
+                    # A processed-but-unconfirmed swap keeps waiting (the block height is only an estimate)
+                    self._resolve(signature, TIMEOUT, err='blockhash expired')
+                elif now - self._pending[signature] >= self.timeout:
+                    self._resolve(signature, TIMEOUT)
+            self._cond.notify_all()
+        self._notify()
+
+    def collect(self, signatures):
+        """Non-blocking: pop and return results for whichever signatures have resolved"""
+        with self._cond:
+            return {s: self._take(s) for s in signatures if s in self._results}
+
+    def wait(self, signatures, timeout=None):
+        """
+        Block until every signature is confirmed, failed or timed out
+
+        Returns {signature: {'status', 'slot', 'err', 'seconds'}}. Empty / None
+        signatures (orders that never reached the RPC) are skipped.
+        """
+        signatures = [s for s in dict.fromkeys(signatures) if s]
+        for signature in signatures:
+            self.track(signature)
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+
+        while True:
+            results = None
+            with self._cond:
+                if all(s in self._results for s in signatures) or time.monotonic() >= deadline:
+                    for signature in signatures:
+                        if signature not in self._results:
+                            self._resolve(signature, TIMEOUT)
+                    results = {s: self._take(s) for s in signatures}
+                else:
+                    due = time.monotonic() - self._last_poll >= self.poll_seconds
+                    if self._polling or not due:
+                        # Someone else is polling (or just did) - their notify_all wakes us
+                        self._cond.wait(self.poll_seconds)
+                        continue
+                    self._polling = True
+                    self._last_poll = time.monotonic()
+
+            if results is not None:
+                self._notify()
+                return results
+
+            try:
+                self.poll()
+            finally:
+                with self._cond:
+                    self._polling = False
+                    self._cond.notify_all()
+
+
+confirmation_tracker = ConfirmationTracker()
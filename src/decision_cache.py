@@ -0,0 +1,185 @@
+"""
+🌙 Moon Dev's Decision Cache
+Reuses Claude's last trading decision while a token's market picture is unchanged
+Built with love by Moon Dev 🚀
+
+market_features() reduces a token's market data to coarse features: log price
+bucket, RSI band, MA20 / MA40 relationships, volume regime and buy pressure per
+timeframe. decision_key() hashes them canonically together with the token and
+the prompt version. A key seen within DECISION_CACHE_TTL_SECONDS returns the
+stored action, confidence and reasoning with no API call. The cache is an LRU
+capped at DECISION_CACHE_MAX_ENTRIES and counts hits, misses and evictions.
+"""
+
+import json
+import math
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from src.config import *
+
+RSI_BANDS = (30, 45, 55, 70)  # oversold | weak | neutral | strong | overbought
+CHANGE_BUCKET_PCT = 5  # price change percentages are bucketed in steps of this many points
+
+
+def prompt_version(*parts):
+    """Short hash of the prompt template and model - a new prompt never reuses old decisions"""
+    return hashlib.sha1('\n'.join(str(p) for p in parts).encode()).hexdigest()[:12]
+
+
+def _price_bucket(price):
+    if not price or price <= 0:
+        return None
+    return round(math.log(price) / math.log(1 + DECISION_CACHE_PRICE_BUCKET))
+
+
+def _rsi_band(rsi):
+    if rsi is None or rsi != rsi:  # NaN
+        return None
+    return sum(1 for edge in RSI_BANDS if rsi >= edge)
+
+
+def _volume_regime(volume):
+    """Order of magnitude in doublings - 'same volume' means within roughly 2x"""
+    if not volume or volume <= 0:
+        return None
+    return round(math.log2(volume))
+
+
+def _change_bucket(change):
+    try:
+        return round(float(change) / CHANGE_BUCKET_PCT)
+    except (TypeError, ValueError):
+        return None
+
+
+def _buy_share(txns):
+    buys, sells = txns.get('buys', 0) or 0, txns.get('sells', 0) or 0
+    return round(buys / (buys + sells), 1) if buys + sells else None
+
+
+def _frame_features(df):
+    """Features of an indicator DataFrame (Close / MA20 / MA40 / RSI / Volume columns)"""
+    if df is None or df.empty:
+        return None
+    last = df.iloc[-1]
+    close = float(last['Close']) if 'Close' in df else None
+    ma20 = float(last['MA20']) if 'MA20' in df else None
+    ma40 = float(last['MA40']) if 'MA40' in df else None
+    relative_volume = None
+    if 'Volume' in df and float(df['Volume'].mean() or 0) > 0:
+        relative_volume = round(math.log2(max(float(last['Volume']), 1e-12) / float(df['Volume'].mean())))
+    return {
+        'price': _price_bucket(close),
+        'rsi': _rsi_band(float(last['RSI'])) if 'RSI' in df else None,
+        'above_ma20': None if close is None or ma20 is None else close > ma20,
+        'above_ma40': None if close is None or ma40 is None else close > ma40,
+        'ma20_above_ma40': None if ma20 is None or ma40 is None else ma20 > ma40,
+        'volume': max(-2, min(2, relative_volume)) if relative_volume is not None else None,
+    }
+
+
+def _summary_features(summary):
+    """Features of one collect_token_data timeframe summary"""
+    indicators = summary.get('indicators') or {}
+    trends = indicators.get('trends') or {}
+    return {
+        'price': _price_bucket((summary.get('price') or {}).get('close')),
+        'change': _change_bucket((summary.get('price') or {}).get('change')),
+        'rsi': _rsi_band(indicators.get('RSI')),
+        'above_ma20': trends.get('above_MA20'),
+        'above_ma40': trends.get('above_MA40'),
+        'ma20_above_ma40': trends.get('MA20_above_MA40'),
+        'volume': _volume_regime(summary.get('volume')),
+    }
+
+
+def market_features(market_data):
+    """Quantized view of the market data the trading prompt is built from"""
+    if hasattr(market_data, 'iloc'):
+        features = {'frame': _frame_features(market_data)}
+        if 'strategy_signals' in market_data:
+            features['signals'] = market_data['strategy_signals'].iloc[-1]
+        return features
+
+    features = {}
+    pair = market_data.get('pair_analytics') or {}
+    if pair:
+        txns = pair.get('transactions') or {}
+        features['pair'] = {
+            'price': _price_bucket(pair.get('price_usd')),
+            'change': {tf: _change_bucket(v) for tf, v in (pair.get('price_change') or {}).items()},
+            'buy_share': {tf: _buy_share(v) for tf, v in txns.items()},
+            'volume': {tf: _volume_regime(v) for tf, v in (pair.get('volume') or {}).items()},
+            'liquidity': _volume_regime((pair.get('liquidity') or {}).get('usd')),
+        }
+    features['timeframes'] = {tf: _summary_features(s) for tf, s in (market_data.get('ohlcv_data') or {}).items()}
+    if market_data.get('strategy_signals'):
+        features['signals'] = market_data['strategy_signals']
+    return features
+
+
+def decision_key(token, market_data, version):
+    """Canonical content hash of (token, prompt version, quantized features)"""
+    payload = {'token': token, 'prompt': version, 'features': market_features(market_data)}
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class DecisionCache:
+    """Thread-safe LRU of {key: decision} with a TTL"""
+
+    def __init__(self, ttl=DECISION_CACHE_TTL_SECONDS, max_entries=DECISION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (decision, stored_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def get(self, key):
+        """Stored decision, or None when missing / older than the TTL"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, decision):
+        with self._lock:
+            self._entries[key] = (decision, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'expired': self.expired,
+            }
+
+
+# Shared instance used by the trading agents
+decision_cache = DecisionCache()
@@ -0,0 +1,136 @@
+"""
+🌙 Moon Dev's Execution Metrics
+Per-stage swap latency (quote / swap build / sign / send / confirm) by token and endpoint
+Built with love by Moon Dev 🚀
+
+market_buy / market_sell time every stage and the confirmation tracker adds the
+confirm stage. Each series keeps the last EXECUTION_METRICS_WINDOW samples and
+reports p50 / p95 / p99. snapshot() returns everything as a dict, and a summary
+line is logged at most once per EXECUTION_METRICS_LOG_SECONDS.
+"""
+
+import time
+import threading
+import contextlib
+from collections import deque
+from urllib.parse import urlsplit
+
+from termcolor import cprint
+
+from src.config import *
+
+STAGES = ('quote', 'swap', 'sign', 'send', 'submit', 'confirm')
+
+
+def _percentile(ordered, pct):
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def endpoint_of(url):
+    """Host a stage talked to, used as the per-endpoint key"""
+    return urlsplit(url).netloc if url else None
+
+
+class LatencyWindow:
+    """Rolling window of latency samples in seconds"""
+
+    def __init__(self, size=EXECUTION_METRICS_WINDOW):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'p50_ms': round(_percentile(ordered, 50) * 1000, 1),
+            'p95_ms': round(_percentile(ordered, 95) * 1000, 1),
+            'p99_ms': round(_percentile(ordered, 99) * 1000, 1),
+            'max_ms': round(ordered[-1] * 1000, 1),
+        }
+
+
+class ExecutionMetrics:
+    """Thread-safe latency windows keyed by stage, token + stage and endpoint + stage"""
+
+    def __init__(self, log_seconds=EXECUTION_METRICS_LOG_SECONDS):
+        self.log_seconds = log_seconds
+        self._stages = {}
+        self._tokens = {}
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        self._last_log = time.monotonic()
+
+    @staticmethod
+    def _window(table, key, stage):
+        series = table.setdefault(key, {})
+        window = series.get(stage)
+        if window is None:
+            window = series[stage] = LatencyWindow()
+        return window
+
+    def record(self, stage, seconds, token=None, endpoint=None):
+        with self._lock:
+            self._window(self._stages, None, stage).add(seconds)
+            if token:
+                self._window(self._tokens, token, stage).add(seconds)
+            if endpoint:
+                self._window(self._endpoints, endpoint, stage).add(seconds)
+        self.maybe_log()
+
+    @contextlib.contextmanager
+    def timer(self, stage, token=None, url=None):
+        """with execution_metrics.timer('quote', token, url): ... - records even when the block raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, token, endpoint_of(url))
+
+    def snapshot(self):
+        """{'stages': {stage: summary}, 'tokens': {...}, 'endpoints': {...}}"""
+        with self._lock:
+            return {
+                'stages': {stage: w.summary() for stage, w in self._stages.get(None, {}).items()},
+                'tokens': {token: {stage: w.summary() for stage, w in series.items()}
+                           for token, series in self._tokens.items()},
+                'endpoints': {host: {stage: w.summary() for stage, w in series.items()}
+                              for host, series in self._endpoints.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._tokens.clear()
+            self._endpoints.clear()
+
+    def log_line(self):
+        stages = self.snapshot()['stages']
+        parts = []
+        for stage in STAGES:
+            s = stages.get(stage)
+            if s and s['count']:
+                parts.append(f"{stage} {s['p50_ms']:.0f}/{s['p95_ms']:.0f}/{s['p99_ms']:.0f}")
+        return "⏱️ Moon Dev swap latency p50/p95/p99 ms | " + " | ".join(parts) if parts else None
+
+    def maybe_log(self):
+        if not self.log_seconds:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_log < self.log_seconds:
+                return
+            self._last_log = now
+        line = self.log_line()
+        if line:
+            cprint(line, "cyan")
+
+
+# Shared instance used by nice_funcs and the confirmation tracker
+execution_metrics = ExecutionMetrics()
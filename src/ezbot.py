@@ -17,6 +17,7 @@ not done yet
 
 from ..core.config import *
 from ..core.utils import nice_funcs as n 
+from src import trigger_engine as triggers
 import time
 from termcolor import colored, cprint
 import schedule
@@ -53,190 +54,35 @@ def bot():
 
     while action == 1:
         print('opening buying position')
-        pos = n.get_position(symbol)
-        price = n.token_price(symbol)
-        pos_usd = pos * price
-        size_needed = usd_size - pos_usd
-        if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-        else: chunk_size = size_needed
-
-        chunk_size = int(chunk_size * 10**6)
-        chunk_size = str(chunk_size)
-
-        if pos_usd > (.97 * usd_size):
-            print('position filled')
-            time.sleep(7867678)
-
-        while pos_usd < (.97 * usd_size):
-
-            print(f'position: {round(pos,2)} price: {round(price,8)} buy_under: {buy_under} pos_usd: ${round(pos_usd,2)}')
-
-            try:
-
-                for i in range(orders_per_open):
-                    n.market_buy(symbol, chunk_size, slippage)
-                    # cprint green background black text
-                    cprint(f'chunk buy submitted of {symbol[-4:]} sz: {chunk_size} you my dawg moon dev', 'white', 'on_blue')
-                    time.sleep(1)
-
-                time.sleep(tx_sleep)
-
-                pos = n.get_position(symbol)
-                price = n.token_price(symbol)
-                pos_usd = pos * price
-                size_needed = usd_size - pos_usd
-                if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-                else: chunk_size = size_needed
-                chunk_size = int(chunk_size * 10**6)
-                chunk_size = str(chunk_size)
-
-            except:
-
-                try:
-                    cprint(f'trying again to make the order in 30 seconds.....', 'light_blue', 'on_light_magenta')
-                    time.sleep(30)
-                    for i in range(orders_per_open):
-                        n.market_buy(symbol, chunk_size, slippage)
-                        # cprint green background black text
-                        cprint(f'chunk buy submitted of {symbol[-4:]} sz: {chunk_size} you my dawg moon dev', 'white', 'on_blue')
-                        time.sleep(1)
-
-                    time.sleep(tx_sleep)
-                    pos = n.get_position(symbol)
-                    price = n.token_price(symbol)
-                    pos_usd = pos * price
-                    size_needed = usd_size - pos_usd
-                    if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-                    else: chunk_size = size_needed
-                    chunk_size = int(chunk_size * 10**6)
-                    chunk_size = str(chunk_size)
-
-
-                except:
-                    cprint(f'Final Error in the buy, restart needed', 'white', 'on_red')
-                    time.sleep(10)
-                    break
-
-            time.sleep(3)
-            pos = n.get_position(symbol)
-            price = n.token_price(symbol)
-            pos_usd = pos * price
-            size_needed = usd_size - pos_usd
-            if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-            else: chunk_size = size_needed
-            chunk_size = int(chunk_size * 10**6)
-            chunk_size = str(chunk_size)
-
+        entry = n.ai_entry(symbol, usd_size)
 
         # cprint white on greeen
-        cprint(f'position filled of {symbol[-4:]} total: ${pos_usd}', 'white', 'on_green')
+        cprint(f'position filled of {symbol[-4:]} total: ${entry.position_usd}', 'white', 'on_green')
         break
 
     while action == 2:
+        print(f'stop loss: close if price under {STOPLOSS_PRICE}')
 
-        # get token price
-        pos = n.get_position(symbol)
-        price = n.token_price(symbol)
-        pos = float(pos)
-
-        print(f'stop loss: close if price under {STOPLOSS_PRICE} current price is {price}')
-
-        if price < STOPLOSS_PRICE and pos > 0:
-            print(f'selling {symbol[-4:]} bc price is {price}  is under {STOPLOSS_PRICE}')
-            n.chunk_kill(symbol, slippage)
-            print(f'chunk kill complete... thank you moon dev you are my savior 777')
-            time.sleep(15)
-
-        else:
-            print(f'price is {price} and pos is {pos}')
-            time.sleep(30)
+        # One shared price stream checks the level every TRIGGER_POLL_SECONDS
+        engine = triggers.TriggerEngine()
+        engine.add(triggers.stop_loss(symbol, STOPLOSS_PRICE, repeat=True))
+        engine.run()
 
     while action == 3:
+        print(f'breakout action called, buying over {BREAKOUT_PRICE}')
 
-        # get token price
-        pos = n.get_position(symbol)
-        price = n.token_price(symbol)
-        pos_usd = pos * price
-        size_needed = usd_size - pos_usd
-        if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-        else: chunk_size = size_needed
-
-        print(f'breakout action called, buying over {BREAKOUT_PRICE} current price is {price} & pos is ${pos_usd}')
-
-        chunk_size = int(chunk_size * 10**6)
-        chunk_size = str(chunk_size)
-
-        print(f'BREAKOUT_PRICE: {BREAKOUT_PRICE} pos_usd: {pos_usd} usd_size: {usd_size} price: {price}')
-        if (price > BREAKOUT_PRICE) and (pos_usd < usd_size):
-
-            time.sleep(1)
-            # get token price
-            pos = n.get_position(symbol)
-            price = n.token_price(symbol)
-            pos_usd = pos * price
-            size_needed = usd_size - pos_usd
-            if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-            else: chunk_size = size_needed
-
-            chunk_size = int(chunk_size * 10**6)
-            chunk_size = str(chunk_size)
-
-            if (pos_usd < usd_size) and (price > BREAKOUT_PRICE):
-                print(f'buying {symbol[-4:]} bc price is {price} and breakoutprice is {BREAKOUT_PRICE}')
-                n.breakout_entry(symbol, BREAKOUT_PRICE)
-                print('breakout entry complete, thanks moon dev...')
-                time.sleep(15)
-
-        else:
-            print(f'price is {price} and not buying or selling position is {pos_usd} and usd size is {usd_size}')
-            time.sleep(30)
+        engine = triggers.TriggerEngine()
+        engine.add(triggers.breakout(symbol, BREAKOUT_PRICE, usd_size, repeat=True))
+        engine.run()
 
 
     while action == 5:
         print(f'market maker buying below {buy_under} and selling above {sell_over}')
 
-        # get token price
-        pos = n.get_position(symbol)
-        price = n.token_price(symbol)
-        pos_usd = pos * price
-        size_needed = usd_size - pos_usd
-        if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-        else: chunk_size = size_needed
-
-        chunk_size = int(chunk_size * 10**6)
-        chunk_size = str(chunk_size)
-
-        if price > sell_over:
-            print(f'selling {symbol[-4:]} bc price is {price} and sell over is {sell_over}')
-            n.chunk_kill(symbol, slippage)
-            print(f'chunk kill complete... thank you moon dev you are my savior 777')
-            time.sleep(15)
-
-
-        elif (price < buy_under) and (pos_usd < usd_size):
-
-            time.sleep(10)
-
-            # get token price
-            pos = n.get_position(symbol)
-            price = n.token_price(symbol)
-            pos_usd = pos * price
-            size_needed = usd_size - pos_usd
-            if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-            else: chunk_size = size_needed
-
-            chunk_size = int(chunk_size * 10**6)
-            chunk_size = str(chunk_size)
-
-            if (pos_usd < usd_size) and (price < buy_under):
-                print(f'buying {symbol[-4:]} bc price is {price} and buy under is {buy_under}')
-                n.elegant_entry(symbol, buy_under)
-                print('elegant entry complete...')
-                time.sleep(15)
-
-        else:
-            print(f'price is {price} and not buying or selling position is {pos_usd} and usd size is {usd_size}')
-            time.sleep(30)
+        engine = triggers.TriggerEngine()
+        engine.add(triggers.buy_under(symbol, buy_under, usd_size, repeat=True))
+        engine.add(triggers.take_profit(symbol, sell_over, repeat=True))
+        engine.run()
 
     while action == 6:
         print('funding buy')
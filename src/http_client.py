@@ -0,0 +1,249 @@
+"""
+🌙 Moon Dev's HTTP Client
+Shared keep-alive connection pools for every Birdeye, Jupiter, DexScreener, Rugcheck and Solana RPC call
+Built with love by Moon Dev 🚀
+"""
+
+import os
+import time
+import atexit
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from termcolor import cprint
+
+from src.config import *
+from src import rate_limiter
+
+# httpx + h2 are optional - when both are installed we talk HTTP/2 to hosts that support it
+try:
+    import httpx
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+_lock = threading.Lock()
+_sessions = {}      # "scheme://host" -> requests.Session or httpx.Client
+_rpc_clients = {}   # rpc endpoint -> solana Client
+_latency = {}       # host -> latency counters
+
+
+def _host_key(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _rewrite(url):
+    """Apply HTTP_HOST_OVERRIDES so a provider (or one of its endpoints) can be pointed at a local stand-in"""
+    if not HTTP_HOST_OVERRIDES:
+        return url
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+    endpoint = host + parts.path
+    # An exact "https://host/path" key wins over the whole-host key
+    for prefix in (endpoint, host):
+        target = HTTP_HOST_OVERRIDES.get(prefix)
+        if target is not None:
+            return target.rstrip('/') + url[len(prefix):]
+    return url
+
+
+def _use_http2():
+    return HTTP2_ENABLED and HTTP2_AVAILABLE
+
+
+def _get_session(host_key):
+    """Get (or lazily create) the pooled session for a host"""
+    with _lock:
+        session = _sessions.get(host_key)
+        if session is not None:
+            return session
+
+        if _use_http2():
+            session = httpx.Client(
+                http2=True,
+                follow_redirects=True,  # requests follows redirects by default
+                timeout=HTTP_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=HTTP_POOL_SIZE,
+                    max_keepalive_connections=HTTP_POOL_SIZE,
+                ),
+            )
+        else:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+        _sessions[host_key] = session
+        return session
+
+
+def _record_latency(host_key, elapsed, failed):
+    with _lock:
+        stats = _latency.setdefault(host_key, {
+            'requests': 0,
+            'errors': 0,
+            'total_seconds': 0.0,
+            'max_seconds': 0.0,
+            'last_seconds': 0.0,
+        })
+        stats['requests'] += 1
+        stats['total_seconds'] += elapsed
+        stats['last_seconds'] = elapsed
+        stats['max_seconds'] = max(stats['max_seconds'], elapsed)
+        if failed:
+            stats['errors'] += 1
+
+
+class HttpxResponse:
+    """httpx response with requests' ok / raise_for_status, so callers keep catching requests exceptions"""
+
+    def __init__(self, response):
+        self._response = response
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+    @property
+    def ok(self):
+        return self._response.status_code < 400
+
+    def raise_for_status(self):
+        if self._response.status_code >= 400:
+            raise requests.exceptions.HTTPError(
+                f"{self._response.status_code} Error: {self._response.reason_phrase} for url: {self._response.url}",
+                response=self)
+
+
+def _httpx_request(session, method, url, kwargs):
+    """Send through httpx while keeping the requests-style call signature, response and exceptions"""
+    data = kwargs.pop('data', None)
+    if isinstance(data, (str, bytes)):
+        kwargs['content'] = data
+    elif data is not None:
+        kwargs['data'] = data
+
+    try:
+        return HttpxResponse(session.request(method, url, **kwargs))
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.Timeout(str(e)) from e
+    except httpx.TransportError as e:
+        raise requests.exceptions.ConnectionError(str(e)) from e
+    except httpx.TooManyRedirects as e:
+        raise requests.exceptions.TooManyRedirects(str(e)) from e
+    except httpx.HTTPError as e:
+        raise requests.exceptions.RequestException(str(e)) from e
+
+
+def request(method, url, **kwargs):
+    """Send a request over the shared pool for the url's host, within its provider's rate budget"""
+    if not rate_limiter.is_limited(url):
+        return _send(method, url, kwargs)
+
+    for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+        rate_limiter.acquire(url)
+        response = _send(method, url, dict(kwargs))
+        throttled = rate_limiter.record(url, response)
+        if not throttled or attempt == RATE_LIMIT_MAX_RETRIES:
+            return response
+        cprint(f"🚦 429 from {_host_key(url)} - backing off (retry {attempt + 1}/{RATE_LIMIT_MAX_RETRIES})", "yellow")
+    return response
+
+
+def _send(method, url, kwargs):
+    host_key = _host_key(url)  # latency is always reported under the real provider
+    target = _rewrite(url)
+    session = _get_session(_host_key(target))
+    kwargs.setdefault('timeout', HTTP_TIMEOUT_SECONDS)
+
+    start = time.perf_counter()
+    failed = True
+    try:
+        if _use_http2():
+            response = _httpx_request(session, method, target, kwargs)
+        else:
+            response = session.request(method, target, **kwargs)
+        failed = response.status_code >= 400
+        return response
+    finally:
+        _record_latency(host_key, time.perf_counter() - start, failed)
+
+
+def get(url, **kwargs):
+    """Pooled drop-in for requests.get"""
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    """Pooled drop-in for requests.post"""
+    return request("POST", url, **kwargs)
+
+
+def get_rpc_client(endpoint=None):
+    """Get a cached solana Client so transaction sends reuse one connection"""
+    from solana.rpc.api import Client
+
+    endpoint = endpoint or os.getenv("RPC_ENDPOINT")
+    if not endpoint:
+        raise ValueError("🚨 RPC_ENDPOINT not found in environment variables!")
+
+    with _lock:
+        client = _rpc_clients.get(endpoint)
+        if client is None:
+            client = Client(_rewrite(endpoint), timeout=HTTP_TIMEOUT_SECONDS)
+            _rpc_clients[endpoint] = client
+        return client
+
+
+def get_latency_stats():
+    """Snapshot of per-host request counts and latencies (ms)"""
+    with _lock:
+        snapshot = {}
+        for host, stats in _latency.items():
+            count = stats['requests']
+            snapshot[host] = {
+                'requests': count,
+                'errors': stats['errors'],
+                'avg_ms': (stats['total_seconds'] / count) * 1000 if count else 0.0,
+                'max_ms': stats['max_seconds'] * 1000,
+                'last_ms': stats['last_seconds'] * 1000,
+            }
+        return snapshot
+
+
+def reset_latency_stats():
+    with _lock:
+        _latency.clear()
+
+
+def print_latency_stats():
+    """Print a per-host latency table"""
+    stats = get_latency_stats()
+    if not stats:
+        cprint("📡 No HTTP requests made yet", "white", "on_blue")
+        return
+
+    cprint("\n📡 Moon Dev's HTTP latency by host:", "white", "on_blue")
+    for host, s in sorted(stats.items()):
+        print(f"  • {host}: {s['requests']} reqs | {s['errors']} errors | "
+              f"avg {s['avg_ms']:.0f}ms | max {s['max_ms']:.0f}ms | last {s['last_ms']:.0f}ms")
+
+
+def close_all():
+    """Close every pooled connection"""
+    with _lock:
+        for session in _sessions.values():
+            try:
+                session.close()
+            except Exception:
+                pass
+        _sessions.clear()
+        _rpc_clients.clear()
+
+
+atexit.register(close_all)
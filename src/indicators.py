@@ -0,0 +1,245 @@
+"""
+🌙 Moon Dev's Indicator Engine
+NumPy SMA / EMA / RSI / ATR / VWAP / Bollinger over contiguous float64 arrays
+Built with love by Moon Dev 🚀
+
+SMA and RSI reproduce pandas_ta (sma = rolling mean, rsi = Wilder RMA via
+ewm(alpha=1/length, adjust=True)) so the MA20/MA40/RSI columns are unchanged.
+IndicatorState advances the same indicators one candle at a time.
+"""
+
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _as_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def sma(close, length):
+    """Simple moving average, NaN until `length` bars are available"""
+    close = _as_array(close)
+    out = np.full(close.shape, np.nan)
+    if length < 1 or len(close) < length:
+        return out
+    out[length - 1:] = sliding_window_view(close, length).mean(axis=1)
+    return out
+
+
+def rma(values, length):
+    """Wilder's moving average - same result as pandas ewm(alpha=1/length, min_periods=length).mean()"""
+    values = _as_array(values)
+    out = np.full(values.shape, np.nan)
+    if length < 1:
+        return out
+
+    decay = 1.0 - 1.0 / length
+    num = 0.0
+    den = 0.0
+    seen = 0
+    for i, x in enumerate(values.tolist()):
+        if seen:
+            num *= decay
+            den *= decay
+        if x == x:  # not NaN
+            num += x
+            den += 1.0
+            seen += 1
+        if seen >= length:
+            out[i] = num / den
+    return out
+
+
+def ema(close, length):
+    """Exponential moving average seeded with the SMA of the first `length` bars (pandas_ta default)"""
+    close = _as_array(close)
+    out = np.full(close.shape, np.nan)
+    if length < 1 or len(close) < length:
+        return out
+
+    alpha = 2.0 / (length + 1)
+    value = close[:length].mean()
+    out[length - 1] = value
+    for i in range(length, len(close)):
+        value = alpha * close[i] + (1 - alpha) * value
+        out[i] = value
+    return out
+
+
+def rsi(close, length=14):
+    """Relative strength index on Wilder averages of gains and losses"""
+    close = _as_array(close)
+    diff = np.full(close.shape, np.nan)
+    diff[1:] = np.diff(close)
+    gains = np.where(diff > 0, diff, np.where(np.isnan(diff), np.nan, 0.0))
+    losses = np.where(diff < 0, -diff, np.where(np.isnan(diff), np.nan, 0.0))
+
+    avg_gain = rma(gains, length)
+    avg_loss = rma(losses, length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 * avg_gain / (avg_gain + avg_loss)
+
+
+def true_range(high, low, close):
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    # fmax skips the NaN previous close on the first bar, leaving high - low
+    out = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+    return out
+
+
+def atr(high, low, close, length=14):
+    """Average true range (Wilder smoothing)"""
+    return rma(true_range(high, low, close), length)
+
+
+def vwap(high, low, close, volume):
+    """Cumulative volume weighted average of the typical price over the frame"""
+    typical = (_as_array(high) + _as_array(low) + _as_array(close)) / 3
+    volume = _as_array(volume)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.cumsum(typical * volume) / np.cumsum(volume)
+
+
+def bollinger(close, length=20, std=2.0):
+    """(lower, middle, upper) bands using population standard deviation"""
+    close = _as_array(close)
+    middle = sma(close, length)
+    deviation = np.full(close.shape, np.nan)
+    if length >= 1 and len(close) >= length:
+        deviation[length - 1:] = sliding_window_view(close, length).std(axis=1)
+    return middle - std * deviation, middle, middle + std * deviation
+
+
+def add_trend_indicators(df, ma_fast=20, ma_slow=40, rsi_length=14):
+    """Add MA20 / RSI / MA40 and the trend flag columns used by every get_data"""
+    close = df['Close'].to_numpy(dtype=np.float64)
+    df['MA20'] = sma(close, ma_fast)
+    df['RSI'] = rsi(close, rsi_length)
+    df['MA40'] = sma(close, ma_slow)
+
+    df['Price_above_MA20'] = df['Close'] > df['MA20']
+    df['Price_above_MA40'] = df['Close'] > df['MA40']
+    df['MA20_above_MA40'] = df['MA20'] > df['MA40']
+    return df
+
+
+class IndicatorState:
+    """Incremental indicators - update() advances one candle without touching history"""
+
+    def __init__(self, ma_fast=20, ma_slow=40, rsi_length=14, ema_length=20, atr_length=14, bb_length=20, bb_std=2.0):
+        self.ma_fast = ma_fast
+        self.ma_slow = ma_slow
+        self.rsi_length = rsi_length
+        self.ema_length = ema_length
+        self.atr_length = atr_length
+        self.bb_length = bb_length
+        self.bb_std = bb_std
+
+        self._window = deque(maxlen=max(ma_fast, ma_slow, bb_length, ema_length))
+        self._prev_close = None
+        self._rsi_decay = 1.0 - 1.0 / rsi_length
+        self._gain = [0.0, 0.0]  # rma numerator, denominator
+        self._loss = [0.0, 0.0]
+        self._rsi_seen = 0
+        self._ema = None
+        self._atr_decay = 1.0 - 1.0 / atr_length
+        self._atr = [0.0, 0.0]
+        self._atr_seen = 0
+        self._pv = 0.0
+        self._vol = 0.0
+        self.count = 0
+        self.values = {}
+
+    @classmethod
+    def from_history(cls, close, high=None, low=None, volume=None, **kwargs):
+        """Warm a state from existing candles"""
+        state = cls(**kwargs)
+        close = _as_array(close).tolist()
+        high = _as_array(high).tolist() if high is not None else close
+        low = _as_array(low).tolist() if low is not None else close
+        volume = _as_array(volume).tolist() if volume is not None else [0.0] * len(close)
+        for h, l, c, v in zip(high, low, close, volume):
+            state.update(c, h, l, v)
+        return state
+
+    def _mean(self, length):
+        if len(self._window) < length:
+            return np.nan
+        window = list(self._window)[-length:]
+        return sum(window) / length
+
+    @staticmethod
+    def _rma_step(acc, x, decay, seen):
+        if seen:
+            acc[0] *= decay
+            acc[1] *= decay
+        acc[0] += x
+        acc[1] += 1.0
+        return acc[0] / acc[1]
+
+    def update(self, close, high=None, low=None, volume=0.0):
+        """Feed one closed candle, returns the latest indicator values"""
+        high = close if high is None else high
+        low = close if low is None else low
+        self._window.append(close)
+        self.count += 1
+
+        # RSI
+        rsi_value = np.nan
+        if self._prev_close is not None:
+            change = close - self._prev_close
+            avg_gain = self._rma_step(self._gain, max(change, 0.0), self._rsi_decay, self._rsi_seen)
+            avg_loss = self._rma_step(self._loss, max(-change, 0.0), self._rsi_decay, self._rsi_seen)
+            self._rsi_seen += 1
+            if self._rsi_seen >= self.rsi_length:
+                total = avg_gain + avg_loss
+                rsi_value = 100 * avg_gain / total if total else np.nan
+
+        # ATR
+        if self._prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        atr_value = self._rma_step(self._atr, tr, self._atr_decay, self._atr_seen)
+        self._atr_seen += 1
+        if self._atr_seen < self.atr_length:
+            atr_value = np.nan
+
+        # EMA (SMA seeded)
+        if self._ema is None:
+            if self.count == self.ema_length:
+                self._ema = self._mean(self.ema_length)
+        else:
+            alpha = 2.0 / (self.ema_length + 1)
+            self._ema = alpha * close + (1 - alpha) * self._ema
+
+        # VWAP
+        self._pv += (high + low + close) / 3 * volume
+        self._vol += volume
+
+        # Bollinger
+        middle = self._mean(self.bb_length)
+        if middle == middle:
+            window = np.fromiter(list(self._window)[-self.bb_length:], dtype=np.float64)
+            width = self.bb_std * window.std()
+        else:
+            width = np.nan
+
+        self._prev_close = close
+        self.values = {
+            'MA20': self._mean(self.ma_fast),
+            'MA40': self._mean(self.ma_slow),
+            'RSI': rsi_value,
+            'EMA': self._ema if self._ema is not None else np.nan,
+            'ATR': atr_value,
+            'VWAP': self._pv / self._vol if self._vol else np.nan,
+            'BB_lower': middle - width,
+            'BB_middle': middle,
+            'BB_upper': middle + width,
+        }
+        return self.values
@@ -0,0 +1,80 @@
+"""
+🌙 Moon Dev's Liquidation Engine
+Flatten many positions at once - biggest exposure first, every exit running side by side
+Built with love by Moon Dev 🚀
+
+Each position's exit runs on its own worker, so flattening the book takes about
+as long as the slowest single exit. Jupiter quotes and swaps from every worker
+go through http_client and share the 'quote-api.jup.ag' budget in RATE_LIMITS.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from termcolor import cprint
+
+from src.config import *
+
+
+def eligible_positions(positions, only=None, exclude=None, min_usd=LIQUIDATION_MIN_USD):
+    """Filter a holdings DataFrame down to the positions worth closing"""
+    if positions is None or positions.empty:
+        return positions
+    keep = positions['USD Value'].astype(float) >= min_usd
+    if only is not None:
+        keep &= positions['Mint Address'].isin(only)
+    if exclude:
+        keep &= ~positions['Mint Address'].isin(exclude)
+    return positions[keep]
+
+
+def liquidate_positions(positions, exit_func, max_workers=LIQUIDATION_WORKERS):
+    """
+    Run exit_func(mint) for every row of positions concurrently
+
+    Rows are submitted in USD value order so the largest exposure grabs a worker
+    (and the rate budget) first. Returns {mint: {'closed', 'usd_value', 'seconds', 'error'}}.
+    exit_func counts as successful unless it returns False or raises.
+    """
+    if positions is None or positions.empty:
+        cprint("📝 Nothing to liquidate", "white", "on_blue")
+        return {}
+
+    rows = list(zip(positions['Mint Address'], positions['USD Value'].astype(float)))
+    rows.sort(key=lambda row: row[1], reverse=True)
+    total_usd = sum(usd for _, usd in rows)
+    cprint(f"\n🚨 Moon Dev's liquidation engine closing {len(rows)} positions (${total_usd:.2f}) "
+           f"with {min(max_workers, len(rows))} workers", "white", "on_red")
+
+    results = {}
+    started = time.monotonic()
+
+    def _exit(mint, usd_value):
+        cprint(f"🔪 Exiting {mint[:8]}... (${usd_value:.2f})", "white", "on_cyan")
+        start = time.monotonic()
+        try:
+            closed = exit_func(mint) is not False
+            error = None
+        except Exception as e:
+            closed = False
+            error = str(e)
+        return {'closed': closed, 'usd_value': usd_value, 'seconds': time.monotonic() - start, 'error': error}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(rows)))) as pool:
+        futures = {pool.submit(_exit, mint, usd): mint for mint, usd in rows}
+        for future in as_completed(futures):
+            mint = futures[future]
+            result = future.result()
+            results[mint] = result
+            done = len(results)
+            if result['closed']:
+                cprint(f"✅ [{done}/{len(rows)}] Closed {mint[:8]}... (${result['usd_value']:.2f}) "
+                       f"in {result['seconds']:.1f}s", "white", "on_green")
+            else:
+                cprint(f"❌ [{done}/{len(rows)}] Could not close {mint[:8]}... (${result['usd_value']:.2f}) "
+                       f"{result['error'] or ''}", "white", "on_red")
+
+    closed = sum(1 for r in results.values() if r['closed'])
+    cprint(f"\n✨ Liquidation finished: {closed}/{len(rows)} positions closed in "
+           f"{time.monotonic() - started:.1f}s", "white", "on_green" if closed == len(rows) else "on_red")
+    return results
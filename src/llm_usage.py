@@ -0,0 +1,79 @@
+"""
+🌙 Moon Dev's LLM Usage
+Prompt-cached system blocks and per-agent token accounting for Claude calls
+Built with love by Moon Dev 🚀
+
+cached_system() turns an agent's static prompt text into system blocks. The
+last block is marked with cache_control, so Claude reuses that prefix instead
+of re-reading it on every call. create_message() wraps
+client.messages.create and records each response's input, cache read, cache
+write and output tokens per agent. token_usage.snapshot() returns the totals.
+Claude only caches prefixes above a model minimum (1024 tokens, 2048 on
+Haiku). A shorter prompt is simply reported as uncached input.
+"""
+
+import threading
+
+from termcolor import cprint
+
+from src.config import *
+
+USAGE_FIELDS = ('input_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens', 'output_tokens')
+
+
+def cached_system(*parts):
+    """System blocks for the static prompt parts - the prefix up to the last block is cached"""
+    blocks = [{"type": "text", "text": part} for part in parts if part]
+    if blocks and PROMPT_CACHE_ENABLED:
+        blocks[-1]["cache_control"] = {"type": "ephemeral"}
+    return blocks
+
+
+class TokenUsage:
+    """Thread-safe per-agent totals of Claude token usage"""
+
+    def __init__(self):
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    def record(self, agent, usage):
+        """Add one response's usage - returns this call's counts"""
+        counts = {field: int(getattr(usage, field, 0) or 0) for field in USAGE_FIELDS}
+        with self._lock:
+            totals = self._agents.setdefault(agent, dict.fromkeys(('calls',) + USAGE_FIELDS, 0))
+            totals['calls'] += 1
+            for field, value in counts.items():
+                totals[field] += value
+        return counts
+
+    def snapshot(self):
+        """{agent: {'calls', token fields..., 'cached_share'}}"""
+        with self._lock:
+            agents = {agent: dict(totals) for agent, totals in self._agents.items()}
+        for totals in agents.values():
+            prompt_tokens = totals['input_tokens'] + totals['cache_read_input_tokens'] + totals['cache_creation_input_tokens']
+            totals['cached_share'] = totals['cache_read_input_tokens'] / prompt_tokens if prompt_tokens else 0.0
+        return agents
+
+    def reset(self):
+        with self._lock:
+            self._agents.clear()
+
+
+def create_message(client, agent, system=None, **kwargs):
+    """client.messages.create with a cached system prompt - logs and records the call's token usage"""
+    if system is not None:
+        parts = system if isinstance(system, (list, tuple)) else (system,)
+        kwargs['system'] = cached_system(*parts)
+    message = client.messages.create(**kwargs)
+
+    counts = token_usage.record(agent, getattr(message, 'usage', None))
+    share = token_usage.snapshot()[agent]['cached_share']
+    cprint(f"🧾 {agent}: {counts['input_tokens']} uncached + {counts['cache_read_input_tokens']} cached "
+           f"+ {counts['cache_creation_input_tokens']} cache-write in, {counts['output_tokens']} out "
+           f"({share:.0%} of {agent} input cached so far)", "cyan")
+    return message
+
+
+# Shared instance - every agent records into it
+token_usage = TokenUsage()
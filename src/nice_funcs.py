@@ -14,7 +14,7 @@ import time
 import json
 import numpy as np
 import datetime
-import pandas_ta as ta
+from decimal import Decimal
 from datetime import datetime, timedelta
 from termcolor import colored, cprint
 import solders
@@ -23,6 +23,19 @@ import shutil
 import atexit
 import pytz
 from solders.pubkey import Pubkey
+from src import http_client
+from src.candle_store import get_candle_store, candles_to_ohlcv_frame
+from src.indicators import add_trend_indicators
+from src.price_cache import price_cache
+from src.wallet_snapshot import wallet_snapshots
+from src.token_registry import get_token_registry
+from src.confirmation_tracker import confirmation_tracker, CONFIRMED
+from src.chain_state import chain_state
+from src.execution_metrics import execution_metrics
+from src.position_ledger import get_position_ledger
+from src.concurrency import map_ordered
+from src.liquidation import eligible_positions, liquidate_positions
+from src.order_engine import enter, target_size_policy, buy_under_policy, breakout_policy
 
 # Load environment variables
 load_dotenv()
@@ -32,6 +45,11 @@ BIRDEYE_API_KEY = os.getenv("BIRDEYE_API_KEY")
 if not BIRDEYE_API_KEY:
     raise ValueError("🚨 BIRDEYE_API_KEY not found in environment variables!")
 
+if PAPER_TRADING:
+    # Swaps, confirmations and wallet balances come from the local paper exchange from here on
+    from src.paper_exchange import enable_paper_trading
+    enable_paper_trading()
+
 sample_address = "2yXTyarttn2pTZ6cwt4DqmrRuBw1G7pmFv9oT6MStdKP"
 
 BASE_URL = "https://public-api.birdeye.so/defi"
@@ -70,28 +88,35 @@ def token_creation_info(address):
     'tokenAddress': '9dQi5nMznCAcgDPUMDPkRqG8bshMFnzCmcyzD8afjGJm',
     'txHash': 'ZJGoayaNDf2dLzknCjjaE9QjqxocA94pcegiF1oLsGZ841EMWBEc7TnDKLvCnE8cCVfkvoTNYCdMyhrWFFwPX6R'}
     '''
+    registry = get_token_registry()
+    creation_data = registry.get_creation_info(address)
+    if creation_data:
+        print_pretty_json(creation_data)
+        return creation_data
+
     # API endpoint for getting token creation information
     url = f"{BASE_URL}/token_creation_info?address={address}"
     headers = {"X-API-KEY": BIRDEYE_API_KEY}
 
     # Sending a GET request to the API
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url, headers=headers)
 
     if response.status_code == 200:
         # Parse the JSON response
         creation_data = response.json()['data']
         print_pretty_json(creation_data)
+        if creation_data:
+            registry.set_creation_info(address, creation_data)
+        return creation_data
     else:
         print("Failed to retrieve token creation info:", response.status_code)
 
 def market_buy(token, amount, slippage):
-    import requests
     import sys
     import json
     import base64
     from solders.keypair import Keypair
     from solders.transaction import VersionedTransaction
-    from solana.rpc.api import Client
     from solana.rpc.types import TxOpts
 
     KEY = Keypair.from_base58_string(os.getenv("SOLANA_PRIVATE_KEY"))
@@ -102,37 +127,47 @@ def market_buy(token, amount, slippage):
 
     QUOTE_TOKEN = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v" # usdc
 
-    http_client = Client(os.getenv("RPC_ENDPOINT"))
+    rpc_client = http_client.get_rpc_client(os.getenv("RPC_ENDPOINT"))
+    chain_state.start()  # no-op once running - fee and block height stay warm for the next swap
     #print('http client success')
-    if not http_client:
-        raise ValueError("🚨 RPC_ENDPOINT not found in environment variables!")
+    submit_start = time.perf_counter()
 
-    quote = requests.get(f'https://quote-api.jup.ag/v6/quote?inputMint={QUOTE_TOKEN}&outputMint={token}&amount={amount}&slippageBps={SLIPPAGE}').json()
+    quote_url = f'https://quote-api.jup.ag/v6/quote?inputMint={QUOTE_TOKEN}&outputMint={token}&amount={amount}&slippageBps={SLIPPAGE}'
+    with execution_metrics.timer('quote', token, quote_url):
+        quote = http_client.get(quote_url).json()
     #print(quote)
 
-    txRes = requests.post('https://quote-api.jup.ag/v6/swap',
-                          headers={"Content-Type": "application/json"},
-                          data=json.dumps({
-                              "quoteResponse": quote,
-                              "userPublicKey": str(KEY.pubkey()),
-                              "prioritizationFeeLamports": PRIORITY_FEE  # or replace 'auto' with your specific lamport value
-                          })).json()
+    swap_url = 'https://quote-api.jup.ag/v6/swap'
+    with execution_metrics.timer('swap', token, swap_url):
+        txRes = http_client.post(swap_url,
+                              headers={"Content-Type": "application/json"},
+                              data=json.dumps({
+                                  "quoteResponse": quote,
+                                  "userPublicKey": str(KEY.pubkey()),
+                                  "prioritizationFeeLamports": chain_state.priority_fee_lamports()  # from memory - refreshed in the background
+                              })).json()
     #print(txRes)
-    swapTx = base64.b64decode(txRes['swapTransaction'])
-    #print(swapTx)
-    tx1 = VersionedTransaction.from_bytes(swapTx)
-    tx = VersionedTransaction(tx1.message, [KEY])
-    txId = http_client.send_raw_transaction(bytes(tx), TxOpts(skip_preflight=True)).value
+    with execution_metrics.timer('sign', token):
+        swapTx = base64.b64decode(txRes['swapTransaction'])
+        #print(swapTx)
+        tx1 = VersionedTransaction.from_bytes(swapTx)
+        tx = VersionedTransaction(tx1.message, [KEY])
+    with execution_metrics.timer('send', token, os.getenv("RPC_ENDPOINT")):
+        txId = rpc_client.send_raw_transaction(bytes(tx), TxOpts(skip_preflight=True)).value
+    execution_metrics.record('submit', time.perf_counter() - submit_start, token)
     print(f"https://solscan.io/tx/{str(txId)}")
+    price_cache.invalidate(token)  # our own fill moves thin books - re-price on next read
+    wallet_snapshots.invalidate()  # balances changed - next read re-downloads the wallet
+    expect_fill(str(txId), token, 'buy', quote['outAmount'], amount)
+    confirmation_tracker.track(str(txId), txRes.get('lastValidBlockHeight'), token)
+    return str(txId)
 
 def market_sell(QUOTE_TOKEN, amount, slippage):
-    import requests
     import sys
     import json
     import base64
     from solders.keypair import Keypair
     from solders.transaction import VersionedTransaction
-    from solana.rpc.api import Client
     from solana.rpc.types import TxOpts
 
     KEY = Keypair.from_base58_string(os.getenv("SOLANA_PRIVATE_KEY"))
@@ -144,29 +179,70 @@ def market_sell(QUOTE_TOKEN, amount, slippage):
     # token would be usdc for sell orders cause we are selling
     token = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"  # USDC
 
-    http_client = Client(os.getenv("RPC_ENDPOINT"))
-    if not http_client:
-        raise ValueError("🚨 RPC_ENDPOINT not found in environment variables!")
-    print('http client success')
+    rpc_client = http_client.get_rpc_client(os.getenv("RPC_ENDPOINT"))
+    chain_state.start()  # no-op once running - fee and block height stay warm for the next swap
+    submit_start = time.perf_counter()
 
-    quote = requests.get(f'https://quote-api.jup.ag/v6/quote?inputMint={QUOTE_TOKEN}&outputMint={token}&amount={amount}&slippageBps={SLIPPAGE}').json()
+    quote_url = f'https://quote-api.jup.ag/v6/quote?inputMint={QUOTE_TOKEN}&outputMint={token}&amount={amount}&slippageBps={SLIPPAGE}'
+    with execution_metrics.timer('quote', QUOTE_TOKEN, quote_url):
+        quote = http_client.get(quote_url).json()
     #print(quote)
-    txRes = requests.post('https://quote-api.jup.ag/v6/swap',
-                          headers={"Content-Type": "application/json"},
-                          data=json.dumps({
-                              "quoteResponse": quote,
-                              "userPublicKey": str(KEY.pubkey()),
-                              "prioritizationFeeLamports": PRIORITY_FEE
-                          })).json()
+    swap_url = 'https://quote-api.jup.ag/v6/swap'
+    with execution_metrics.timer('swap', QUOTE_TOKEN, swap_url):
+        txRes = http_client.post(swap_url,
+                              headers={"Content-Type": "application/json"},
+                              data=json.dumps({
+                                  "quoteResponse": quote,
+                                  "userPublicKey": str(KEY.pubkey()),
+                                  "prioritizationFeeLamports": chain_state.priority_fee_lamports()
+                              })).json()
     #print(txRes)
-    swapTx = base64.b64decode(txRes['swapTransaction'])
-    #print(swapTx)
-    tx1 = VersionedTransaction.from_bytes(swapTx)
-    #print(tx1)
-    tx = VersionedTransaction(tx1.message, [KEY])
-    #print(tx)
-    txId = http_client.send_raw_transaction(bytes(tx), TxOpts(skip_preflight=True)).value
+    with execution_metrics.timer('sign', QUOTE_TOKEN):
+        swapTx = base64.b64decode(txRes['swapTransaction'])
+        #print(swapTx)
+        tx1 = VersionedTransaction.from_bytes(swapTx)
+        #print(tx1)
+        tx = VersionedTransaction(tx1.message, [KEY])
+        #print(tx)
+    with execution_metrics.timer('send', QUOTE_TOKEN, os.getenv("RPC_ENDPOINT")):
+        txId = rpc_client.send_raw_transaction(bytes(tx), TxOpts(skip_preflight=True)).value
+    execution_metrics.record('submit', time.perf_counter() - submit_start, QUOTE_TOKEN)
     print(f"https://solscan.io/tx/{str(txId)}")
+    price_cache.invalidate(QUOTE_TOKEN)  # our own fill moves thin books - re-price on next read
+    wallet_snapshots.invalidate()  # balances changed - next read re-downloads the wallet
+    expect_fill(str(txId), QUOTE_TOKEN, 'sell', amount, quote['outAmount'])
+    confirmation_tracker.track(str(txId), txRes.get('lastValidBlockHeight'), QUOTE_TOKEN)
+    return str(txId)
+
+def expect_fill(signature, token, side, raw_token_amount, raw_usdc_amount):
+    """Tell the position ledger what a sent swap fills (Jupiter quote amounts) - applied on confirmation"""
+    try:
+        token_amount = int(raw_token_amount) / 10**get_decimals(token)
+        usd_amount = int(raw_usdc_amount) / 10**6
+        get_position_ledger().expect(signature, token, side, token_amount, usd_amount)
+    except Exception as e:
+        # The wallet reconcile will pick the fill up instead
+        cprint(f"⚠️ Could not record expected fill for {token[:8]}: {str(e)}", "yellow")
+        get_position_ledger().mark_dirty()
+
+def confirm_orders(signatures, token=None, timeout=None):
+    """Wait for submitted swaps to land, then drop the balances and prices they changed"""
+    signatures = [s for s in signatures if s]
+    if not signatures:
+        return {}
+
+    results = confirmation_tracker.wait(signatures, timeout)
+    # A snapshot read between submit and landing still shows the old balance
+    wallet_snapshots.invalidate()
+    price_cache.invalidate(token)
+
+    confirmed = sum(1 for r in results.values() if r['status'] == CONFIRMED)
+    slowest = max((r['seconds'] or 0) for r in results.values())
+    cprint(f"⛓️ {confirmed}/{len(results)} orders confirmed in {slowest:.1f}s", "white", "on_blue")
+    for signature, result in results.items():
+        if result['status'] != CONFIRMED:
+            cprint(f"❌ Order {signature[:8]}... {result['status']} {result['err'] or ''}", "white", "on_red")
+    return results
 
 def get_time_range():
 
@@ -193,71 +269,41 @@ def get_time_range(days_back):
 
     return time_from, time_to
 
-def get_data(address, days_back_4_data, timeframe):
-    time_from, time_to = get_time_range(days_back_4_data)
-    # Check temp data first
-    # temp_file = f"temp_data/{address}_latest.csv"
-    # if os.path.exists(temp_file):
-    #    print(f"📂 Moon Dev found cached data for {address[:4]}")
-    #    return pd.read_csv(temp_file)
-
+def fetch_ohlcv_items(address, timeframe, time_from, time_to):
+    """Fetch raw Birdeye OHLCV items, returns None if the request failed"""
     url = f"https://public-api.birdeye.so/defi/ohlcv?address={address}&type={timeframe}&time_from={time_from}&time_to={time_to}"
 
     headers = {"X-API-KEY": BIRDEYE_API_KEY}
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        json_response = response.json()
-        items = json_response.get('data', {}).get('items', [])
-
-
-        processed_data = [{
-            'Datetime (UTC)': datetime.utcfromtimestamp(item['unixTime']).strftime('%Y-%m-%d %H:%M:%S'),
-            'Open': item['o'],
-            'High': item['h'],
-            'Low': item['l'],
-            'Close': item['c'],
-            'Volume': item['v']
-        } for item in items]
-
-        df = pd.DataFrame(processed_data)
-        # Remove any rows with dates far in the future
-        current_date = datetime.now(pytz.utc)  # Ensure current date is in UTC
+    response = http_client.get(url, headers=headers)
+    if response.status_code != 200:
+        print(f"❌ MoonDev Error: Failed to fetch data for address {address}. Status code: {response.status_code}")
+        if response.status_code == 401:
+            print("🔑 Check your BIRDEYE_API_KEY in .env file!")
+        return None
 
-        # Localize the fetched data to UTC
-        df['datetime_obj'] = pd.to_datetime(df['Datetime (UTC)'])
-        df['datetime_obj'] = df['datetime_obj'].dt.tz_localize('UTC')
+    return response.json().get('data', {}).get('items', [])
 
-        # Now filter based on the current date
-        df = df[df['datetime_obj'] <= current_date]
-        df = df.drop('datetime_obj', axis=1)
+def get_data(address, days_back_4_data, timeframe):
+    time_from, time_to = get_time_range(days_back_4_data)
 
-        # Pad if needed
-        if len(df) < 40:
+    # Only candles newer than what the candle store already holds are downloaded
+    candles = get_candle_store().get_candles(
+        address, timeframe, time_from, time_to,
+        lambda fetch_from, fetch_to: fetch_ohlcv_items(address, timeframe, fetch_from, fetch_to)
+    )
+    if candles is not None:
+        # Straight from int64/float64 arrays - future bars filtered and short frames padded to 40 rows in one pass
+        if 0 < np.count_nonzero(candles['unixTime'] <= int(time.time())) < 40:
             print(f"🌙 MoonDev Alert: Padding data to ensure minimum 40 rows for analysis! 🚀")
-            rows_to_add = 40 - len(df)
-            first_row_replicated = pd.concat([df.iloc[0:1]] * rows_to_add, ignore_index=True)
-            df = pd.concat([first_row_replicated, df], ignore_index=True)
+        df = candles_to_ohlcv_frame(candles, min_rows=40)
 
         print(f"📊 MoonDev's Data Analysis Ready! Processing {len(df)} candles... 🎯")
 
-        # Always save to temp for current run
-        # df.to_csv(temp_file)
-        # print(f"🔄 Moon Dev cached data for {address[:4]}")
-
-        # Calculate indicators
-        df['MA20'] = ta.sma(df['Close'], length=20)
-        df['RSI'] = ta.rsi(df['Close'], length=14)
-        df['MA40'] = ta.sma(df['Close'], length=40)
-
-        df['Price_above_MA20'] = df['Close'] > df['MA20']
-        df['Price_above_MA40'] = df['Close'] > df['MA40']
-        df['MA20_above_MA40'] = df['MA20'] > df['MA40']
+        # Calculate indicators in one NumPy pass
+        add_trend_indicators(df, ma_fast=20, ma_slow=40, rsi_length=14)
 
         return df
     else:
-        print(f"❌ MoonDev Error: Failed to fetch data for address {address}. Status code: {response.status_code}")
-        if response.status_code == 401:
-            print("🔑 Check your BIRDEYE_API_KEY in .env file!")
         return pd.DataFrame()
 
 def fetch_wallet_holdings_og(address):
@@ -269,17 +315,22 @@ def fetch_wallet_holdings_og(address):
 
     url = f"https://public-api.birdeye.so/v1/wallet/token_list?wallet={address}"
     headers = {"x-chain": "solana", "X-API-KEY": API_KEY}
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url, headers=headers)
 
     if response.status_code == 200:
         json_response = response.json()
 
         if 'data' in json_response and 'items' in json_response['data']:
-            df = pd.DataFrame(json_response['data']['items'])
-            df = df[['address', 'uiAmount', 'valueUsd']]
-            df = df.rename(columns={'address': 'Mint Address', 'uiAmount': 'Amount', 'valueUsd': 'USD Value'})
-            df = df.dropna()
-            df = df[df['USD Value'] > 0.05]
+            # Every held token's decimals/symbol/name come for free with this call
+            get_token_registry().seed_from_wallet_items(json_response['data']['items'])
+
+            if json_response['data']['items']:
+                df = pd.DataFrame(json_response['data']['items'])
+                df = df[['address', 'uiAmount', 'valueUsd']]
+                df = df.rename(columns={'address': 'Mint Address', 'uiAmount': 'Amount', 'valueUsd': 'USD Value'})
+                df = df.dropna()
+                df = df[df['USD Value'] > 0.05]
+            df.attrs['complete'] = True  # a real answer - empty now means the wallet holds nothing
         else:
             cprint("No data available in the response.", 'white', 'on_red')
 
@@ -300,27 +351,80 @@ def fetch_wallet_holdings_og(address):
 
     return df
 
-def fetch_wallet_token_single(address, token_mint_address):
+def get_wallet_snapshot(wallet=address, max_age=None):
+    """Holdings snapshot indexed by mint - downloads the wallet at most once per WALLET_SNAPSHOT_TTL_SECONDS"""
+    snapshot = wallet_snapshots.get(wallet, fetch_wallet_holdings_og, max_age)
+    if wallet == address:
+        # Every download of our own wallet doubles as a ledger reconcile
+        get_position_ledger().reconcile(snapshot.df, time.time() - snapshot.age(), source=snapshot,
+                                        complete=snapshot.complete)
+    return snapshot
 
-    df = fetch_wallet_holdings_og(address)
+def refresh_wallet_snapshot(wallet=address):
+    """Force a fresh wallet download (call once at the start of a cycle)"""
+    wallet_snapshots.invalidate(wallet)
+    return get_wallet_snapshot(wallet)
 
-    # filter by token mint address
-    df = df[df['Mint Address'] == token_mint_address]
+def fetch_wallet_token_single(address, token_mint_address):
 
-    return df
+    # filter the shared snapshot by token mint address
+    return get_wallet_snapshot(address).rows(token_mint_address)
+
+def token_price(address, max_age=None):
+    cached = price_cache.get(address, max_age)
+    if cached is not None:
+        return cached
 
-def token_price(address):
     url = f"https://public-api.birdeye.so/defi/price?address={address}"
     headers = {"X-API-KEY": BIRDEYE_API_KEY}
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url, headers=headers)
     price_data = response.json()
 
     print(price_data)
 
     if price_data['success']:
-        return price_data['data']['value']
+        price = price_data['data']['value']
+        price_cache.set(address, price)
+        return price
     else:
         return None
+
+def token_prices(addresses, max_age=None):
+    """Price a list of mints with one Birdeye multi_price call per PRICE_BATCH_SIZE mints"""
+    addresses = list(dict.fromkeys(addresses))  # de-dupe, keep order
+    prices, missing = price_cache.get_many(addresses, max_age)
+
+    headers = {"X-API-KEY": BIRDEYE_API_KEY}
+    for i in range(0, len(missing), PRICE_BATCH_SIZE):
+        batch = missing[i:i + PRICE_BATCH_SIZE]
+        url = f"https://public-api.birdeye.so/defi/multi_price?list_address={','.join(batch)}"
+        try:
+            response = http_client.get(url, headers=headers)
+            price_data = response.json()
+        except Exception as e:
+            cprint(f"❌ Moon Dev's multi price lookup failed: {str(e)}", "white", "on_red")
+            continue
+
+        if not price_data.get('success'):
+            cprint(f"❌ Moon Dev's multi price lookup failed: {price_data}", "white", "on_red")
+            continue
+
+        fetched = {}
+        for mint, info in (price_data.get('data') or {}).items():
+            if info and info.get('value') is not None:
+                fetched[mint] = info['value']
+        price_cache.set_many(fetched)
+        prices.update(fetched)
+
+    return {mint: prices.get(mint) for mint in addresses}
+
+def get_execution_metrics():
+    """Per-stage swap latency percentiles by stage, token and endpoint"""
+    return execution_metrics.snapshot()
+
+def invalidate_price(address=None):
+    """Forget a cached price (or every cached price when address is None)"""
+    price_cache.invalidate(address)
     
 def get_position(token_mint_address):
     """
@@ -333,27 +437,25 @@ def get_position(token_mint_address):
     Returns:
     - The balance of the specified token if found, otherwise a message indicating the token is not in the wallet.
     """
-    dataframe = fetch_wallet_token_single(address, token_mint_address)
+    # Our own fills keep the ledger current - only touch the wallet when it is due a reconcile
+    ledger_amount = get_position_ledger().amount(token_mint_address)
+    if ledger_amount is not None:
+        return ledger_amount
 
-    #dataframe = pd.read_csv('data/token_per_addy.csv')
+    # Cached snapshot within WALLET_SNAPSHOT_TTL_SECONDS - our swaps already invalidate it
+    snapshot = get_wallet_snapshot(address)
 
     print('-----------------')
-    #print(dataframe)
 
-    #print(dataframe)
-
-    # Check if the DataFrame is empty
-    if dataframe.empty:
+    # Check if the snapshot is empty
+    if snapshot.df.empty:
         print("The DataFrame is empty. No positions to show.")
         return 0  # Indicating no balance found
 
-    # Ensure 'Mint Address' column is treated as string for reliable comparison
-    dataframe['Mint Address'] = dataframe['Mint Address'].astype(str)
-
-    # Check if the token mint address exists in the DataFrame
-    if dataframe['Mint Address'].isin([token_mint_address]).any():
+    # Check if the token mint address exists in the snapshot
+    if snapshot.has(token_mint_address):
         # Get the balance for the specified token
-        balance = dataframe.loc[dataframe['Mint Address'] == token_mint_address, 'Amount'].iloc[0]
+        balance = snapshot.amount(token_mint_address)
         #print(f"Balance for {token_mint_address[-4:]} token: {balance}")
         return balance
     else:
@@ -362,32 +464,10 @@ def get_position(token_mint_address):
         return 0  # Indicating no balance found
 
 def get_decimals(token_mint_address):
-    import requests
-    import base64
-    import json
-    # Solana Mainnet RPC endpoint
-    url = "https://api.mainnet-beta.solana.com/"
-    headers = {"Content-Type": "application/json"}
-
-    # Request payload to fetch account information
-    payload = json.dumps({
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getAccountInfo",
-        "params": [
-            token_mint_address,
-            {
-                "encoding": "jsonParsed"
-            }
-        ]
-    })
-
-    # Make the request to Solana RPC
-    response = requests.post(url, headers=headers, data=payload)
-    response_json = response.json()
-
-    # Parse the response to extract the number of decimals
-    decimals = response_json['result']['value']['data']['parsed']['info']['decimals']
+    """Token decimals from the persistent token registry (one getMultipleAccounts load per new mint)"""
+    decimals = get_token_registry().decimals(token_mint_address)
+    if decimals is None:
+        raise ValueError(f"🚨 Could not load decimals for {token_mint_address}")
     #print(f"Decimals for {token_mint_address[-4:]} token: {decimals}")
 
     return decimals
@@ -507,8 +587,14 @@ def pnl_close(token_mint_address):
     else:
         print(f'for {token_mint_address[:4]} value is {usd_value} and tp is {tp} so not closing...')
 
+def split_raw_amount(raw_amount, chunks):
+    """Split an integer token amount into near-equal chunks that sum back to it exactly"""
+    chunks = max(1, min(chunks, raw_amount))
+    base, extra = divmod(raw_amount, chunks)
+    return [base + (1 if i < extra else 0) for i in range(chunks)]
+
 def chunk_kill(token_mint_address, slippage):
-    """Kill a position in chunks"""
+    """Kill a position in concurrently submitted chunks - True once the wallet shows it closed"""
     cprint(f"\n🔪 Moon Dev's AI Agent initiating position exit...", "white", "on_cyan")
     
     try:
@@ -516,53 +602,64 @@ def chunk_kill(token_mint_address, slippage):
         df = fetch_wallet_token_single(address, token_mint_address)
         if df.empty:
             cprint("❌ No position found to exit", "white", "on_red")
-            return
+            return True
             
         # Get current token amount and value
         token_amount = float(df['Amount'].iloc[0])
         current_usd_value = float(df['USD Value'].iloc[0])
+        unit_price = current_usd_value / token_amount if token_amount else 0.0
         
         # Get token decimals
         decimals = get_decimals(token_mint_address)
+        # Work in raw units so the chunks add up to the exact balance (str() avoids float drift)
+        remaining_raw = int(Decimal(str(token_amount)) * 10**decimals)
         
         cprint(f"📊 Initial position: {token_amount:.2f} tokens (${current_usd_value:.2f})", "white", "on_cyan")
         
-        while current_usd_value > 0.1:  # Keep going until position is essentially zero
-            # Calculate chunk size based on current position
-            chunk_size = token_amount / 3  # Split remaining into 3 chunks
-            cprint(f"\n🔄 Splitting remaining position into chunks of {chunk_size:.2f} tokens", "white", "on_cyan")
+        rounds = 0
+        while current_usd_value > CHUNK_KILL_DUST_USD and remaining_raw > 0:  # Keep going until position is essentially zero
+            if rounds >= CHUNK_KILL_MAX_ROUNDS:
+                cprint(f"⚠️ Giving up on {token_mint_address[:8]} after {rounds} sell rounds - "
+                       f"${current_usd_value:.2f} still held", "white", "on_red")
+                return False
+            rounds += 1
+            sizes = split_raw_amount(remaining_raw, CHUNK_KILL_CHUNKS)
+            cprint(f"\n🔄 Selling {len(sizes)} chunks of ~{sizes[0] / 10**decimals:.2f} tokens in parallel", "white", "on_cyan")
             
-            # Execute sell orders in chunks
-            for i in range(3):
-                try:
-                    cprint(f"\n💫 Executing sell chunk {i+1}/3...", "white", "on_cyan")
-                    sell_size = int(chunk_size * 10**decimals)
-                    market_sell(token_mint_address, sell_size, slippage)
-                    cprint(f"✅ Sell chunk {i+1}/3 complete", "white", "on_green")
-                    time.sleep(2)  # Small delay between chunks
-                except Exception as e:
-                    cprint(f"❌ Error in sell chunk: {str(e)}", "white", "on_red")
+            # Every chunk gets its own quote and swap, submitted side by side
+            signatures = map_ordered(lambda size: market_sell(token_mint_address, size, slippage),
+                                     sizes, CHUNK_KILL_WORKERS, label="sell chunk")
+            submitted = {sig: size for sig, size in zip(signatures, sizes) if sig}
+            cprint(f"✅ {len(submitted)}/{len(sizes)} sell chunks submitted", "white", "on_green")
             
-            # Check remaining position
-            time.sleep(5)  # Wait for blockchain to update
-            df = fetch_wallet_token_single(address, token_mint_address)
-            if df.empty:
-                cprint("\n✨ Position successfully closed!", "white", "on_green")
-                return
-                
-            # Update position size for next iteration
-            token_amount = float(df['Amount'].iloc[0])
-            current_usd_value = float(df['USD Value'].iloc[0])
+            # Next round is sized from what actually landed - no wallet re-download when every chunk confirmed
+            results = confirm_orders(list(submitted), token_mint_address)
+            filled_raw = sum(size for sig, size in submitted.items() if results[sig]['status'] == CONFIRMED)
+            remaining_raw -= filled_raw
+            if filled_raw < sum(sizes):
+                # A timed-out chunk may still land and a failed one sold nothing - only the wallet knows
+                snapshot = refresh_wallet_snapshot(address)
+                if snapshot.complete:
+                    remaining_raw = int(Decimal(str(snapshot.amount(token_mint_address))) * 10**decimals)
+            token_amount = remaining_raw / 10**decimals
+            current_usd_value = token_amount * unit_price
             cprint(f"\n📊 Remaining position: {token_amount:.2f} tokens (${current_usd_value:.2f})", "white", "on_cyan")
             
-            if current_usd_value > 0.1:
-                cprint("🔄 Position still open - continuing to close...", "white", "on_cyan")
+            if current_usd_value > CHUNK_KILL_DUST_USD and not filled_raw:
+                cprint("🔄 No chunk landed - retrying the remaining position...", "white", "on_cyan")
                 time.sleep(2)
-            
+        
+        # One wallet read to verify the books agree with the chain
+        df = fetch_wallet_token_single(address, token_mint_address)
+        if not df.empty and float(df['USD Value'].iloc[0]) > CHUNK_KILL_DUST_USD:
+            cprint(f"⚠️ Wallet still shows ${float(df['USD Value'].iloc[0]):.2f} of {token_mint_address[:8]}", "white", "on_red")
+            return False
         cprint("\n✨ Position successfully closed!", "white", "on_green")
+        return True
         
     except Exception as e:
         cprint(f"❌ Error during position exit: {str(e)}", "white", "on_red")
+        return False
 
 def sell_token(token_mint_address, amount, slippage):
     """Sell a token"""
@@ -652,22 +749,14 @@ def kill_switch(token_mint_address):
     print('closing position in full...')
 
 def close_all_positions():
+    """Close every open position except excluded tokens, all exits running concurrently"""
 
     # get all positions
-    open_positions = fetch_wallet_holdings_og(address)
-
-    # loop through all positions and close them getting the mint address from Mint Address column
-    for index, row in open_positions.iterrows():
-        token_mint_address = row['Mint Address']
+    open_positions = refresh_wallet_snapshot(address).df
+    open_positions = eligible_positions(open_positions, exclude=EXCLUDED_TOKENS + DO_NOT_TRADE_LIST)
 
-        # Check if the current token mint address is the USDC contract address
-        cprint(f'this is the token mint address {token_mint_address} this is don not trade list {dont_trade_list}', 'white', 'on_magenta')
-        if token_mint_address in dont_trade_list:
-            print(f'Skipping kill switch for USDC contract at {token_mint_address}')
-            continue  # Skip the rest of the loop for this iteration
-
-        print(f'Closing position for {token_mint_address}...')
-        kill_switch(token_mint_address)
+    cprint(f'skipping excluded tokens {EXCLUDED_TOKENS + DO_NOT_TRADE_LIST}', 'white', 'on_magenta')
+    return liquidate_positions(open_positions, lambda token_mint_address: chunk_kill(token_mint_address, slippage))
 
 def delete_dont_overtrade_file():
     if os.path.exists('dont_overtrade.txt'):
@@ -720,302 +809,47 @@ def supply_demand_zones(token_address, timeframe, limit):
 
     return sd_df
 
-def elegant_entry(symbol, buy_under):
-
-    pos = get_position(symbol)
-    price = token_price(symbol)
-    pos_usd = pos * price
-    size_needed = usd_size - pos_usd
-    if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-    else: chunk_size = size_needed
-
-    chunk_size = int(chunk_size * 10**6)
-    chunk_size = str(chunk_size)
-
-    print(f'chunk_size: {chunk_size}')
-
-    if pos_usd > (.97 * usd_size):
-        print('position filled')
-        time.sleep(10)
+def enter_position(symbol, target_usd, policy=None):
+    """Build a position through the order engine with our swap, price and position functions"""
+    return enter(symbol, target_usd, market_buy, token_prices, get_position, policy)
 
-    # add debug prints for next while
-    print(f'position: {round(pos,2)} price: {round(price,8)} pos_usd: ${round(pos_usd,2)}')
+def elegant_entry(symbol, buy_under):
+    """Build the position up to usd_size while the price stays under buy_under"""
     print(f'buy_under: {buy_under}')
-    while pos_usd < (.97 * usd_size) and (price < buy_under):
-
-        print(f'position: {round(pos,2)} price: {round(price,8)} pos_usd: ${round(pos_usd,2)}')
-
-        try:
-
-            for i in range(orders_per_open):
-                market_buy(symbol, chunk_size, slippage)
-                # cprint green background black text
-                cprint(f'chunk buy submitted of {symbol[:4]} sz: {chunk_size} you my dawg moon dev', 'white', 'on_blue')
-                time.sleep(1)
-
-            time.sleep(tx_sleep)
-
-            pos = get_position(symbol)
-            price = token_price(symbol)
-            pos_usd = pos * price
-            size_needed = usd_size - pos_usd
-            if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-            else: chunk_size = size_needed
-            chunk_size = int(chunk_size * 10**6)
-            chunk_size = str(chunk_size)
-
-        except:
-
-            try:
-                cprint(f'trying again to make the order in 30 seconds.....', 'light_blue', 'on_light_magenta')
-                time.sleep(30)
-                for i in range(orders_per_open):
-                    market_buy(symbol, chunk_size, slippage)
-                    # cprint green background black text
-                    cprint(f'chunk buy submitted of {symbol[:4]} sz: {chunk_size} you my dawg moon dev', 'white', 'on_blue')
-                    time.sleep(1)
-
-                time.sleep(tx_sleep)
-                pos = get_position(symbol)
-                price = token_price(symbol)
-                pos_usd = pos * price
-                size_needed = usd_size - pos_usd
-                if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-                else: chunk_size = size_needed
-                chunk_size = int(chunk_size * 10**6)
-                chunk_size = str(chunk_size)
-
-
-            except:
-                cprint(f'Final Error in the buy, restart needed', 'white', 'on_red')
-                time.sleep(10)
-                break
-
-        pos = get_position(symbol)
-        price = token_price(symbol)
-        pos_usd = pos * price
-        size_needed = usd_size - pos_usd
-        if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-        else: chunk_size = size_needed
-        chunk_size = int(chunk_size * 10**6)
-        chunk_size = str(chunk_size)
+    return enter_position(symbol, usd_size, buy_under_policy(buy_under))
 
 # like the elegant entry but for breakout so its looking for price > BREAKOUT_PRICE
 def breakout_entry(symbol, BREAKOUT_PRICE):
-
-    pos = get_position(symbol)
-    price = token_price(symbol)
-    price = float(price)
-    pos_usd = pos * price
-    size_needed = usd_size - pos_usd
-    if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-    else: chunk_size = size_needed
-
-    chunk_size = int(chunk_size * 10**6)
-    chunk_size = str(chunk_size)
-
-    print(f'chunk_size: {chunk_size}')
-
-    if pos_usd > (.97 * usd_size):
-        print('position filled')
-        time.sleep(10)
-
-    # add debug prints for next while
-    print(f'position: {round(pos,2)} price: {round(price,8)} pos_usd: ${round(pos_usd,2)}')
+    """Build the position up to usd_size while the price stays over BREAKOUT_PRICE"""
     print(f'breakoutpurce: {BREAKOUT_PRICE}')
-    while pos_usd < (.97 * usd_size) and (price > BREAKOUT_PRICE):
-
-        print(f'position: {round(pos,2)} price: {round(price,8)} pos_usd: ${round(pos_usd,2)}')
-
-        # for i in range(orders_per_open):
-        #     market_buy(symbol, chunk_size, slippage)
-        #     # cprint green background black text
-        #     cprint(f'chunk buy submitted of {symbol[-4:]} sz: {chunk_size} you my dawg moon dev', 'white', 'on_blue')
-        #     time.sleep(1)
-
-        # time.sleep(tx_sleep)
-
-        # pos = get_position(symbol)
-        # price = token_price(symbol)
-        # pos_usd = pos * price
-        # size_needed = usd_size - pos_usd
-        # if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-        # else: chunk_size = size_needed
-        # chunk_size = int(chunk_size * 10**6)
-        # chunk_size = str(chunk_size)
-
-        try:
-
-            for i in range(orders_per_open):
-                market_buy(symbol, chunk_size, slippage)
-                # cprint green background black text
-                cprint(f'chunk buy submitted of {symbol[:4]} sz: {chunk_size} you my dawg moon dev', 'white', 'on_blue')
-                time.sleep(1)
-
-            time.sleep(tx_sleep)
-
-            pos = get_position(symbol)
-            price = token_price(symbol)
-            pos_usd = pos * price
-            size_needed = usd_size - pos_usd
-            if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-            else: chunk_size = size_needed
-            chunk_size = int(chunk_size * 10**6)
-            chunk_size = str(chunk_size)
-
-        except:
-
-            try:
-                cprint(f'trying again to make the order in 30 seconds.....', 'light_blue', 'on_light_magenta')
-                time.sleep(30)
-                for i in range(orders_per_open):
-                    market_buy(symbol, chunk_size, slippage)
-                    # cprint green background black text
-                    cprint(f'chunk buy submitted of {symbol[:4]} sz: {chunk_size} you my dawg moon dev', 'white', 'on_blue')
-                    time.sleep(1)
-
-                time.sleep(tx_sleep)
-                pos = get_position(symbol)
-                price = token_price(symbol)
-                pos_usd = pos * price
-                size_needed = usd_size - pos_usd
-                if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-                else: chunk_size = size_needed
-                chunk_size = int(chunk_size * 10**6)
-                chunk_size = str(chunk_size)
-
-
-            except:
-                cprint(f'Final Error in the buy, restart needed', 'white', 'on_red')
-                time.sleep(10)
-                break
-
-        pos = get_position(symbol)
-        price = token_price(symbol)
-        pos_usd = pos * price
-        size_needed = usd_size - pos_usd
-        if size_needed > max_usd_order_size: chunk_size = max_usd_order_size
-        else: chunk_size = size_needed
-        chunk_size = int(chunk_size * 10**6)
-        chunk_size = str(chunk_size)
+    return enter_position(symbol, usd_size, breakout_policy(BREAKOUT_PRICE))
 
 def ai_entry(symbol, amount):
     """AI agent entry function for Moon Dev's trading system 🤖"""
     cprint("🤖 Moon Dev's AI Trading Agent initiating position entry...", "white", "on_blue")
     
     # amount passed in is the target allocation (up to 30% of usd_size)
-    target_size = amount  # This could be up to $3 (30% of $10)
-    
-    pos = get_position(symbol)
-    price = token_price(symbol)
-    pos_usd = pos * price
-    
-    cprint(f"🎯 Target allocation: ${target_size:.2f} USD (max 30% of ${usd_size})", "white", "on_blue")
-    cprint(f"📊 Current position: ${pos_usd:.2f} USD", "white", "on_blue")
-    
-    # Check if we're already at or above target
-    if pos_usd >= (target_size * 0.97):
-        cprint("✋ Position already at or above target size!", "white", "on_blue")
-        return
-        
-    # Calculate how much more we need to buy
-    size_needed = target_size - pos_usd
-    if size_needed <= 0:
-        cprint("🛑 No additional size needed", "white", "on_blue")
-        return
-        
-    # For order execution, we'll chunk into max_usd_order_size pieces
-    if size_needed > max_usd_order_size: 
-        chunk_size = max_usd_order_size
-    else: 
-        chunk_size = size_needed
-
-    chunk_size = int(chunk_size * 10**6)
-    chunk_size = str(chunk_size)
-    
-    cprint(f"💫 Entry chunk size: {chunk_size} (chunking ${size_needed:.2f} into ${max_usd_order_size:.2f} orders)", "white", "on_blue")
-
-    while pos_usd < (target_size * 0.97):
-        cprint(f"🤖 AI Agent executing entry for {symbol[:8]}...", "white", "on_blue")
-        print(f"Position: {round(pos,2)} | Price: {round(price,8)} | USD Value: ${round(pos_usd,2)}")
-
-        try:
-            for i in range(orders_per_open):
-                market_buy(symbol, chunk_size, slippage)
-                cprint(f"🚀 AI Agent placed order {i+1}/{orders_per_open} for {symbol[:8]}", "white", "on_blue")
-                time.sleep(1)
+    cprint(f"🎯 Target allocation: ${amount:.2f} USD (max 30% of ${usd_size})", "white", "on_blue")
+    entry = enter_position(symbol, amount, target_size_policy())
 
-            time.sleep(tx_sleep)
-            
-            # Update position info
-            pos = get_position(symbol)
-            price = token_price(symbol)
-            pos_usd = pos * price
-            
-            # Break if we're at or above target
-            if pos_usd >= (target_size * 0.97):
-                break
-                
-            # Recalculate needed size
-            size_needed = target_size - pos_usd
-            if size_needed <= 0:
-                break
-                
-            # Determine next chunk size
-            if size_needed > max_usd_order_size: 
-                chunk_size = max_usd_order_size
-            else: 
-                chunk_size = size_needed
-            chunk_size = int(chunk_size * 10**6)
-            chunk_size = str(chunk_size)
-
-        except Exception as e:
-            try:
-                cprint("🔄 AI Agent retrying order in 30 seconds...", "white", "on_blue")
-                time.sleep(30)
-                for i in range(orders_per_open):
-                    market_buy(symbol, chunk_size, slippage)
-                    cprint(f"🚀 AI Agent retry order {i+1}/{orders_per_open} for {symbol[:8]}", "white", "on_blue")
-                    time.sleep(1)
-
-                time.sleep(tx_sleep)
-                pos = get_position(symbol)
-                price = token_price(symbol)
-                pos_usd = pos * price
-                
-                if pos_usd >= (target_size * 0.97):
-                    break
-                    
-                size_needed = target_size - pos_usd
-                if size_needed <= 0:
-                    break
-                    
-                if size_needed > max_usd_order_size: 
-                    chunk_size = max_usd_order_size
-                else: 
-                    chunk_size = size_needed
-                chunk_size = int(chunk_size * 10**6)
-                chunk_size = str(chunk_size)
-
-            except:
-                cprint("❌ AI Agent encountered critical error, manual intervention needed", "white", "on_red")
-                return
-
-    cprint("✨ AI Agent completed position entry", "white", "on_blue")
+    if entry.reason == 'filled':
+        cprint("✨ AI Agent completed position entry", "white", "on_blue")
+    else:
+        cprint(f"❌ AI Agent entry stopped: {entry.reason}", "white", "on_red")
+    return entry
 
 def get_token_balance_usd(token_mint_address):
     """Get the USD value of a token position for Moon Dev's wallet 🌙"""
     try:
-        # Get the position data using existing function
-        df = fetch_wallet_token_single(address, token_mint_address)  # Using address from config
+        # Read from the shared wallet snapshot
+        snapshot = get_wallet_snapshot(address)  # Using address from config
 
-        if df.empty:
+        if not snapshot.has(token_mint_address):
             print(f"🔍 No position found for {token_mint_address[:8]}")
             return 0.0
             
-        # Get the USD Value from the dataframe
-        usd_value = df['USD Value'].iloc[0]
-        return float(usd_value)
+        # Get the USD Value from the snapshot
+        return snapshot.usd_value(token_mint_address)
         
     except Exception as e:
         print(f"❌ Error getting token balance: {str(e)}")
@@ -1030,7 +864,7 @@ def get_trade_prices(trader_address, token_address, offset=0, limit=100, before_
     headers = {"X-API-KEY": BIRDEYE_API_KEY}
     
     try:
-        response = requests.get(url, headers=headers)        
+        response = http_client.get(url, headers=headers)
         if response.status_code == 200:
             trades = response.json().get('data', {}).get('items', [])
             matching_prices = []
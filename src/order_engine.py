@@ -0,0 +1,282 @@
+"""
+🌙 Moon Dev's Order Engine
+One event loop that walks every entry order from quote to reconciled position
+Built with love by Moon Dev 🚀
+
+Order states: pending_quote -> submitted -> confirmed / failed -> reconciled.
+An Entry keeps buying chunks of a token until its target USD size is reached or
+its policy (target size, buy under, breakout) stops allowing buys. Each round is
+orders_per_open chunk orders quoted and sent on a thread pool. The round is
+confirmed through the shared ConfirmationTracker. Then every entry whose round
+finished is re-read from the position ledger and the price cache, both kept
+current by our own confirmed fills. Many tokens can be entered at once without
+a wallet download or price request per round. The engine is handed its buy,
+price and position functions (nice_funcs passes market_buy, token_prices and
+get_position), so it never imports nice_funcs itself.
+"""
+
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from termcolor import cprint
+
+from src.config import *
+from src.confirmation_tracker import confirmation_tracker, CONFIRMED
+
+PENDING_QUOTE = 'pending_quote'
+SUBMITTED = 'submitted'
+CONFIRMED_STATE = 'confirmed'
+FAILED = 'failed'
+RECONCILED = 'reconciled'
+
+USDC_DECIMALS = 6
+
+
+class EntryPolicy:
+    """Named condition on the live price that must hold for an entry to keep buying"""
+
+    def __init__(self, name, condition):
+        self.name = name
+        self.condition = condition
+
+    def allows(self, price):
+        """Condition on a real price - callers retry a missing price instead of asking"""
+        return self.condition(price)
+
+
+def target_size_policy():
+    """Buy until the target size is reached, whatever the price"""
+    return EntryPolicy('target size', lambda price: True)
+
+
+def buy_under_policy(limit):
+    """Only buy while the price is under limit"""
+    return EntryPolicy(f'buy under {limit}', lambda price: price < limit)
+
+
+def breakout_policy(level):
+    """Only buy while the price is over the breakout level"""
+    return EntryPolicy(f'breakout over {level}', lambda price: price > level)
+
+
+class Order:
+    """One USDC -> token swap"""
+
+    def __init__(self, token, usd_amount, slippage):
+        self.token = token
+        self.usd_amount = usd_amount
+        self.amount = int(usd_amount * 10**USDC_DECIMALS)  # raw USDC units for the Jupiter quote
+        self.slippage = slippage
+        self.state = PENDING_QUOTE
+        self.signature = None
+        self.error = None
+        self.created_at = time.monotonic()
+        self.submitted_at = None
+
+    def submit(self, buy):
+        """Quote, build, sign and send through buy(token, raw_usdc, slippage) - runs on the engine's submit pool"""
+        try:
+            self.signature = buy(self.token, self.amount, self.slippage)
+            self.submitted_at = time.monotonic()
+            self.state = SUBMITTED if self.signature else FAILED
+        except Exception as e:
+            self.error = str(e)
+            self.state = FAILED
+        return self
+
+
+class Entry:
+    """Build a position in one token up to target_usd while its policy allows"""
+
+    def __init__(self, token, target_usd, policy=None, orders_per_round=orders_per_open,
+                 max_order_usd=max_usd_order_size, slippage=slippage):
+        self.token = token
+        self.target_usd = target_usd
+        self.policy = policy or target_size_policy()
+        self.orders_per_round = orders_per_round
+        self.max_order_usd = max_order_usd
+        self.slippage = slippage
+
+        self.position = 0.0
+        self.price = None
+        self.orders = []       # current round
+        self.history = []      # every order ever sent
+        self.failed_rounds = 0
+        self.retry_at = 0.0
+        self.done = False
+        self.reason = None
+
+    @property
+    def position_usd(self):
+        return self.position * (self.price or 0.0)
+
+    def is_filled(self):
+        return self.position_usd >= ORDER_FILL_RATIO * self.target_usd
+
+    def in_flight(self):
+        return any(o.state in (PENDING_QUOTE, SUBMITTED) for o in self.orders)
+
+    def next_round(self):
+        """(orders, usd per order) for the next round - never more than the remaining size"""
+        needed = self.target_usd - self.position_usd
+        if needed <= 0:
+            return 0, 0.0
+        count = max(1, min(self.orders_per_round, math.ceil(needed / self.max_order_usd)))
+        return count, min(self.max_order_usd, needed / count)
+
+    def finish(self, reason):
+        self.done = True
+        self.reason = reason
+
+
+class OrderEngine:
+    """Drives any number of entries from a single loop"""
+
+    def __init__(self, buy, prices, position, max_workers=ORDER_ENGINE_WORKERS, poll_seconds=CONFIRM_POLL_SECONDS):
+        self.buy = buy              # buy(token, raw_usdc_amount, slippage) -> signature
+        self.prices = prices        # prices([token]) -> {token: price or None}
+        self.position = position    # position(token) -> token amount held
+        self.max_workers = max_workers
+        self.poll_seconds = poll_seconds
+
+    def reconcile(self, entries):
+        """Refresh position and price for these entries - from the position ledger and our fill prices when current"""
+        if not entries:
+            return
+        prices = self.prices([e.token for e in entries])
+        for entry in entries:
+            entry.position = self.position(entry.token)
+            price = prices.get(entry.token)
+            entry.price = float(price) if price is not None else None
+            for order in entry.orders:
+                if order.state == CONFIRMED_STATE:
+                    order.state = RECONCILED
+            cprint(f"📊 {entry.token[:8]} position: {round(entry.position, 2)} | price: {entry.price} | "
+                   f"${entry.position_usd:.2f} of ${entry.target_usd:.2f}", "white", "on_blue")
+
+    def _start_round(self, entry, pool):
+        """Decide whether the entry is done, otherwise queue its next round of chunk orders"""
+        if entry.price is None:
+            self.reconcile([entry])
+        if entry.price is None:
+            # A failed price lookup is not a policy answer - keep the entry and try again shortly
+            cprint(f"⚠️ {entry.token[:8]} has no price - retrying in {ORDER_ENGINE_PRICE_RETRY_SECONDS}s",
+                   "white", "on_yellow")
+            entry.retry_at = time.monotonic() + ORDER_ENGINE_PRICE_RETRY_SECONDS
+            return
+        if entry.is_filled():
+            entry.finish('filled')
+            return
+        if not entry.policy.allows(entry.price):
+            entry.finish(f'{entry.policy.name} no longer holds')
+            return
+        count, chunk_usd = entry.next_round()
+        if not count:
+            entry.finish('filled')
+            return
+
+        entry.orders = [Order(entry.token, chunk_usd, entry.slippage) for _ in range(count)]
+        entry.history.extend(entry.orders)
+        cprint(f"🚀 {entry.token[:8]} submitting {len(entry.orders)} x ${chunk_usd:.2f} ({entry.policy.name})",
+               "white", "on_blue")
+        for order in entry.orders:
+            pool.submit(order.submit, self.buy)
+
+    def _settle(self, entry):
+        """Move the round's submitted orders to confirmed / failed as their statuses arrive"""
+        submitted = {o.signature: o for o in entry.orders if o.state == SUBMITTED}
+        for signature, result in confirmation_tracker.collect(list(submitted)).items():
+            order = submitted[signature]
+            if result['status'] == CONFIRMED:
+                order.state = CONFIRMED_STATE
+            else:
+                order.state = FAILED
+                order.error = result['err'] or result['status']
+
+    def run(self, entries):
+        """Run every entry to completion - returns the entries with done / reason set"""
+        entries = list(entries)
+        self.reconcile(entries)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                now = time.monotonic()
+                for entry in entries:
+                    if not entry.done and not entry.orders and now >= entry.retry_at:
+                        self._start_round(entry, pool)
+
+                active = [e for e in entries if not e.done]
+                if not active:
+                    break
+
+                if confirmation_tracker.pending():
+                    confirmation_tracker.poll()
+
+                finished = []
+                for entry in active:
+                    if not entry.orders:
+                        continue
+                    self._settle(entry)
+                    if entry.in_flight():
+                        continue
+
+                    landed = sum(1 for o in entry.orders if o.state == CONFIRMED_STATE)
+                    for order in entry.orders:
+                        if order.state == FAILED:
+                            cprint(f"❌ {entry.token[:8]} order failed: {order.error}", "white", "on_red")
+                    if landed:
+                        entry.failed_rounds = 0
+                    else:
+                        entry.failed_rounds += 1
+                        if entry.failed_rounds > ORDER_ENGINE_MAX_FAILED_ROUNDS:
+                            entry.finish('orders keep failing, restart needed')
+                        else:
+                            cprint(f"🔄 {entry.token[:8]} retrying in {ORDER_ENGINE_RETRY_SECONDS}s...",
+                                   'light_blue', 'on_light_magenta')
+                            entry.retry_at = time.monotonic() + ORDER_ENGINE_RETRY_SECONDS
+                    finished.append(entry)
+
+                if finished:
+                    self.reconcile(finished)
+                    for entry in finished:
+                        entry.orders = []
+                    continue
+
+                time.sleep(self.poll_seconds)
+
+        for entry in entries:
+            color = 'on_green' if entry.reason == 'filled' else 'on_red'
+            cprint(f"✨ {entry.token[:8]} entry finished: {entry.reason} (${entry.position_usd:.2f})", "white", color)
+        return entries
+
+
+def run_entries(entries, buy, prices, position):
+    """Drive several entries (e.g. one per token) concurrently through one engine"""
+    return OrderEngine(buy, prices, position).run(entries)
+
+
+def enter(token, target_usd, buy, prices, position, policy=None):
+    """Build one position - returns the finished Entry"""
+    return run_entries([Entry(token, target_usd, policy)], buy, prices, position)[0]
+
+
+def _check_missing_price():
+    """An entry whose price lookup fails stays active and finishes once a price comes back"""
+    quotes = {'price': None}
+    engine = OrderEngine(buy=lambda token, amount, slippage: None,
+                         prices=lambda tokens: {token: quotes['price'] for token in tokens},
+                         position=lambda token: 100.0)
+    entry = Entry('CheckMint1111111111111111111111111111111111', target_usd=50)
+
+    engine._start_round(entry, pool=None)
+    assert not entry.done and entry.retry_at > time.monotonic(), "missing price ended the entry"
+
+    quotes['price'] = 1.0
+    engine._start_round(entry, pool=None)
+    assert entry.done and entry.reason == 'filled', entry.reason
+    cprint("✅ Missing price keeps the entry active", "white", "on_green")
+
+
+if __name__ == "__main__":
+    _check_missing_price()
@@ -0,0 +1,442 @@
+"""
+🌙 Moon Dev's Paper Exchange
+Local Jupiter + Solana RPC + wallet token_list simulator with a paper wallet ledger
+Built with love by Moon Dev 🚀
+
+Serves the same contracts nice_funcs talks to:
+    /jupiter/v6/quote, /jupiter/v6/swap
+    /rpc  sendTransaction, getSignatureStatuses, getLatestBlockhash, getRecentPrioritizationFees
+    /birdeye/v1/wallet/token_list
+Everything else (OHLCV, prices, mint accounts...) is forwarded to the real
+provider, or to any upstream you pass in (the benchmarks use api_standin).
+enable_paper_trading() points Jupiter, the RPC endpoint and the wallet
+token_list at it through HTTP_HOST_OVERRIDES. Other Birdeye calls keep going
+straight to the provider.
+Quotes and fills are priced from the upstream Birdeye price. Each send gets a
+random price move of up to PAPER_SLIPPAGE_BPS and fails with PAPER_FAILURE_RATE.
+It lands PAPER_CONFIRM_MS later.
+"""
+
+import os
+import json
+import time
+import uuid
+import base64
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import requests
+from termcolor import cprint
+from solders.hash import Hash
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.instruction import Instruction
+from solders.message import MessageV0
+from solders.transaction import VersionedTransaction
+
+from src.config import *
+
+MEMO_PROGRAM = Pubkey.from_string("MemoSq4gqABAXKb96qFs2AwUvn4rdyhn7C9UWJNHKRf")
+JUPITER_HOST = 'https://quote-api.jup.ag'
+BIRDEYE_HOST = 'https://public-api.birdeye.so'
+KNOWN_DECIMALS = {USDC_ADDRESS: 6, 'So11111111111111111111111111111111111111112': 9}
+SLIPPAGE_ERROR = {'InstructionError': [3, {'Custom': 6001}]}  # Jupiter's SlippageToleranceExceeded
+FAILED_ERROR = {'InstructionError': [3, {'Custom': 6000}]}
+INSUFFICIENT_FUNDS_ERROR = {'InstructionError': [3, {'Custom': 1}]}
+
+
+class PaperLedger:
+    """Raw token balances of the simulated wallet"""
+
+    def __init__(self):
+        self.balances = {}  # mint -> raw amount
+        self.decimals = {}
+        self._lock = threading.Lock()
+
+    def deposit(self, mint, ui_amount, decimals):
+        with self._lock:
+            self.decimals[mint] = decimals
+            self.balances[mint] = self.balances.get(mint, 0) + int(ui_amount * 10**decimals)
+
+    def swap(self, in_mint, in_amount, out_mint, out_amount, out_decimals):
+        """Move raw amounts atomically - False when the wallet cannot cover in_amount"""
+        with self._lock:
+            if self.balances.get(in_mint, 0) < in_amount:
+                return False
+            self.balances[in_mint] -= in_amount
+            self.balances[out_mint] = self.balances.get(out_mint, 0) + out_amount
+            self.decimals.setdefault(out_mint, out_decimals)
+            return True
+
+    def holdings(self):
+        """{mint: (raw, decimals)} for every non-zero balance"""
+        with self._lock:
+            return {m: (raw, self.decimals.get(m, 6)) for m, raw in self.balances.items() if raw > 0}
+
+
+class PaperExchange:
+    """Threaded local exchange - start(), enable_paper_trading(), stop()"""
+
+    def __init__(self, upstreams=None, latency_ms=PAPER_LATENCY_MS, confirm_ms=PAPER_CONFIRM_MS,
+                 slippage_bps=PAPER_SLIPPAGE_BPS, failure_rate=PAPER_FAILURE_RATE,
+                 starting_balances=None, seed=PAPER_SEED):
+        # prefix -> base url of the real provider that unsimulated requests are forwarded to
+        self.upstreams = {'birdeye': BIRDEYE_HOST, 'rpc': os.getenv("RPC_ENDPOINT")}
+        self.upstreams.update(upstreams or {})
+        self.latency_ms = latency_ms
+        self.confirm_ms = confirm_ms
+        self.slippage_bps = slippage_bps
+        self.failure_rate = failure_rate
+        self.ledger = PaperLedger()
+        self.orders = {}      # order id -> swap request
+        self.sent = {}        # signature -> {'land_at', 'swap', 'err', 'slot', 'settled'}
+        self.counts = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._prices = {}     # mint -> (price, fetched_at)
+        self._mint_decimals = dict(KNOWN_DECIMALS)
+        self._upstream = requests.Session()  # direct - must never go back through the overrides
+        self._started_at = time.time()
+        self._server = None
+        self._thread = None
+
+        self.reset(starting_balances)
+
+    def reset(self, balances=None):
+        """Empty the paper wallet, forget in-flight swaps and deposit balances (ui amounts per mint)"""
+        with self._lock:
+            self.orders.clear()
+            self.sent.clear()
+        self.ledger = PaperLedger()
+        for mint, ui_amount in (PAPER_STARTING_BALANCES if balances is None else balances).items():
+            self.ledger.deposit(mint, ui_amount, self._decimals(mint))
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def host_overrides(self):
+        """Real host -> paper prefix for Jupiter, the wallet token_list and the configured RPC endpoint"""
+        overrides = {JUPITER_HOST: f"{self.base_url}/jupiter",
+                     f"{BIRDEYE_HOST}/v1/wallet/token_list": f"{self.base_url}/birdeye/v1/wallet/token_list"}
+        rpc = os.getenv("RPC_ENDPOINT")
+        if rpc:
+            parts = urlsplit(rpc)
+            overrides[f"{parts.scheme}://{parts.netloc}"] = f"{self.base_url}/rpc"
+        return overrides
+
+    def start(self):
+        exchange = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                exchange._dispatch(self, None)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                exchange._dispatch(self, self.rfile.read(length) if length else b'')
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        cprint(f"🧪 Moon Dev's paper exchange running at {self.base_url}", "white", "on_magenta")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_counts(self):
+        with self._lock:
+            self.counts.clear()
+
+    def snapshot_counts(self):
+        """Requests per route - paper routes are prefixed so they never collide with api_standin's"""
+        with self._lock:
+            return {f'paper:{route}': count for route, count in self.counts.items()}
+
+    # ---- routing -------------------------------------------------------
+
+    def _count(self, route):
+        with self._lock:
+            self.counts[route] = self.counts.get(route, 0) + 1
+
+    def _dispatch(self, handler, body):
+        parts = urlsplit(handler.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        segments = [s for s in parts.path.split('/') if s]
+        prefix = segments[0] if segments else ''
+        path = '/'.join(segments[1:])
+
+        try:
+            payload = None
+            if prefix == 'jupiter' and path == 'v6/quote':
+                payload = self._simulated('jupiter:quote', lambda: self._quote(query))
+            elif prefix == 'jupiter' and path == 'v6/swap':
+                payload = self._simulated('jupiter:swap', lambda: self._swap(json.loads(body or b'{}')))
+            elif prefix == 'birdeye' and path == 'v1/wallet/token_list':
+                payload = self._simulated('birdeye:token_list', self._token_list)
+            elif prefix == 'rpc':
+                payload = self._rpc(json.loads(body or b'{}'))
+
+            if payload is None:
+                self._count(f'{prefix}:forwarded')
+                status, payload = self._forward(prefix, handler, body)
+            else:
+                status = 200
+        except Exception as e:
+            status, payload = 500, {'error': str(e)}
+
+        out = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(out)))
+        handler.end_headers()
+        handler.wfile.write(out)
+
+    def _simulated(self, route, func):
+        self._count(route)
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return func()
+
+    def _forward(self, prefix, handler, body):
+        """Pass an unsimulated request through to the real (or stand-in) provider"""
+        base = self.upstreams.get(prefix)
+        if not base:
+            return 404, {'success': False, 'message': f'paper exchange has no upstream for {prefix}'}
+        # The RPC upstream is a full endpoint url (often with an api-key query) - post to it as is
+        url = base if prefix == 'rpc' else base.rstrip('/') + handler.path[len(prefix) + 1:]
+        headers = {k: v for k, v in handler.headers.items() if k.lower() in ('x-api-key', 'x-chain', 'content-type')}
+        response = self._upstream.request(handler.command, url, data=body, headers=headers, timeout=HTTP_TIMEOUT_SECONDS)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, {'success': False, 'message': response.text[:200]}
+
+    # ---- market data -----------------------------------------------------
+
+    def _price(self, mint):
+        if mint == USDC_ADDRESS:
+            return 1.0
+        cached = self._prices.get(mint)
+        if cached and time.monotonic() - cached[1] <= PRICE_CACHE_TTL_SECONDS:
+            return cached[0]
+        url = f"{self.upstreams['birdeye'].rstrip('/')}/defi/price?address={mint}"
+        data = self._upstream.get(url, headers={"X-API-KEY": os.getenv("BIRDEYE_API_KEY") or ''},
+                                  timeout=HTTP_TIMEOUT_SECONDS).json()
+        price = float(data['data']['value'])
+        self._prices[mint] = (price, time.monotonic())
+        return price
+
+    def _decimals(self, mint):
+        if mint in self._mint_decimals:
+            return self._mint_decimals[mint]
+        decimals = 6
+        try:
+            payload = {"jsonrpc": "2.0", "id": 1, "method": "getAccountInfo",
+                       "params": [mint, {"encoding": "jsonParsed"}]}
+            account = self._upstream.post(self.upstreams['rpc'], json=payload,
+                                          timeout=HTTP_TIMEOUT_SECONDS).json()['result']['value']
+            decimals = account['data']['parsed']['info']['decimals']
+        except Exception as e:
+            cprint(f"⚠️ Paper exchange could not load decimals for {mint[:8]}, using 6: {str(e)}", "yellow")
+        self._mint_decimals[mint] = decimals
+        return decimals
+
+    def _out_amount(self, in_mint, in_amount, out_mint):
+        in_ui = in_amount / 10**self._decimals(in_mint)
+        out_ui = in_ui * self._price(in_mint) / self._price(out_mint)
+        return int(out_ui * 10**self._decimals(out_mint))
+
+    # ---- jupiter ---------------------------------------------------------
+
+    def _quote(self, query):
+        in_mint, out_mint = query['inputMint'], query['outputMint']
+        in_amount = int(query['amount'])
+        slippage_bps = int(query.get('slippageBps', 50))
+        out_amount = self._out_amount(in_mint, in_amount, out_mint)
+        return {
+            'inputMint': in_mint,
+            'inAmount': str(in_amount),
+            'outputMint': out_mint,
+            'outAmount': str(out_amount),
+            'otherAmountThreshold': str(int(out_amount * (1 - slippage_bps / 10000))),
+            'swapMode': 'ExactIn',
+            'slippageBps': slippage_bps,
+            'priceImpactPct': '0',
+            'routePlan': [{'swapInfo': {'label': 'Moon Dev Paper', 'inputMint': in_mint, 'outputMint': out_mint,
+                                        'inAmount': str(in_amount), 'outAmount': str(out_amount)}, 'percent': 100}],
+            'contextSlot': self._slot(),
+            'timeTaken': self.latency_ms / 1000,
+        }
+
+    def _swap(self, request):
+        order_id = uuid.uuid4().hex
+        with self._lock:
+            self.orders[order_id] = request
+        payer = Pubkey.from_string(request['userPublicKey'])
+        # The memo carries the order id so sendTransaction can find the quote it fills
+        memo = Instruction(MEMO_PROGRAM, order_id.encode(), [])
+        message = MessageV0.try_compile(payer, [memo], [], Hash.new_unique())
+        tx = VersionedTransaction.populate(message, [Signature.default()])
+        return {
+            'swapTransaction': base64.b64encode(bytes(tx)).decode(),
+            'lastValidBlockHeight': self._block_height() + 150,
+            'prioritizationFeeLamports': request.get('prioritizationFeeLamports'),
+        }
+
+    # ---- rpc -------------------------------------------------------------
+
+    def _slot(self):
+        return 306000000 + int((time.time() - self._started_at) / 0.4)
+
+    def _block_height(self):
+        return 290000000 + int((time.time() - self._started_at) / 0.4)
+
+    def _rpc(self, request):
+        """Simulated RPC reply, or None to forward the request upstream"""
+        if isinstance(request, list):
+            replies = [self._rpc(item) for item in request]
+            if any(r is None for r in replies):
+                return None
+            return replies
+
+        method = request.get('method', '')
+        params = request.get('params', [])
+        reply = {'jsonrpc': '2.0', 'id': request.get('id')}
+
+        if method == 'sendTransaction':
+            reply['result'] = self._simulated('rpc:sendTransaction', lambda: self._send(params[0]))
+        elif method == 'getSignatureStatuses':
+            reply['result'] = self._simulated('rpc:getSignatureStatuses', lambda: self._statuses(params[0]))
+        elif method == 'getLatestBlockhash':
+            self._count('rpc:getLatestBlockhash')
+            reply['result'] = {'context': {'slot': self._slot()},
+                               'value': {'blockhash': str(Hash.new_unique()),
+                                         'lastValidBlockHeight': self._block_height() + 150}}
+        elif method == 'getRecentPrioritizationFees':
+            self._count('rpc:getRecentPrioritizationFees')
+            reply['result'] = [{'slot': self._slot() - i, 'prioritizationFee': fee}
+                               for i, fee in enumerate([0, 1000, 5000, 25000, 100000] * 30)]
+        else:
+            return None
+        return reply
+
+    def _send(self, encoded):
+        tx = VersionedTransaction.from_bytes(base64.b64decode(encoded))
+        signature = str(tx.signatures[0])
+        order_id = bytes(tx.message.instructions[0].data).decode()
+        with self._lock:
+            request = self.orders.pop(order_id, None)
+        if request is None:
+            raise ValueError('unknown paper swap transaction')
+
+        quote = request['quoteResponse']
+        in_amount = int(quote['inAmount'])
+        # The price moves between quote and fill - fail like Jupiter when it moves past slippageBps
+        move_bps = self._random.uniform(0, self.slippage_bps)
+        out_amount = int(self._out_amount(quote['inputMint'], in_amount, quote['outputMint']) * (1 - move_bps / 10000))
+
+        err = None
+        if self._random.random() < self.failure_rate:
+            err = FAILED_ERROR
+        elif out_amount < int(quote['otherAmountThreshold']):
+            err = SLIPPAGE_ERROR
+
+        with self._lock:
+            self.sent[signature] = {
+                'land_at': time.monotonic() + self.confirm_ms / 1000,
+                'swap': (quote['inputMint'], in_amount, quote['outputMint'], out_amount),
+                'err': err,
+                'slot': None,
+                'settled': False,
+            }
+        return signature
+
+    def _settle_due(self):
+        """Apply every swap whose landing time has passed to the ledger"""
+        now = time.monotonic()
+        with self._lock:
+            due = [(sig, s) for sig, s in self.sent.items() if not s['settled'] and s['land_at'] <= now]
+            for _, sent in due:
+                sent['settled'] = True
+        for _, sent in due:
+            sent['slot'] = self._slot()
+            if sent['err'] is None:
+                in_mint, in_amount, out_mint, out_amount = sent['swap']
+                if not self.ledger.swap(in_mint, in_amount, out_mint, out_amount, self._decimals(out_mint)):
+                    sent['err'] = INSUFFICIENT_FUNDS_ERROR
+
+    def _statuses(self, signatures):
+        self._settle_due()
+        value = []
+        for signature in signatures:
+            sent = self.sent.get(signature)
+            if sent is None or not sent['settled']:
+                value.append(None)
+                continue
+            value.append({
+                'slot': sent['slot'],
+                'confirmations': None,
+                'err': sent['err'],
+                'status': {'Ok': None} if sent['err'] is None else {'Err': sent['err']},
+                'confirmationStatus': 'confirmed',
+            })
+        return {'context': {'slot': self._slot()}, 'value': value}
+
+    # ---- wallet ----------------------------------------------------------
+
+    def _token_list(self):
+        self._settle_due()
+        items = []
+        for mint, (raw, decimals) in self.ledger.holdings().items():
+            try:
+                price = self._price(mint)
+            except Exception:
+                price = None
+            ui_amount = raw / 10**decimals
+            items.append({
+                'address': mint,
+                'decimals': decimals,
+                'balance': raw,
+                'uiAmount': ui_amount,
+                'chainId': 'solana',
+                'priceUsd': price,
+                'valueUsd': ui_amount * price if price is not None else None,
+            })
+        return {'success': True, 'data': {'wallet': address, 'items': items,
+                                          'totalUsd': sum(i['valueUsd'] or 0 for i in items)}}
+
+
+_exchange = None
+_exchange_lock = threading.Lock()
+
+
+def enable_paper_trading(upstreams=None, **kwargs):
+    """Start the shared paper exchange (once) and route Jupiter / Birdeye / RPC traffic to it"""
+    global _exchange
+    with _exchange_lock:
+        if _exchange is None:
+            from solders.keypair import Keypair
+            # Paper swaps are never broadcast - always sign with a throwaway key, never the real one
+            os.environ["SOLANA_PRIVATE_KEY"] = str(Keypair())
+            _exchange = PaperExchange(upstreams=upstreams, **kwargs).start()
+            HTTP_HOST_OVERRIDES.update(_exchange.host_overrides())
+        return _exchange
+
+
+def get_paper_exchange():
+    return _exchange
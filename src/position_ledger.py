@@ -0,0 +1,229 @@
+"""
+🌙 Moon Dev's Position Ledger
+Positions and average cost per mint, updated from our own confirmed fills
+Built with love by Moon Dev 🚀
+
+market_buy / market_sell tell the ledger what each swap should fill (Jupiter's
+quote amounts). The fill is applied once the confirmation tracker reports the
+signature confirmed, and the fill price is written to the price cache. Reads
+come from memory. The ledger is reconciled against a wallet download every
+POSITION_LEDGER_RECONCILE_SECONDS, after a swap with an unknown outcome, or
+when a fill does not add up. Every wallet download seen by
+nice_funcs.get_wallet_snapshot reconciles it for free.
+"""
+
+import os
+import json
+import time
+import threading
+
+from termcolor import cprint
+
+from src.config import *
+from src.price_cache import price_cache
+from src.confirmation_tracker import confirmation_tracker, CONFIRMED, TIMEOUT
+
+
+class PositionLedger:
+    """{mint: amount / cost basis / realized PnL} kept current from fills"""
+
+    def __init__(self, path=POSITION_LEDGER_PATH):
+        self.path = path
+        self._positions = {}  # mint -> {'amount', 'cost_usd', 'realized_usd', 'last_fill_at', 'last_price'}
+        self._expected = {}   # signature -> (mint, side, token_amount, usd_amount)
+        self._reconciled_at = None
+        self._last_source = None
+        self._dirty = True    # nothing trustworthy until the first reconcile
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.mismatches = 0
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self._positions = json.load(f)
+        except Exception as e:
+            cprint(f"⚠️ Moon Dev's position ledger could not read {self.path}: {str(e)}", "yellow")
+            self._positions = {}
+
+    def save(self):
+        """Write positions atomically (cost basis survives restarts)"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock:
+            snapshot = {mint: dict(p) for mint, p in self._positions.items()}
+        with self._save_lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def _position(self, mint):
+        return self._positions.setdefault(mint, {
+            'amount': 0.0, 'cost_usd': 0.0, 'realized_usd': 0.0, 'last_fill_at': None, 'last_price': None,
+        })
+
+    # ---- fills -------------------------------------------------------------
+
+    def expect(self, signature, mint, side, token_amount, usd_amount):
+        """Register what a just-sent swap will fill - applied when it confirms"""
+        if signature:
+            with self._lock:
+                self._expected[signature] = (mint, side, float(token_amount), float(usd_amount))
+
+    def on_resolved(self, signature, result):
+        """Confirmation tracker listener"""
+        with self._lock:
+            expected = self._expected.pop(signature, None)
+        if expected is None:
+            return
+        if result['status'] == CONFIRMED:
+            self.apply_fill(*expected)
+        elif result['status'] == TIMEOUT and result.get('err') != 'blockhash expired':
+            # It may still land - only the wallet knows now
+            self.mark_dirty()
+
+    def apply_fill(self, mint, side, token_amount, usd_amount):
+        """Add a buy / remove a sell; sells release cost basis at the average cost. The USDC leg moves with it"""
+        with self._lock:
+            self._apply_usdc(mint, side, usd_amount)
+            p = self._position(mint)
+            if side == 'buy':
+                p['amount'] += token_amount
+                p['cost_usd'] += usd_amount
+            else:
+                if token_amount > p['amount'] * (1 + POSITION_LEDGER_TOLERANCE):
+                    # Selling more than we think we hold - our books are off
+                    self._dirty = True
+                sold = min(token_amount, p['amount'])
+                released = p['cost_usd'] * (sold / p['amount']) if p['amount'] else 0.0
+                p['realized_usd'] += usd_amount - released
+                p['cost_usd'] -= released
+                p['amount'] = max(0.0, p['amount'] - token_amount)
+            p['last_fill_at'] = time.time()
+            if token_amount:
+                p['last_price'] = usd_amount / token_amount
+        if token_amount:
+            price_cache.set(mint, usd_amount / token_amount)  # freshest price we have is our own fill
+        self.save()
+
+    def _apply_usdc(self, mint, side, usd_amount):
+        # Caller holds self._lock - every swap is against USDC, buys spend it and sells return it
+        if mint == USDC_ADDRESS:
+            return
+        usdc = self._position(USDC_ADDRESS)
+        if side == 'buy':
+            if usd_amount > usdc['amount'] * (1 + POSITION_LEDGER_TOLERANCE):
+                self._dirty = True  # spent more USDC than we think we hold - our books are off
+            usdc['amount'] = max(0.0, usdc['amount'] - usd_amount)
+        else:
+            usdc['amount'] += usd_amount
+        usdc['cost_usd'] = usdc['amount']
+        usdc['last_fill_at'] = time.time()
+
+    # ---- reads -------------------------------------------------------------
+
+    def mark_dirty(self):
+        with self._lock:
+            self._dirty = True
+
+    def needs_reconcile(self):
+        with self._lock:
+            return (self._dirty or self._reconciled_at is None
+                    or time.monotonic() - self._reconciled_at > POSITION_LEDGER_RECONCILE_SECONDS)
+
+    def amount(self, mint):
+        """Ledger amount, or None when the ledger must be reconciled first"""
+        if self.needs_reconcile():
+            return None
+        with self._lock:
+            p = self._positions.get(mint)
+            return p['amount'] if p else 0.0
+
+    def average_cost(self, mint):
+        with self._lock:
+            p = self._positions.get(mint)
+            if not p or not p['amount']:
+                return None
+            return p['cost_usd'] / p['amount']
+
+    def get(self, mint):
+        with self._lock:
+            return dict(self._positions.get(mint) or {})
+
+    def positions(self):
+        with self._lock:
+            return {mint: dict(p) for mint, p in self._positions.items() if p['amount'] > 0}
+
+    # ---- reconcile -----------------------------------------------------------
+
+    def reconcile(self, df, fetched_at=None, source=None, complete=None):
+        """
+        Align amounts with a wallet DataFrame (Mint Address / Amount / USD Value)
+
+        Mints filled after the wallet was fetched, or within POSITION_LEDGER_SETTLE_SECONDS,
+        keep the ledger amount - the indexer behind token_list lags the chain.
+        Positions that appear without a recorded fill are costed at their current value.
+        Passing the same source object twice (e.g. one cached snapshot) is a no-op.
+        An empty frame only counts when complete is True (the download succeeded) - then every
+        position is zeroed. complete=None trusts any non-empty frame.
+        """
+        if df is None or (df.empty and not complete):
+            return
+        with self._lock:
+            if source is not None and source is self._last_source:
+                return
+            self._last_source = source
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        held = {str(m): (float(a), float(v)) for m, a, v in zip(df['Mint Address'], df['Amount'], df['USD Value'])}
+
+        mismatched = []
+        with self._lock:
+            for mint in set(held) | {m for m, p in self._positions.items() if p['amount'] > 0}:
+                p = self._position(mint)
+                last_fill = p['last_fill_at'] or 0
+                if last_fill >= fetched_at - POSITION_LEDGER_SETTLE_SECONDS:
+                    continue
+                amount, usd_value = held.get(mint, (0.0, 0.0))
+                if abs(amount - p['amount']) > POSITION_LEDGER_TOLERANCE * max(amount, p['amount'], 1e-12):
+                    if p['amount'] and not self._dirty:
+                        mismatched.append((mint, p['amount'], amount))
+                    if p['amount'] and amount:
+                        p['cost_usd'] *= amount / p['amount']  # keep the average cost
+                    elif amount:
+                        p['cost_usd'] = usd_value
+                    else:
+                        p['cost_usd'] = 0.0
+                    p['amount'] = amount
+            self._reconciled_at = time.monotonic()
+            self._dirty = False
+            self.mismatches += len(mismatched)
+
+        for mint, ours, chain in mismatched:
+            cprint(f"⚠️ Ledger mismatch for {mint[:8]}: ledger {ours:.4f} vs wallet {chain:.4f} - using wallet",
+                   "yellow")
+        self.save()
+
+
+_default_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_position_ledger():
+    """Shared ledger used by nice_funcs and the order engine"""
+    global _default_ledger
+    with _ledger_lock:
+        if _default_ledger is None:
+            _default_ledger = PositionLedger()
+        return _default_ledger
+
+
+def _on_resolved(signature, result):
+    # Registered once - follows whichever ledger is current (benchmarks swap it out)
+    if _default_ledger is not None:
+        _default_ledger.on_resolved(signature, result)
+
+
+confirmation_tracker.add_listener(_on_resolved)
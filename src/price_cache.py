@@ -0,0 +1,79 @@
+"""
+🌙 Moon Dev's Price Cache
+Short-TTL in-process token price cache shared by every caller of nice_funcs.token_price
+Built with love by Moon Dev 🚀
+"""
+
+import time
+import threading
+
+from src.config import *
+
+
+class PriceCache:
+    """Thread-safe {mint: price} cache with a per-entry TTL"""
+
+    def __init__(self, ttl=PRICE_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._prices = {}  # mint -> (price, fetched_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, address, max_age=None):
+        """Cached price for a mint, or None if missing / older than max_age"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._prices.get(address)
+            if entry is not None and time.monotonic() - entry[1] <= max_age:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def get_many(self, addresses, max_age=None):
+        """Split mints into (cached prices dict, list of mints that need fetching)"""
+        prices = {}
+        missing = []
+        for address in addresses:
+            price = self.get(address, max_age)
+            if price is None:
+                missing.append(address)
+            else:
+                prices[address] = price
+        return prices, missing
+
+    def set(self, address, price):
+        if price is None:
+            return
+        with self._lock:
+            self._prices[address] = (price, time.monotonic())
+
+    def set_many(self, prices):
+        now = time.monotonic()
+        with self._lock:
+            for address, price in prices.items():
+                if price is not None:
+                    self._prices[address] = (price, now)
+
+    def invalidate(self, address=None):
+        """Drop one mint (or everything when address is None)"""
+        with self._lock:
+            if address is None:
+                self._prices.clear()
+            else:
+                self._prices.pop(address, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._prices),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+# Shared instance used by nice_funcs and the agents
+price_cache = PriceCache()
@@ -0,0 +1,140 @@
+"""
+🌙 Moon Dev's Prompt Encoder
+Compact, fixed-schema feature blocks for LLM prompts instead of raw JSON / DataFrame dumps
+Built with love by Moon Dev 🚀
+
+encode_market_data() turns a collect_token_data dict (or an indicator
+DataFrame) into a few aligned tables. Numbers are rounded to
+PROMPT_SIG_FIGS significant figures with k/M suffixes, and booleans become
+Y/N. Values that are identical in every timeframe are printed once, and trend
+flags that are derivable from Close / MA20 / MA40 are dropped.
+encode_frame() does the same for whole candle frames: recent rows only,
+duplicate (padding) rows removed. report_prompt() logs a prompt's size and
+estimated token count before it is sent.
+"""
+
+import math
+
+from termcolor import cprint
+
+from src.config import *
+
+FRAME_COLUMNS = [('Open', 'open'), ('High', 'high'), ('Low', 'low'), ('Close', 'close'),
+                 ('Volume', 'vol'), ('MA20', 'ma20'), ('MA40', 'ma40'), ('RSI', 'rsi')]
+TIME_COLUMN = 'Datetime (UTC)'
+PAIR_WINDOWS = ('5m', '1h', '6h', '24h')
+
+
+def fmt(value, sig=None):
+    """Short number: significant figures, k / M / B suffixes, Y/N for booleans, '-' for missing"""
+    sig = sig or PROMPT_SIG_FIGS
+    if value is None:
+        return '-'
+    if isinstance(value, bool):
+        return 'Y' if value else 'N'
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if value != value or math.isinf(value):
+        return '-'
+    for size, suffix in ((1e9, 'B'), (1e6, 'M'), (1e3, 'k')):
+        if abs(value) >= size:
+            return f"{value / size:.{sig}g}{suffix}"
+    return f"{value:.{sig}g}"
+
+
+def table(header, rows):
+    """Space-aligned table - one header line, one line per row"""
+    rows = [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(str(h)), *(len(r[i]) for r in rows)) if rows else len(str(h)) for i, h in enumerate(header)]
+    lines = [' '.join(str(h).ljust(w) for h, w in zip(header, widths)).rstrip()]
+    lines += [' '.join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip() for row in rows]
+    return '\n'.join(lines)
+
+
+def _hoist_shared(header, rows):
+    """Move columns with the same value in every row into a 'shared' line"""
+    if len(rows) < 2:
+        return header, rows, []
+    keep = [i for i in range(len(header)) if i == 0 or len({row[i] for row in rows}) > 1]
+    shared = [f"{header[i]}={rows[0][i]}" for i in range(len(header)) if i not in keep]
+    return [header[i] for i in keep], [[row[i] for i in keep] for row in rows], shared
+
+
+def encode_pair(pair):
+    """DexScreener pair analytics as one summary line plus a window table"""
+    lines = [f"price={fmt(pair.get('price_usd'))} liq=${fmt((pair.get('liquidity') or {}).get('usd'))} "
+             f"mcap=${fmt(pair.get('market_cap'))} fdv=${fmt(pair.get('fdv'))}"]
+    changes = pair.get('price_change') or {}
+    volumes = pair.get('volume') or {}
+    txns = pair.get('transactions') or {}
+    rows = [[w, fmt(changes.get(w)), fmt(volumes.get(w)), fmt((txns.get(w) or {}).get('buys')),
+             fmt((txns.get(w) or {}).get('sells'))] for w in PAIR_WINDOWS]
+    lines.append(table(['window', 'chg%', 'vol$', 'buys', 'sells'], rows))
+    return '\n'.join(lines)
+
+
+def encode_timeframes(ohlcv_data):
+    """collect_token_data timeframe summaries as one row per timeframe"""
+    header = ['tf', 'bars', 'open', 'high', 'low', 'close', 'chg%', 'vol', 'rsi', 'ma20', 'ma40', 'ma20>ma40']
+    rows = []
+    for tf, summary in ohlcv_data.items():
+        price = summary.get('price') or {}
+        indicators = summary.get('indicators') or {}
+        trends = indicators.get('trends') or {}
+        rows.append([tf, summary.get('candles'), fmt(price.get('open')), fmt(price.get('high')), fmt(price.get('low')),
+                     fmt(price.get('close')), fmt(price.get('change'), 3), fmt(summary.get('volume')),
+                     fmt(indicators.get('RSI'), 3), fmt(indicators.get('MA20')), fmt(indicators.get('MA40')),
+                     fmt(trends.get('MA20_above_MA40'))])
+    if not rows:
+        return 'no candles'
+    header, rows, shared = _hoist_shared(header, rows)
+    block = table(header, rows)
+    return block + ('\nsame for all: ' + ' '.join(shared) if shared else '')
+
+
+def encode_frame(df, rows=None):
+    """Recent candles of an indicator DataFrame as an aligned table"""
+    if df is None or getattr(df, 'empty', True):
+        return 'no candles'
+    rows = rows or PROMPT_FRAME_ROWS
+    columns = [(col, name) for col, name in FRAME_COLUMNS if col in df]
+    price_columns = [col for col, _ in columns if col in ('Open', 'High', 'Low', 'Close', 'Volume')]
+    recent = df.drop_duplicates(subset=price_columns or None, keep='last').tail(rows)
+
+    header = ['time'] + [name for _, name in columns] if TIME_COLUMN in df else [name for _, name in columns]
+    body = []
+    for _, row in recent.iterrows():
+        cells = [fmt(row[col], 3 if col == 'RSI' else None) for col, _ in columns]
+        if TIME_COLUMN in df:
+            cells.insert(0, row[TIME_COLUMN].strftime('%m-%d %H:%M') if hasattr(row[TIME_COLUMN], 'strftime') else row[TIME_COLUMN])
+        body.append(cells)
+    skipped = len(df) - len(recent)
+    return table(header, body) + (f"\n({skipped} older / duplicate rows omitted)" if skipped > 0 else '')
+
+
+def encode_market_data(market_data, token=None):
+    """Compact feature block for a token's market data (collect_token_data dict or indicator DataFrame)"""
+    lines = [f"token={token}"] if token else []
+    if hasattr(market_data, 'iloc'):
+        lines.append(encode_frame(market_data))
+        return '\n'.join(lines)
+
+    pair = market_data.get('pair_analytics')
+    if pair:
+        lines += ['[pair]', encode_pair(pair)]
+    lines += ['[timeframes]', encode_timeframes(market_data.get('ohlcv_data') or {})]
+    return '\n'.join(lines)
+
+
+def estimate_tokens(text):
+    """Rough Claude token count (no API call) - about PROMPT_CHARS_PER_TOKEN characters per token"""
+    return math.ceil(len(text) / PROMPT_CHARS_PER_TOKEN) if text else 0
+
+
+def report_prompt(label, prompt):
+    """Log a prompt's size before it is sent and return the token estimate"""
+    tokens = estimate_tokens(prompt)
+    cprint(f"📏 {label} prompt: {len(prompt)} chars, ~{tokens} tokens", "cyan")
+    return tokens
@@ -0,0 +1,125 @@
+"""
+🌙 Moon Dev's Rate Limiter
+Per-provider token buckets with adaptive 429 backoff, applied by http_client per host
+Built with love by Moon Dev 🚀
+"""
+
+import time
+import threading
+from urllib.parse import urlsplit
+
+from src.config import *
+
+
+class TokenBucket:
+    """Classic token bucket whose refill rate halves on every 429 and creeps back on success"""
+
+    def __init__(self, rate, burst, min_rate=None):
+        self.base_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.min_rate = float(min_rate) if min_rate else self.base_rate / 16
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttled = 0  # 429s seen
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until one request worth of budget is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(max(wait, 0.001))
+
+    def penalize(self, retry_after=None):
+        """Provider said 429 - pause, drain the bucket and halve the rate"""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.blocked_until = max(self.blocked_until, now + pause)
+
+    def reward(self):
+        """Successful response - step the rate back up toward the configured budget"""
+        with self._lock:
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * RATE_LIMIT_RECOVERY_STEP)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'base_rate': self.base_rate,
+                'throttled': self.throttled,
+            }
+
+
+_lock = threading.Lock()
+_buckets = {}  # host -> TokenBucket
+
+
+def _bucket_for(url):
+    """Bucket for the url's host, or None when the host has no configured budget"""
+    host = urlsplit(url).hostname
+    limits = RATE_LIMITS.get(host)
+    if limits is None:
+        return None
+    with _lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            rate, burst = limits
+            bucket = TokenBucket(rate, burst)
+            _buckets[host] = bucket
+        return bucket
+
+
+def is_limited(url):
+    return urlsplit(url).hostname in RATE_LIMITS
+
+
+def acquire(url):
+    """Wait for budget on the url's provider (no-op for unlimited hosts)"""
+    bucket = _bucket_for(url)
+    if bucket is not None:
+        bucket.acquire()
+
+
+def _retry_after_seconds(response):
+    value = response.headers.get('Retry-After') if response is not None else None
+    if value is None:
+        return None
+    try:
+        return min(float(value), RATE_LIMIT_MAX_BACKOFF_SECONDS)
+    except ValueError:
+        return None
+
+
+def record(url, response):
+    """Feed a response back into the provider's bucket - returns True when it was a 429"""
+    bucket = _bucket_for(url)
+    if bucket is None:
+        return False
+    if response.status_code == 429:
+        bucket.penalize(_retry_after_seconds(response))
+        return True
+    bucket.reward()
+    return False
+
+
+def get_stats():
+    """Current rate and 429 count per provider"""
+    with _lock:
+        buckets = dict(_buckets)
+    return {host: bucket.stats() for host, bucket in buckets.items()}
@@ -0,0 +1,129 @@
+"""
+🌙 Moon Dev's Recommendation Store
+This cycle's AI recommendations, indexed by token, plus an append-only journal of every cycle
+Built with love by Moon Dev 🚀
+
+Agents call new_cycle() at the start of a run and add() the decisions as
+they come in. Execution (exits, allocations, position updates) reads
+current() / get(token), so it only touches this cycle's tokens, one
+record per token. The last RECOMMENDATION_KEEP_CYCLES cycles stay in memory
+for previous(token). Everything older lives only in the JSONL journal
+(one line per recommendation) at RECOMMENDATION_JOURNAL_DIR/<agent>.jsonl.
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+
+import pandas as pd
+from termcolor import cprint
+
+from src.config import *
+
+SUMMARY_COLUMNS = ['token', 'action', 'confidence']
+
+
+class Recommendation:
+    """One AI decision for one token"""
+
+    __slots__ = ('token', 'action', 'confidence', 'reasoning', 'cycle', 'created_at')
+
+    def __init__(self, token, action, confidence, reasoning, cycle=0, created_at=None):
+        self.token = token
+        self.action = action
+        self.confidence = int(confidence or 0)
+        self.reasoning = reasoning
+        self.cycle = cycle
+        self.created_at = created_at or time.time()
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"Recommendation({self.token[:8]} {self.action} {self.confidence}% cycle={self.cycle})"
+
+
+class RecommendationStore:
+    """{token: Recommendation} for the current cycle, a short window of past cycles, and the journal"""
+
+    def __init__(self, agent, journal_dir=RECOMMENDATION_JOURNAL_DIR, keep_cycles=RECOMMENDATION_KEEP_CYCLES):
+        self.agent = agent
+        self.journal_path = os.path.join(journal_dir, f"{agent}.jsonl") if journal_dir else None
+        self.cycle = 0
+        self.started_at = time.time()
+        self._current = {}  # token -> Recommendation, insertion order = arrival order
+        self._past = deque(maxlen=max(keep_cycles, 0))  # older cycles' {token: Recommendation}, newest last
+        self._lock = threading.Lock()
+        self._journal_lock = threading.Lock()
+
+    def new_cycle(self):
+        """Close the current cycle and start an empty one - returns the new cycle number"""
+        with self._lock:
+            if self._current and self._past.maxlen:
+                self._past.append(self._current)
+            self._current = {}
+            self.cycle += 1
+            self.started_at = time.time()
+            return self.cycle
+
+    def add(self, recommendations):
+        """Record recommendation dicts (or Recommendations) for this cycle - a token's newest decision wins"""
+        records = []
+        with self._lock:
+            for rec in recommendations:
+                if not isinstance(rec, Recommendation):
+                    rec = Recommendation(rec['token'], rec['action'], rec.get('confidence'), rec.get('reasoning'))
+                rec.cycle = self.cycle
+                self._current.pop(rec.token, None)  # re-inserting keeps arrival order
+                self._current[rec.token] = rec
+                records.append(rec)
+        self._journal(records)
+        return records
+
+    def _journal(self, records):
+        if not records or not self.journal_path:
+            return
+        lines = ''.join(json.dumps(rec.as_dict(), default=str) + '\n' for rec in records)
+        try:
+            with self._journal_lock:
+                os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+                with open(self.journal_path, 'a') as f:
+                    f.write(lines)
+        except Exception as e:
+            cprint(f"⚠️ Moon Dev's recommendation journal could not write {self.journal_path}: {str(e)}", "yellow")
+
+    def get(self, token):
+        """This cycle's recommendation for token, or None"""
+        with self._lock:
+            return self._current.get(token)
+
+    def current(self):
+        """This cycle's recommendations in arrival order"""
+        with self._lock:
+            return list(self._current.values())
+
+    def previous(self, token):
+        """Most recent recommendation for token from an earlier cycle still in the window"""
+        with self._lock:
+            for cycle in reversed(self._past):
+                if token in cycle:
+                    return cycle[token]
+        return None
+
+    def summary_df(self, columns=SUMMARY_COLUMNS):
+        """This cycle as a small DataFrame for display"""
+        return pd.DataFrame([[getattr(rec, c) for c in columns] for rec in self.current()], columns=columns)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._current)
+
+
+def read_journal(agent, journal_dir=RECOMMENDATION_JOURNAL_DIR):
+    """Every journaled recommendation for agent as a DataFrame (for offline review, not the trading loop)"""
+    path = os.path.join(journal_dir, f"{agent}.jsonl")
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=list(Recommendation.__slots__))
+    return pd.read_json(path, lines=True)
@@ -0,0 +1,202 @@
+"""
+🌙 Moon Dev's Token Registry
+Persistent cache of immutable token metadata (decimals, program, creation times, symbol, name)
+Built with love by Moon Dev 🚀
+
+Mint accounts are loaded in bulk with one getMultipleAccounts call per
+TOKEN_REGISTRY_BATCH_SIZE mints, kept in memory and written to a JSON file so
+sells and chunk_kill never wait on an RPC round trip just to learn decimals.
+Two creation times are kept apart: mint_created_at is when the mint was
+created (Birdeye blockUnixTime), pair_created_at is when its DexScreener pair
+was created.
+"""
+
+import os
+import json
+import threading
+
+from termcolor import cprint
+
+from src.config import *
+from src import http_client
+
+PUBLIC_RPC_URL = "https://api.mainnet-beta.solana.com/"
+
+FIELDS = ('decimals', 'program', 'mint_created_at', 'pair_created_at', 'symbol', 'name', 'creation_info')
+
+
+def _parse_mint_account(account):
+    """Pull registry fields out of a jsonParsed mint account"""
+    if not account:
+        return None
+
+    record = {'program': account.get('owner')}
+    data = account.get('data')
+    parsed = data.get('parsed', {}) if isinstance(data, dict) else {}
+    info = parsed.get('info', {})
+    if 'decimals' in info:
+        record['decimals'] = info['decimals']
+
+    # Token2022 mints can carry name/symbol in the tokenMetadata extension
+    for extension in info.get('extensions', []) or []:
+        if extension.get('extension') == 'tokenMetadata':
+            state = extension.get('state', {})
+            if state.get('name'):
+                record['name'] = state['name']
+            if state.get('symbol'):
+                record['symbol'] = state['symbol']
+    return record
+
+
+class TokenRegistry:
+    """In-memory + on-disk token metadata keyed by mint"""
+
+    def __init__(self, path=TOKEN_REGISTRY_PATH, rpc_url=None):
+        self.path = path
+        self.rpc_url = rpc_url
+        self._records = {}
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def _rpc(self):
+        return self.rpc_url or os.getenv("RPC_ENDPOINT") or PUBLIC_RPC_URL
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self._records = json.load(f)
+        except Exception as e:
+            cprint(f"⚠️ Moon Dev's token registry could not read {self.path}: {str(e)}", "yellow")
+            self._records = {}
+
+    def save(self):
+        """Write the registry atomically"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with self._lock:
+            snapshot = {mint: dict(record) for mint, record in self._records.items()}
+        with self._save_lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def update(self, mint, save=True, **fields):
+        """Merge known fields for a mint - values already stored are immutable and kept"""
+        changed = False
+        with self._lock:
+            record = self._records.setdefault(mint, {})
+            for key, value in fields.items():
+                if key in FIELDS and value not in (None, '') and record.get(key) in (None, ''):
+                    record[key] = value
+                    changed = True
+        if changed and save:
+            self.save()
+        return changed
+
+    def seed_from_wallet_items(self, items):
+        """Record decimals/symbol/name from Birdeye wallet token_list items (free with every wallet fetch)"""
+        changed = False
+        for item in items or []:
+            mint = item.get('address')
+            if not mint:
+                continue
+            changed |= self.update(
+                mint,
+                save=False,
+                decimals=item.get('decimals'),
+                symbol=item.get('symbol'),
+                name=item.get('name'),
+            )
+        if changed:
+            self.save()
+
+    def load_many(self, mints, force=False):
+        """Bulk-load mint accounts that are missing decimals/program via getMultipleAccounts"""
+        with self._lock:
+            missing = [
+                mint for mint in dict.fromkeys(mints)
+                if force or self._records.get(mint, {}).get('decimals') is None
+                or self._records.get(mint, {}).get('program') is None
+            ]
+
+        changed = False
+        for i in range(0, len(missing), TOKEN_REGISTRY_BATCH_SIZE):
+            batch = missing[i:i + TOKEN_REGISTRY_BATCH_SIZE]
+            payload = {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "getMultipleAccounts",
+                "params": [batch, {"encoding": "jsonParsed", "commitment": "confirmed"}]
+            }
+            try:
+                response = http_client.post(self._rpc(), json=payload)
+                accounts = response.json()['result']['value']
+            except Exception as e:
+                cprint(f"❌ Moon Dev's token registry RPC load failed: {str(e)}", "white", "on_red")
+                continue
+
+            for mint, account in zip(batch, accounts):
+                record = _parse_mint_account(account)
+                if record:
+                    changed |= self.update(mint, save=False, **record)
+
+        if changed:
+            self.save()
+
+    def get(self, mint, required=('decimals', 'program')):
+        """Full record for a mint, loading it from RPC only when a required field is unknown"""
+        with self._lock:
+            record = self._records.get(mint)
+        if record is None or any(record.get(key) is None for key in required):
+            self.load_many([mint])
+            with self._lock:
+                record = self._records.get(mint)
+        return dict(record or {})
+
+    def decimals(self, mint):
+        return self.get(mint, required=('decimals',)).get('decimals')
+
+    def program(self, mint):
+        return self.get(mint, required=('program',)).get('program')
+
+    def mint_created_at(self, mint):
+        """Stored mint creation unix time (never triggers an RPC load)"""
+        with self._lock:
+            return self._records.get(mint, {}).get('mint_created_at')
+
+    def pair_created_at(self, mint):
+        """Stored DexScreener pair creation unix time (never triggers an RPC load)"""
+        with self._lock:
+            return self._records.get(mint, {}).get('pair_created_at')
+
+    def set_pair_created_at(self, mint, created_at):
+        return self.update(mint, pair_created_at=created_at)
+
+    def get_creation_info(self, mint):
+        """Stored Birdeye token_creation_info payload, if we have seen it"""
+        with self._lock:
+            return self._records.get(mint, {}).get('creation_info')
+
+    def set_creation_info(self, mint, creation_info):
+        return self.update(
+            mint,
+            creation_info=creation_info,
+            mint_created_at=creation_info.get('blockUnixTime'),
+            decimals=creation_info.get('decimals'),
+        )
+
+
+_default_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_token_registry():
+    """Shared registry used by nice_funcs and the agents"""
+    global _default_registry
+    with _registry_lock:
+        if _default_registry is None:
+            _default_registry = TokenRegistry()
+        return _default_registry
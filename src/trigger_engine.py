@@ -0,0 +1,325 @@
+"""
+🌙 Moon Dev's Trigger Engine
+Many price triggers across many tokens, evaluated against one shared price stream
+Built with love by Moon Dev 🚀
+
+A Trigger is a level on one token (buy under, breakout over, stop loss, take
+profit) and the action to run when the price crosses it. The engine pulls
+prices for every watched mint from one source. PollingPriceSource batches them
+into multi_price calls. PushPriceSource takes ticks from a websocket-style
+feed, and SimulatedPriceFeed is its local stand-in. Actions run on a thread
+pool, so a slow entry or exit never delays evaluation of the other triggers.
+Exits only sell when a position is held, and a repeating exit re-arms once
+the price has moved back across its level - never while it stays beyond it.
+"""
+
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from termcolor import cprint
+
+from src.config import *
+from src import nice_funcs as n
+from src.price_cache import price_cache
+from src.order_engine import buy_under_policy, breakout_policy
+
+BUY_UNDER = 'buy_under'
+BREAKOUT = 'breakout'
+STOP_LOSS = 'stop_loss'
+TAKE_PROFIT = 'take_profit'
+
+BELOW_KINDS = (BUY_UNDER, STOP_LOSS)  # fire when the price is under the level, the rest fire over it
+EXIT_KINDS = (STOP_LOSS, TAKE_PROFIT)  # re-arm on a fresh cross, not on a cooldown
+
+
+class Trigger:
+    """A price level on one token and the action to run when it is crossed"""
+
+    def __init__(self, token, kind, level, action, repeat=False, group=None, name=None):
+        self.token = token
+        self.kind = kind
+        self.level = level
+        self.action = action          # called as action(trigger, price)
+        self.repeat = repeat          # re-arm TRIGGER_COOLDOWN_SECONDS after each action (exits: after the price crosses back)
+        self.group = group            # firing one trigger cancels the others in its group (stop loss + take profit)
+        self.name = name or f"{kind} {token[:8]} @ {level}"
+
+        self.armed = True
+        self.running = False
+        self.cancelled = False
+        self.armed_at = 0.0
+        self.fired = 0
+        self.last_price = None
+        self.last_result = None
+        self.last_error = None
+
+    def holds(self, price):
+        if price is None:
+            return False
+        return price < self.level if self.kind in BELOW_KINDS else price > self.level
+
+    def ready(self, now):
+        return self.armed and not self.running and not self.cancelled and now >= self.armed_at
+
+
+class PollingPriceSource:
+    """Batched multi_price polling of every watched mint once per interval"""
+
+    def __init__(self, interval=TRIGGER_POLL_SECONDS):
+        self.interval = interval
+        self._last_poll = 0.0
+
+    def next(self, tokens, stop):
+        """Wait for the next poll slot, then price every token in one batch"""
+        wait = self._last_poll + self.interval - time.monotonic()
+        if wait > 0 and stop.wait(wait):
+            return {}
+        self._last_poll = time.monotonic()
+        if not tokens:
+            return {}
+        return n.token_prices(tokens, max_age=self.interval)
+
+
+class PushPriceSource:
+    """Prices pushed in by a streaming feed - next() hands back the latest tick per token"""
+
+    def __init__(self, wait_seconds=TRIGGER_PUSH_WAIT_SECONDS):
+        self.wait_seconds = wait_seconds
+        self._updates = {}
+        self._cond = threading.Condition()
+        self.ticks = 0
+
+    def publish(self, prices):
+        """Called by the feed thread with {mint: price}"""
+        prices = {mint: price for mint, price in prices.items() if price is not None}
+        if not prices:
+            return
+        price_cache.set_many(prices)  # entries and exits read the same fresh prices
+        with self._cond:
+            self._updates.update(prices)  # ticks arriving between reads collapse to the newest
+            self.ticks += len(prices)
+            self._cond.notify_all()
+
+    def next(self, tokens, stop):
+        with self._cond:
+            if not self._updates:
+                self._cond.wait(self.wait_seconds)
+            updates, self._updates = self._updates, {}
+        if not tokens:
+            return {}
+        watched = set(tokens)
+        return {mint: price for mint, price in updates.items() if mint in watched}
+
+
+class SimulatedPriceFeed:
+    """Local stand-in for a websocket price stream: a random walk per mint published every interval"""
+
+    def __init__(self, source, start_prices, interval=0.2, volatility=0.01, seed=None):
+        self.source = source
+        self.prices = dict(start_prices)
+        self.interval = interval
+        self.volatility = volatility
+        self._random = random.Random(seed)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='moondev-price-feed', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def step(self):
+        for mint, price in self.prices.items():
+            self.prices[mint] = price * (1 + self._random.gauss(0, self.volatility))
+        self.source.publish(self.prices)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.step()
+
+
+class TriggerEngine:
+    """Evaluate every trigger on each price tick and fire actions on a thread pool"""
+
+    def __init__(self, source=None, max_workers=TRIGGER_WORKERS):
+        self.source = source or PollingPriceSource()
+        self.max_workers = max_workers
+        self._triggers = {}  # mint -> [Trigger]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pool = None
+        self._thread = None
+        self.ticks = 0
+        self.evaluations = 0
+        self.fired = 0
+
+    # ---- trigger book --------------------------------------------------------
+
+    def add(self, trigger):
+        with self._lock:
+            self._triggers.setdefault(trigger.token, []).append(trigger)
+        cprint(f"🎯 Moon Dev watching {trigger.name}", "white", "on_blue")
+        return trigger
+
+    def remove(self, trigger):
+        with self._lock:
+            self._discard(trigger)
+
+    def _discard(self, trigger):
+        # Caller holds self._lock
+        trigger.cancelled = True
+        triggers = self._triggers.get(trigger.token, [])
+        if trigger in triggers:
+            triggers.remove(trigger)
+        if not triggers:
+            self._triggers.pop(trigger.token, None)
+
+    def cancel_group(self, group, keep=None):
+        with self._lock:
+            triggers = [t for ts in self._triggers.values() for t in ts if t.group == group and t is not keep]
+            for trigger in triggers:
+                self._discard(trigger)
+
+    def triggers(self):
+        with self._lock:
+            return [t for ts in self._triggers.values() for t in ts]
+
+    def tokens(self):
+        with self._lock:
+            return list(self._triggers)
+
+    # ---- evaluation ----------------------------------------------------------
+
+    def evaluate(self, prices):
+        """Check the triggers of every priced token - returns the triggers that fired"""
+        now = time.monotonic()
+        fired = []
+        with self._lock:
+            self.ticks += 1
+            for mint, price in prices.items():
+                for trigger in self._triggers.get(mint, ()):
+                    self.evaluations += 1
+                    trigger.last_price = price
+                    if (trigger.kind in EXIT_KINDS and trigger.repeat and not trigger.armed
+                            and not trigger.running and not trigger.holds(price)):
+                        trigger.armed = True  # price is back across the level - the next cross is a new exit
+                    if trigger.ready(now) and trigger.holds(price):
+                        trigger.armed = False
+                        trigger.running = True
+                        trigger.fired += 1
+                        self.fired += 1
+                        fired.append((trigger, price))
+
+        for trigger, price in fired:
+            cprint(f"⚡ {trigger.name} fired at {price}", "white", "on_green")
+            if trigger.group is not None:
+                self.cancel_group(trigger.group, keep=trigger)
+            if self._pool is None:
+                self._run_action(trigger, price)
+            else:
+                self._pool.submit(self._run_action, trigger, price)
+        return [trigger for trigger, _ in fired]
+
+    def _run_action(self, trigger, price):
+        result, error = None, None
+        try:
+            result = trigger.action(trigger, price)
+        except Exception as e:
+            error = str(e)
+            cprint(f"❌ {trigger.name} action failed: {str(e)}", "white", "on_red")
+        with self._lock:
+            trigger.last_result = result
+            trigger.last_error = error
+            trigger.running = False
+            if trigger.repeat and not trigger.cancelled:
+                trigger.armed_at = time.monotonic() + TRIGGER_COOLDOWN_SECONDS
+                trigger.armed = trigger.kind not in EXIT_KINDS  # exits wait for the price to cross back first
+            else:
+                self._discard(trigger)
+
+    # ---- loop ------------------------------------------------------------------
+
+    def run(self, duration=None):
+        """Evaluate ticks until stop(), duration seconds, or no triggers are left"""
+        deadline = None if duration is None else time.monotonic() + duration
+        self._stop.clear()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            self._pool = pool
+            try:
+                while not self._stop.is_set():
+                    if deadline is not None and time.monotonic() >= deadline:
+                        break
+                    tokens = self.tokens()
+                    if not tokens and not any(t.running for t in self.triggers()):
+                        break
+                    prices = self.source.next(tokens, self._stop)
+                    if prices:
+                        self.evaluate(prices)
+            finally:
+                self._pool = None
+        return self
+
+    def start(self):
+        """Run the loop on a background thread"""
+        self._thread = threading.Thread(target=self.run, name='moondev-trigger-engine', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            'triggers': len(self.triggers()),
+            'tokens': len(self.tokens()),
+            'ticks': self.ticks,
+            'evaluations': self.evaluations,
+            'fired': self.fired,
+        }
+
+
+# ---- ready-made triggers ---------------------------------------------------------
+
+def buy_under(token, level, usd_amount=usd_size, repeat=False):
+    """Build the position while the price is under level (elegant_entry)"""
+    return Trigger(token, BUY_UNDER, level,
+                   lambda trigger, price: n.enter_position(token, usd_amount, buy_under_policy(level)), repeat=repeat)
+
+
+def breakout(token, level, usd_amount=usd_size, repeat=False):
+    """Build the position while the price is over level (breakout_entry)"""
+    return Trigger(token, BREAKOUT, level,
+                   lambda trigger, price: n.enter_position(token, usd_amount, breakout_policy(level)), repeat=repeat)
+
+
+def exit_position(token):
+    """chunk_kill the position - a no-op when nothing is held"""
+    position = float(n.get_position(token) or 0)
+    if position <= 0:
+        cprint(f"ℹ️ No {token[:8]} position to exit", "white", "on_blue")
+        return None
+    return n.chunk_kill(token, slippage)
+
+
+def stop_loss(token, level, repeat=False, group=None):
+    """Chunk out of the position once the price drops under level"""
+    return Trigger(token, STOP_LOSS, level,
+                   lambda trigger, price: exit_position(token), repeat=repeat, group=group)
+
+
+def take_profit(token, level, repeat=False, group=None):
+    """Chunk out of the position once the price rises over level"""
+    return Trigger(token, TAKE_PROFIT, level,
+                   lambda trigger, price: exit_position(token), repeat=repeat, group=group)
+
+
+def bracket(token, stop_price, take_profit_price):
+    """Stop loss + take profit pair - whichever fires first cancels the other"""
+    group = f"bracket {token}"
+    return [stop_loss(token, stop_price, group=group), take_profit(token, take_profit_price, group=group)]
@@ -0,0 +1,84 @@
+"""
+🌙 Moon Dev's Wallet Snapshot
+One Birdeye wallet token_list download per cycle, indexed by mint
+Built with love by Moon Dev 🚀
+"""
+
+import time
+import threading
+
+from src.config import *
+
+
+class WalletSnapshot:
+    """Holdings of one wallet at one point in time"""
+
+    def __init__(self, wallet, df):
+        self.wallet = wallet
+        self.df = df  # columns: Mint Address, Amount, USD Value
+        self.complete = bool(df.attrs.get('complete'))  # the download succeeded - empty means really empty
+        self.fetched_at = time.monotonic()
+        self.by_mint = {}
+        for mint, amount, usd_value in zip(df['Mint Address'].astype(str), df['Amount'], df['USD Value']):
+            self.by_mint.setdefault(mint, (float(amount), float(usd_value)))
+
+    def age(self):
+        return time.monotonic() - self.fetched_at
+
+    def has(self, mint):
+        return mint in self.by_mint
+
+    def amount(self, mint):
+        """Token amount held (0 when not in the wallet)"""
+        return self.by_mint.get(mint, (0.0, 0.0))[0]
+
+    def usd_value(self, mint):
+        """USD value held (0 when not in the wallet)"""
+        return self.by_mint.get(mint, (0.0, 0.0))[1]
+
+    def rows(self, mint):
+        """DataFrame rows for one mint, same shape as the full holdings frame"""
+        return self.df[self.df['Mint Address'] == mint]
+
+    def mints(self):
+        return list(self.by_mint)
+
+
+class WalletSnapshotCache:
+    """TTL cache of WalletSnapshots, refreshed on demand and invalidated by our own swaps"""
+
+    def __init__(self, ttl=WALLET_SNAPSHOT_TTL_SECONDS):
+        self.ttl = ttl
+        self._snapshots = {}
+        self._lock = threading.Lock()
+
+    def get(self, wallet, fetch, max_age=None):
+        """
+        Return a snapshot no older than max_age, calling fetch(wallet) -> DataFrame when stale
+
+        Failed downloads are never cached - Birdeye errors also come back empty and
+        reading them as "no position" for a whole TTL would be dangerous.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        # Holding the lock while fetching means concurrent callers share one download
+        with self._lock:
+            snapshot = self._snapshots.get(wallet)
+            if snapshot is not None and snapshot.age() <= max_age:
+                return snapshot
+
+            snapshot = WalletSnapshot(wallet, fetch(wallet))
+            if snapshot.complete:
+                self._snapshots[wallet] = snapshot
+            return snapshot
+
+    def invalidate(self, wallet=None):
+        """Drop one wallet's snapshot (or all of them when wallet is None)"""
+        with self._lock:
+            if wallet is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(wallet, None)
+
+
+# Shared instance used by nice_funcs and the agents
+wallet_snapshots = WalletSnapshotCache()